@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+'''Misst den Durchsatz von `DataPreProcessorAESCTR` mit unterschiedlich vielen Threads.
+
+Ein Gewinn durch mehrere Threads ist nur mit mehreren verfügbaren Prozessorkernen zu erwarten.
+
+Aufruf: python benchmarks/bench_aes_ctr.py [Größe in MiB ...]
+'''
+import os
+import sys
+import time
+
+from ccframework import DataPreProcessorAESCTR
+
+def throughput(processor: DataPreProcessorAESCTR, data: bytes) -> float:
+    start = time.perf_counter()
+    processor.preprocess(data)
+    return len(data) / (time.perf_counter() - start) / (1 << 20)
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [16, 256]
+    key, iv, nonce = os.urandom(16), os.urandom(8), os.urandom(8)
+    workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{'MiB':>6} " + " ".join(f"{f'{w} threads [MiB/s]':>18}" for w in workers))
+    for size in sizes:
+        data = os.urandom(size << 20)
+        results = [throughput(DataPreProcessorAESCTR(key, iv, nonce, workers=w), data) for w in workers]
+        print(f"{size:>6} " + " ".join(f"{result:>18.0f}" for result in results))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+'''Misst den Nutzdatendurchsatz (Goodput) von `FECMicroProtocolSend`/`FECMicroProtocolReceive` bei
+zufälligem Verlust von Paketen im Vergleich zu `LengthPrefixedMicroProtocol*` ohne Fehlerkorrektur.
+
+Goodput ist der Anteil der gesendeten Bits, der als korrekt empfangene Nutzdaten ankommt, gemittelt
+über alle Versuche. Eine Übertragung zählt nur, wenn die Daten vollständig und fehlerfrei sind.
+
+Aufruf: python benchmarks/bench_fec.py [Versuche]
+'''
+import random
+import sys
+
+from bitstring import Bits
+
+from ccframework import FECMicroProtocolSend, FECMicroProtocolReceive
+from ccframework import LengthPrefixedMicroProtocolSend, LengthPrefixedMicroProtocolReceive
+
+PAYLOAD_SIZE = 1000
+SLICE_SIZE = 2
+LOSS_RATES = [0.0, 0.005, 0.01, 0.02, 0.05, 0.1]
+# (group_size, interleave), None = ohne Fehlerkorrektur
+CONFIGS = [None, (8, 1), (4, 4), (2, 4)]
+
+def create(config):
+    send = LengthPrefixedMicroProtocolSend(slice_size=SLICE_SIZE)
+    receive = LengthPrefixedMicroProtocolReceive(slice_size=SLICE_SIZE)
+    if config is None:
+        return send, receive
+    group_size, interleave = config
+    return (FECMicroProtocolSend(send, group_size, interleave),
+        FECMicroProtocolReceive(receive, group_size, interleave))
+
+def goodput(config, loss_rate: float, trials: int) -> float:
+    received_bits = 0
+    sent_bits = 0
+    for i in range(trials):
+        data = Bits(random.randbytes(PAYLOAD_SIZE))
+        send, receive = create(config)
+        slices = send.preprocess(data)
+        sent_bits += len(slices) * len(slices[0])
+        result = Bits()
+        for data_slice in slices:
+            if random.random() < loss_rate:
+                continue
+            resp = receive.postprocess(data_slice)
+            if resp.data is not None:
+                result += resp.data
+        if result == data:
+            received_bits += len(data)
+    return received_bits / sent_bits
+
+if __name__ == '__main__':
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    names = ['ohne FEC' if config is None else f"G={config[0]} I={config[1]}" for config in CONFIGS]
+    print(f"{'Verlust':>8} " + " ".join(f"{name:>12}" for name in names))
+    for loss_rate in LOSS_RATES:
+        results = [goodput(config, loss_rate, trials) for config in CONFIGS]
+        print(f"{loss_rate:>8.3f} " + " ".join(f"{result:>12.3f}" for result in results))
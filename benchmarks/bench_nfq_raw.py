@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+'''Misst die Verarbeitungszeit pro Paket im Callback von `ProtocolReceiveAdapterNFQ` mit und ohne
+Scapy, also die Zeit, die der Kernel auf das Verdict wartet.
+
+Verglichen werden das Parsen mit `IP(...)` samt `handle_packet` und das direkte Lesen der Payload
+mit `l4_payload` samt `handle_payload` bzw. `extract_int`. Die Netfilter-Queue selbst wird dabei
+nicht genutzt, die Ausgabe des PacketHandlers wird nach /dev/null umgeleitet.
+
+Aufruf: python benchmarks/bench_nfq_raw.py [Anzahl Pakete]
+'''
+import contextlib
+import os
+import random
+import sys
+import time
+
+from scapy.all import IP, UDP, TCP, Raw
+
+from ccframework import PacketHandlerReceiveFixedPositionPayload, l4_payload
+
+def scapy_path(handler, raw_packets):
+    for raw in raw_packets:
+        handler.handle_packet(IP(raw))
+
+def raw_path(handler, raw_packets):
+    for raw in raw_packets:
+        payload = l4_payload(memoryview(raw))
+        if payload is not None:
+            handler.handle_payload(payload)
+
+def raw_int_path(handler, raw_packets):
+    for raw in raw_packets:
+        payload = l4_payload(memoryview(raw))
+        if payload is not None:
+            handler.extract_int(payload)
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    raw_packets = [bytes(IP()/random.choice([UDP(sport=40000, dport=40001), TCP(sport=40000, dport=40001)])/Raw(random.randbytes(64))) for i in range(count)]
+    handler = PacketHandlerReceiveFixedPositionPayload(start_index=4, slice_size=2)
+    results = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for name, func in [('Scapy', scapy_path), ('roh, Bits', raw_path), ('roh, int', raw_int_path)]:
+            start = time.perf_counter()
+            func(handler, raw_packets)
+            results.append((name, (time.perf_counter() - start) / count))
+    print(f"{'Pfad':>10} {'µs/Paket':>9} {'Faktor':>7}")
+    for name, duration in results:
+        print(f"{name:>10} {duration * 1e6:>9.2f} {results[0][1] / duration:>7.1f}")
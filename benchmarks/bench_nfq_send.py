@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+'''Misst die zusätzliche Verzögerung pro Paket, die `ProtocolSendAdapterNFQ` beim Einbetten von
+Daten verursacht.
+
+Verglichen werden das Parsen mit Scapy samt `handle_packet`, Löschen von Längen und Prüfsummen und
+`build()` mit dem direkten Einbetten in die Bytes über `patch_packet` und inkrementeller Anpassung
+der Prüfsumme. Die Netfilter-Queue selbst wird dabei nicht genutzt, die Ausgabe des PacketHandlers
+wird nach /dev/null umgeleitet.
+
+Aufruf: python benchmarks/bench_nfq_send.py [Anzahl Pakete]
+'''
+import contextlib
+import os
+import random
+import sys
+import time
+
+from bitstring import Bits
+from scapy.all import IP, UDP, TCP, Raw
+
+from ccframework import PacketHandlerSendFixedPositionPayload, patch_packet
+
+SLICE_SIZE = 2
+
+def scapy_path(handler, raw_packets):
+    result = []
+    for raw in raw_packets:
+        parsed_packet = IP(raw)
+        handler.handle_packet(parsed_packet)
+        del parsed_packet[IP].len
+        del parsed_packet[IP].chksum
+        if UDP in parsed_packet:
+            del parsed_packet[UDP].len
+            del parsed_packet[UDP].chksum
+        if TCP in parsed_packet:
+            del parsed_packet[TCP].chksum
+        result.append(parsed_packet.build())
+    return result
+
+def patch_path(handler, raw_packets):
+    result = []
+    for raw in raw_packets:
+        patched = bytearray(raw)
+        patch_packet(patched, handler)
+        result.append(bytes(patched))
+    return result
+
+def create_handler(count: int):
+    handler = PacketHandlerSendFixedPositionPayload(start_index=4, slice_size=SLICE_SIZE)
+    random.seed(1)
+    handler.set_send_buffer([Bits(random.randbytes(SLICE_SIZE)) for i in range(count)])
+    return handler
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    raw_packets = [bytes(IP(src='10.0.0.1', dst='10.0.0.2')/random.choice([UDP(sport=40000, dport=40001), TCP(sport=40000, dport=40001)])
+        /Raw(random.randbytes(64))) for i in range(count)]
+    results = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for name, func in [('Scapy', scapy_path), ('patch', patch_path)]:
+            handler = create_handler(count)
+            start = time.perf_counter()
+            packets = func(handler, raw_packets)
+            results.append((name, (time.perf_counter() - start) / count, packets))
+    assert(results[0][2] == results[1][2])
+    print(f"{'Pfad':>6} {'µs/Paket':>9} {'Faktor':>7}")
+    for name, duration, packets in results:
+        print(f"{name:>6} {duration * 1e6:>9.2f} {results[0][1] / duration:>7.1f}")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+'''Vergleicht die Auswertung eines Paketmitschnitts Stück für Stück (`handle_received_data`) mit der
+blockweisen Auswertung über `handle_received_batch` bzw. `MinimalMicroProtocolReceive.postprocess_many`.
+
+Gemessen wird nur das Mikroprotokoll samt Empfangspuffer, nicht das Einlesen der Pakete mit Scapy.
+
+Aufruf: python benchmarks/bench_postprocess_many.py [Anzahl Stücke]
+'''
+import random
+import sys
+import time
+
+from bitstring import Bits
+
+from ccframework import ProtocolReceiveAdapter, MinimalMicroProtocolReceive
+
+BATCH_SIZE = 4096
+SLICE_SIZES = [1, 2, 8]
+
+class ProtocolReceiveAdapterList(ProtocolReceiveAdapter):
+    def __init__(self, slices, batch_size=None, microprotocol=None):
+        super().__init__(microprotocol)
+        self.slices = slices
+        self.batch_size = batch_size
+
+    def receive(self) -> bytes:
+        if self.batch_size is None:
+            for data in self.slices:
+                self.handle_received_data(data)
+        else:
+            for i in range(0, len(self.slices), self.batch_size):
+                self.handle_received_batch(self.slices[i:i + self.batch_size])
+        return self.buffer.finalize()
+
+def create_slices(count: int, slice_size: int) -> [Bits]:
+    zero = Bits(bytes(slice_size))
+    slices = [zero]
+    for i in range(count - 2):
+        # Null-Bytes würden das Ende der Übertragung markieren
+        slices.append(Bits(bytes(random.randint(1, 255) for j in range(slice_size))))
+    slices.append(zero)
+    return slices
+
+def measure(slices, slice_size: int, batch_size) -> (float, bytes):
+    adapter = ProtocolReceiveAdapterList(slices, batch_size, MinimalMicroProtocolReceive(slice_size=slice_size))
+    start = time.perf_counter()
+    result = adapter.receive()
+    return time.perf_counter() - start, result
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print(f"{'Stücke':>8} {'slice_size':>10} {'einzeln [s]':>12} {'Blöcke [s]':>12} {'Faktor':>8}")
+    for slice_size in SLICE_SIZES:
+        slices = create_slices(count, slice_size)
+        single, expected = measure(slices, slice_size, None)
+        batched, result = measure(slices, slice_size, BATCH_SIZE)
+        assert(result == expected)
+        print(f"{count:>8} {slice_size:>10} {single:>12.3f} {batched:>12.3f} {single / batched:>8.1f}")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+'''Vergleicht den Empfangspuffer `BitAccumulator` mit dem bisherigen Anhängen an ein
+unveränderliches `Bits`-Objekt.
+
+Aufruf: python benchmarks/bench_receive_buffer.py [Größe in Bytes]
+'''
+import random
+import sys
+import time
+import tracemalloc
+
+from bitstring import Bits
+
+from ccframework import BitAccumulator, SimpleBitSlicer
+
+def receive_bits(slices: [Bits]) -> bytes:
+    '''Bisheriges Vorgehen in `ProtocolReceiveAdapter.handle_received_data` als Referenz'''
+    buffer = Bits()
+    for data in slices:
+        buffer += data
+    return buffer.tobytes()
+
+def receive_accumulator(slices: [Bits]) -> bytes:
+    buffer = BitAccumulator()
+    for data in slices:
+        buffer.append(data)
+    return buffer.finalize()
+
+def measure(func, slices):
+    start = time.perf_counter()
+    result = func(slices)
+    duration = time.perf_counter() - start
+    # Speicherbedarf separat messen, da tracemalloc die Laufzeit verfälscht
+    tracemalloc.start()
+    func(slices)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak, result
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1 << 16, 1 << 18, 1 << 20]
+    print(f"{'bytes':>10} {'slice_size':>10} {'Bits [s]':>9} {'BitAccumulator [s]':>19} {'Bits peak [MB]':>15} {'BitAccumulator peak [MB]':>25}")
+    for size in sizes:
+        data = Bits(random.randbytes(size))
+        for slice_size in [7, 64]:
+            slices = SimpleBitSlicer(slice_size=slice_size, padding=Bits(slice_size)).slice(data)
+            t_old, peak_old, expected = measure(receive_bits, slices)
+            t_new, peak_new, actual = measure(receive_accumulator, slices)
+            assert actual == expected
+            print(f"{size:>10} {slice_size:>10} {t_old:>9.3f} {t_new:>19.3f} {peak_old/1e6:>15.2f} {peak_new/1e6:>25.2f}")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+'''Vergleicht den Empfang einzelner Pakete mit `Bits`-Objekten (`handle_packet` und
+`handle_received_data`) mit der Weitergabe als Ganzzahl (`handle_packet_int` bzw. `extract_int` und
+`handle_received_int`).
+
+Gemessen werden Laufzeit pro Paket und der mit tracemalloc ermittelte Speicherbedarf, einmal mit
+Scapy-Paketen und einmal nur mit der Payload, wie sie ohne Scapy vorliegen würde. Die Ausgabe des
+PacketHandlers wird nach /dev/null umgeleitet.
+
+Aufruf: python benchmarks/bench_receive_int.py [Anzahl Pakete]
+'''
+import contextlib
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from bitstring import Bits
+from scapy.all import UDP, Raw
+
+from ccframework import ProtocolReceiveAdapter, MinimalMicroProtocolReceive, PacketHandlerReceiveFixedPositionPayload
+
+START_INDEX = 4
+SLICE_SIZE = 2
+
+class ProtocolReceiveAdapterBench(ProtocolReceiveAdapter):
+    def receive(self) -> bytes:
+        return self.buffer.finalize()
+
+def create_payloads(count: int) -> [bytes]:
+    payloads = []
+    for i in range(count):
+        payload = bytearray(random.randbytes(32))
+        if i == 0 or i == count - 1:
+            payload[START_INDEX:START_INDEX + SLICE_SIZE] = bytes(SLICE_SIZE)
+        elif not any(payload[START_INDEX:START_INDEX + SLICE_SIZE]):
+            payload[START_INDEX] = 1
+        payloads.append(bytes(payload))
+    return payloads
+
+def receive_bits_packets(handler, adapter, packets):
+    for packet in packets:
+        adapter.handle_received_data(handler.handle_packet(packet))
+
+def receive_int_packets(handler, adapter, packets):
+    for packet in packets:
+        adapter.handle_received_int(handler.handle_packet_int(packet), handler.slice_size)
+
+def receive_bits_payloads(handler, adapter, payloads):
+    for payload in payloads:
+        data = Bits(payload)[handler.start_index:handler.start_index + handler.slice_size]
+        adapter.handle_received_data(data)
+
+def receive_int_payloads(handler, adapter, payloads):
+    for payload in payloads:
+        adapter.handle_received_int(handler.extract_int(memoryview(payload)), handler.slice_size)
+
+def measure(func, inputs) -> (float, float, bytes):
+    handler = PacketHandlerReceiveFixedPositionPayload(start_index=START_INDEX, slice_size=SLICE_SIZE)
+    adapter = ProtocolReceiveAdapterBench(MinimalMicroProtocolReceive(slice_size=SLICE_SIZE))
+    adapter.buffer.reserve(len(inputs) * SLICE_SIZE * 8)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        func(handler, adapter, inputs)
+        duration = time.perf_counter() - start
+
+        handler = PacketHandlerReceiveFixedPositionPayload(start_index=START_INDEX, slice_size=SLICE_SIZE)
+        adapter = ProtocolReceiveAdapterBench(MinimalMicroProtocolReceive(slice_size=SLICE_SIZE))
+        adapter.buffer.reserve(len(inputs) * SLICE_SIZE * 8)
+        tracemalloc.start()
+        func(handler, adapter, inputs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return duration, peak, adapter.receive()
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    payloads = create_payloads(count)
+    packets = [UDP()/Raw(payload) for payload in payloads]
+    print(f"{'Eingabe':>8} {'Modus':>6} {'µs/Paket':>9} {'Peak [KB]':>10}")
+    for name, inputs, bits_func, int_func in [('Scapy', packets, receive_bits_packets, receive_int_packets),
+            ('Payload', payloads, receive_bits_payloads, receive_int_payloads)]:
+        expected = None
+        for mode, func in [('Bits', bits_func), ('int', int_func)]:
+            duration, peak, result = measure(func, inputs)
+            if expected is None:
+                expected = result
+            assert(result == expected)
+            print(f"{name:>8} {mode:>6} {duration / count * 1e6:>9.2f} {peak / 1024:>10.1f}")
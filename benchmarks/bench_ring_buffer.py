@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+'''Vergleicht die Zeit, die der Callback der Netfilter-Queue pro Paket bis zum Verdict braucht, wenn
+direkt dekodiert wird bzw. wenn das Paket nur in einen `PacketRingBuffer` kopiert und in einem
+eigenen Thread dekodiert wird.
+
+Dekodiert wird wie in `ProtocolReceiveAdapterNFQ.decode()` mit Scapy bzw. mit `l4_payload`
+(`RAW`), jeweils mit `MinimalMicroProtocolReceive`. Die Netfilter-Queue selbst wird nicht genutzt,
+die Ausgabe des PacketHandlers wird nach /dev/null umgeleitet.
+
+Aufruf: python benchmarks/bench_ring_buffer.py [Anzahl Pakete]
+'''
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+
+from scapy.all import IP, UDP, Raw
+
+from ccframework import PacketRingBuffer, ProtocolReceiveAdapter, MinimalMicroProtocolReceive, PacketHandlerReceiveFixedPositionPayload, l4_payload
+
+class ProtocolReceiveAdapterBench(ProtocolReceiveAdapter):
+    def __init__(self, raw):
+        super().__init__(MinimalMicroProtocolReceive(slice_size=2))
+        self.packet_handler = PacketHandlerReceiveFixedPositionPayload(start_index=4, slice_size=2)
+        self.raw = raw
+
+    def receive(self) -> bytes:
+        return self.buffer.finalize()
+
+    def decode(self, payload_bytes: bytes):
+        if self.raw:
+            payload = l4_payload(memoryview(payload_bytes))
+            if payload is not None:
+                self.handle_received_data(self.packet_handler.handle_payload(payload))
+        else:
+            self.handle_received_data(self.packet_handler.handle_packet(IP(payload_bytes)))
+
+def create_packets(count: int) -> [bytes]:
+    packets = []
+    for i in range(count):
+        payload = bytearray(random.randbytes(64))
+        payload[4:6] = b'\x00\x00' if i in (0, count - 1) else b'\x01\x01'
+        packets.append(bytes(IP()/UDP(sport=40000, dport=40001)/Raw(bytes(payload))))
+    return packets
+
+def inline(adapter, packets) -> float:
+    start = time.perf_counter()
+    for packet in packets:
+        adapter.decode(packet)
+    return time.perf_counter() - start
+
+def decoupled(adapter, packets) -> float:
+    ring = PacketRingBuffer(slots=len(packets))
+    def decode_loop():
+        for i in range(len(packets)):
+            adapter.decode(ring.get())
+    decoder = threading.Thread(target=decode_loop)
+    decoder.start()
+    try:
+        start = time.perf_counter()
+        for packet in packets:
+            ring.put(packet)
+        duration = time.perf_counter() - start
+        decoder.join()
+    finally:
+        ring.close()
+    return duration
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    packets = create_packets(count)
+    print(f"{'Handler':>8} {'direkt [µs]':>12} {'Ringpuffer [µs]':>16}")
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        rows = []
+        for raw in [False, True]:
+            direct_adapter = ProtocolReceiveAdapterBench(raw)
+            direct = inline(direct_adapter, packets)
+            ring_adapter = ProtocolReceiveAdapterBench(raw)
+            ring = decoupled(ring_adapter, packets)
+            assert(ring_adapter.receive() == direct_adapter.receive())
+            rows.append((raw, direct, ring))
+    for raw, direct, ring in rows:
+        print(f"{'RAW' if raw else 'Scapy':>8} {direct / count * 1e6:>12.2f} {ring / count * 1e6:>16.2f}")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+'''Vergleicht die Laufzeit von `SimpleBitSlicer.slice` mit der bisherigen Implementierung, die
+Stücke einzeln aus einem `ConstBitStream` gelesen hat.
+
+Aufruf: python benchmarks/bench_slicer.py [Größe in Bytes]
+'''
+import random
+import sys
+import time
+
+from bitstring import Bits, ConstBitStream, ReadError
+
+from ccframework import SimpleBitSlicer
+
+def slice_bitstream(slicer: SimpleBitSlicer, data: Bits) -> [Bits]:
+    '''Bisherige Implementierung von `SimpleBitSlicer.slice` als Referenz'''
+    buf = ConstBitStream(data)
+    slices = list()
+    while True:
+        try:
+            bitstream_part = buf.read(f"bits{slicer.slice_size}")
+            slices.append(bitstream_part)
+        except ReadError as e:
+            rest = buf.read('bits')
+            if len(rest) > 0:
+                pad_length = slicer.slice_size-len(rest)
+                pad = slicer.padding[:pad_length]
+                slices.append(rest+pad)
+            break
+    return slices
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1 << 20
+    data = Bits(random.randbytes(size))
+    print(f"{'slice_size':>10} {'slices':>9} {'bitstream [s]':>14} {'slice [s]':>10} {'speedup':>8}")
+    for slice_size in [7, 8, 13, 32, 64, 512]:
+        slicer = SimpleBitSlicer(slice_size=slice_size, padding=Bits(slice_size))
+        t_old, expected = measure(slice_bitstream, slicer, data)
+        t_new, actual = measure(slicer.slice, data)
+        assert actual == expected
+        print(f"{slice_size:>10} {len(actual):>9} {t_old:>14.3f} {t_new:>10.3f} {t_old/t_new:>7.1f}x")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+'''Misst den Durchsatz von `DataPreProcessorXOR` für verschiedene Schlüssellängen und Datenmengen.
+
+Aufruf: python benchmarks/bench_xor.py [Größe in MiB ...]
+'''
+import os
+import sys
+import time
+
+from ccframework import DataPreProcessorXOR
+
+def throughput(processor: DataPreProcessorXOR, data: bytes) -> float:
+    start = time.perf_counter()
+    processor.preprocess(data)
+    return len(data) / (time.perf_counter() - start) / (1 << 20)
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 16, 256]
+    keys = [b'\x5a', os.urandom(3), os.urandom(16), os.urandom(1000)]
+    print(f"{'MiB':>6} {'key':>5} {'copy [MiB/s]':>13} {'inplace [MiB/s]':>16}")
+    for size in sizes:
+        data = os.urandom(size << 20)
+        for key in keys:
+            copy = throughput(DataPreProcessorXOR(key), data)
+            inplace = throughput(DataPreProcessorXOR(key, inplace=True), bytearray(data))
+            print(f"{size:>6} {len(key):>5} {copy:>13.0f} {inplace:>16.0f}")
@@ -1,9 +1,10 @@
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from functools import cached_property
+import threading
 
 from bitstring import Bits
 
-from ccframework import ProtocolReceiveAdapter, MinimalMicroProtocolReceive, CCReceiver, TransmissionState
+from ccframework import ProtocolReceiveAdapter, SelectiveRepeatMicroProtocolReceive, CCReceiver, TransmissionState
 
 #!/usr/bin/env python3
 if __name__ != '__main__':
@@ -15,23 +16,27 @@ class CovertHTTPHandler(BaseHTTPRequestHandler):
         content_length = int(self.headers.get("Content-Length", 0))
         post_body = self.rfile.read(content_length)
         print(f"received post body: {post_body}")
-        RECEIVE_ADAPTER.handle_received_data(Bits(post_body))
+        # parallele Anfragen werden in eigenen Threads bearbeitet, Mikroprotokoll und Puffer aber
+        # nur nacheinander
+        with RECEIVE_LOCK:
+            ack = RECEIVE_ADAPTER.handle_received_data(Bits(post_body))
         self.send_response(200)
         self.end_headers()
-        self.wfile.write(bytes())
+        self.wfile.write(ack.tobytes() if ack is not None else bytes())
 
 class ProtocolReceiveAdapterHTTP(ProtocolReceiveAdapter):
     def receive(self) -> bytes:
-        webServer = HTTPServer(("localhost", 8080), CovertHTTPHandler)
+        webServer = ThreadingHTTPServer(("localhost", 8080), CovertHTTPHandler)
         try:
             webServer.serve_forever()
         except:
             pass
         webServer.server_close()
-        return self.buffer.tobytes()
+        return self.buffer.finalize()
 
-mp = MinimalMicroProtocolReceive(slice_size=4)
+mp = SelectiveRepeatMicroProtocolReceive(slice_size=4)
 RECEIVE_ADAPTER = ProtocolReceiveAdapterHTTP(microprotocol=mp)
+RECEIVE_LOCK = threading.Lock()
 ccreceiver = CCReceiver([], RECEIVE_ADAPTER)
 received = ccreceiver.receive()
 
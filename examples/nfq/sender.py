@@ -11,7 +11,7 @@ from scapy.all import *
 class PacketHandlerSendReplaceUDPayload(PacketHandlerSend):
     def handle_packet(self, packet):
         if UDP in packet and Raw in packet:
-            bits_to_send = self.send_buffer.pop(0)
+            bits_to_send = self.next_slice()
             packet[UDP].payload = Raw(bits_to_send.tobytes())
 
 mp = MinimalMicroProtocolSend(slice_size=4, padding=Bits(bytes(4)))
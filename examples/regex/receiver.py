@@ -4,15 +4,15 @@ if __name__ != '__main__':
 
 from bitstring import Bits
 
-from ccframework import CCReceiver, MinimalMicroProtocolReceive, PacketHandlerReceiveRegexPayload, DataPostProcessorBase64
+from ccframework import CCReceiver, MinimalMicroProtocolReceive, PacketHandlerReceiveRegexPayload, DataPostProcessorAlphabet
 from ccframework.nfq import ProtocolReceiveAdapterNFQ
         
-post_b64 = DataPostProcessorBase64()
-mp = MinimalMicroProtocolReceive(slice_size=4)
+post_alphabet = DataPostProcessorAlphabet(b'567890', padding=b'\x00')
+mp = MinimalMicroProtocolReceive(slice_size=6)
 ph = PacketHandlerReceiveRegexPayload(regex=r'1234(.*)abcdefg')
 adap = ProtocolReceiveAdapterNFQ(queue_id=1, packet_handler=ph,  microprotocol=mp)
 
-ccreceiver = CCReceiver([post_b64], adap)
+ccreceiver = CCReceiver([post_alphabet], adap)
 received = ccreceiver.receive()
 
 print(received.decode("utf-8"))
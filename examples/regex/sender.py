@@ -3,13 +3,16 @@ if __name__ != '__main__':
     exit()
 
 from bitstring import Bits
-from ccframework import CCSender, DataPreProcessorBase64, MinimalMicroProtocolSend, PacketHandlerSendRegexPayload
+from ccframework import CCSender, DataPreProcessorAlphabet, MinimalMicroProtocolSend, PacketHandlerSendRegexPayload
 from ccframework.nfq import ProtocolSendAdapterNFQ
 
-pre_b64 = DataPreProcessorBase64()
-mp = MinimalMicroProtocolSend(slice_size=4, padding=Bits(bytes(4)))
+# nur Zeichen, die der reguläre Ausdruck [567890]+ wieder erkennt
+pre_alphabet = DataPreProcessorAlphabet(b'567890')
+# sechs Zeichen pro Paket, also das gesamte Feld "567890" des Overt Traffic. Das letzte Stück wird
+# mit Null-Bytes aufgefüllt, die der Empfänger vor dem Dekodieren entfernt.
+mp = MinimalMicroProtocolSend(slice_size=6, padding=Bits(bytes(6)))
 ph = PacketHandlerSendRegexPayload(regex=r'[567890]+')
 adap = ProtocolSendAdapterNFQ(queue_id=0, packet_handler=ph, microprotocol=mp)
 
-cc_sender = CCSender([pre_b64], adap)
+cc_sender = CCSender([pre_alphabet], adap)
 cc_sender.send(b'Hello World')
@@ -13,8 +13,7 @@ p_b64 = DataPostProcessorBase64()
 adap = ProtocolReceiveAdapterNFQ(queue_id=1, packet_handler=ph,  microprotocol=mp)
 
 ccreceiver = CCReceiver([p_b64], adap)
-received_data = ccreceiver.receive()
-
 
 with open("received.pcap", "wb") as out_file:
-    out_file.write(received_data)
+    for received_data in ccreceiver.receive_stream():
+        out_file.write(received_data)
@@ -15,5 +15,4 @@ adap = ProtocolSendAdapterNFQ(queue_id=0, packet_handler=ph, microprotocol=mp)
 cc_sender = CCSender([p_b64], adap)
 
 with open("../pcap/covert_channel_result_filtered.pcap", "rb") as in_file:
-    file_data = in_file.read()
-    cc_sender.send(file_data)
+    cc_sender.send_stream(in_file)
@@ -1,8 +1,10 @@
+from .bit_accumulator import *
 from .data_processor import *
 from .micro_protocol import *
 from .packet_handler import *
 from .protocol_adapter import *
 from .receiver import *
+from .ring_buffer import *
 from .sender import *
 from .slicer import *
 from .pcap import *
\ No newline at end of file
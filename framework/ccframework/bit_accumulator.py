@@ -0,0 +1,122 @@
+from bitstring import Bits
+
+class BitAccumulator:
+    '''Empfangspuffer, an den Bits in linearer Zeit angehängt werden können.
+
+    Vollständige Bytes werden in einem `bytearray` gesammelt, Bits, die noch kein vollständiges Byte
+    ergeben, in einem Übertrag (`carry`) zwischengespeichert. Dadurch werden auch Stücke, deren Länge
+    kein Vielfaches von 8 ist, ohne Kopie des gesamten Puffers angehängt.
+
+    Ist die Länge der Übertragung vorab bekannt, kann mit `reserve()` Platz vorab reserviert werden.
+    Das `bytearray` ist dann ggf. länger als sein Inhalt, dessen Länge in `_size` steht. Da die Länge
+    meist aus der Übertragung selbst stammt, wird pro Aufruf höchstens `max_reserve` Bits reserviert.
+    '''
+    MAX_RESERVE = 2**26
+
+    def __init__(self, max_reserve: int=MAX_RESERVE):
+        '''Erstellt einen BitAccumulator
+
+        Parameters:
+            max_reserve (int): Obergrenze für `reserve()` in Bits, standardmäßig 8 MiB
+        '''
+        self.max_reserve = max_reserve
+        self._bytes = bytearray()
+        self._size = 0
+        self._carry = 0
+        self._carry_bits = 0
+
+    def reserve(self, bits: int):
+        '''Reserviert Platz für die angegebene Anzahl weiterer Bits, sodass diese ohne erneute
+        Speicherzuweisung angehängt werden können.
+
+        Parameters:
+            bits (int): Anzahl an Bits, die voraussichtlich noch angehängt werden, höchstens
+                `max_reserve`
+        '''
+        bits = min(bits, self.max_reserve)
+        missing = self._size + (self._carry_bits + bits) // 8 - len(self._bytes)
+        if missing > 0:
+            self._bytes += bytes(missing)
+
+    def _extend(self, data: bytes):
+        end = self._size + len(data)
+        self._bytes[self._size:end] = data
+        self._size = end
+
+    def append(self, data: Bits):
+        '''Hängt Bits an den Puffer an.
+
+        Parameters:
+            data (Bits): anzuhängende Bits
+        '''
+        length = len(data)
+        if length == 0:
+            return
+        data_bytes = data.tobytes()
+        if self._carry_bits == 0 and length % 8 == 0:
+            self._extend(data_bytes)
+            return
+
+        # `tobytes()` füllt das letzte Byte mit Null-Bits auf, diese werden wieder entfernt
+        self.append_int(int.from_bytes(data_bytes, 'big') >> (-length % 8), length)
+
+    def append_int(self, value: int, length: int):
+        '''Hängt die `length` niederwertigsten Bits einer Ganzzahl an den Puffer an, ohne ein
+        `Bits`-Objekt zu erzeugen.
+
+        Parameters:
+            value (int): anzuhängende Bits als vorzeichenlose Ganzzahl, höchstwertiges Bit zuerst
+            length (int): Anzahl der anzuhängenden Bits
+        '''
+        if length == 0:
+            return
+        if self._carry_bits == 0 and length == 8 and self._size < len(self._bytes):
+            # Einzelne Bytes direkt in reservierten Platz schreiben
+            self._bytes[self._size] = value
+            self._size += 1
+            return
+        value = (self._carry << length) | value
+        total = self._carry_bits + length
+        rest = total % 8
+        if total >= 8:
+            self._extend((value >> rest).to_bytes(total // 8, 'big'))
+        self._carry = value & ((1 << rest) - 1)
+        self._carry_bits = rest
+
+    def __iadd__(self, data: Bits):
+        self.append(data)
+        return self
+
+    def __len__(self) -> int:
+        '''Anzahl der Bits im Puffer'''
+        return self._size * 8 + self._carry_bits
+
+    def _carry_byte(self) -> bytes:
+        if self._carry_bits == 0:
+            return b''
+        return (self._carry << (8 - self._carry_bits)).to_bytes(1, 'big')
+
+    def tobytes(self) -> bytes:
+        '''Liefert eine Kopie des Pufferinhalts, wobei ein unvollständiges letztes Byte wie bei
+        `Bits.tobytes()` mit Null-Bits aufgefüllt wird.
+        '''
+        return bytes(memoryview(self._bytes)[:self._size]) + self._carry_byte()
+
+    def drain(self) -> bytes:
+        '''Entnimmt alle vollständigen Bytes aus dem Puffer. Bits, die noch kein vollständiges Byte
+        ergeben, verbleiben im Puffer.
+        '''
+        data = bytes(memoryview(self._bytes)[:self._size])
+        self._bytes = bytearray()
+        self._size = 0
+        return data
+
+    def finalize(self) -> bytes:
+        '''Schließt den Empfang ab und liefert den Pufferinhalt zurück.
+
+        Ein unvollständiges letztes Byte wird dabei mit Null-Bits aufgefüllt. Anschließend ist der
+        Puffer wieder leer.
+        '''
+        data = self.tobytes()
+        self.__init__(self.max_reserve)
+        return data
@@ -2,8 +2,15 @@ from abc import ABC
 from abc import abstractmethod
 
 import base64
+import bz2
+import lzma
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
 
 from Cryptodome.Cipher import AES
+import numpy as np
 
 class DataPreProcessor(ABC):
     ''' Vorverarbeitung von Daten vor dem Versenden
@@ -11,22 +18,90 @@ class DataPreProcessor(ABC):
     Methods:
         preprocess(self, data: bytes)
             Führt die Vorverarbeitung der Daten durch.
+        update(self, chunk: bytes)
+            Führt die Vorverarbeitung für einen Abschnitt der Daten durch.
+        finalize(self)
+            Schließt die abschnittsweise Vorverarbeitung ab.
     '''
+    _stream_buffer = None
+
     @abstractmethod
     def preprocess(self, data: bytes) -> bytes:
         pass
 
+    def update(self, chunk: bytes) -> bytes:
+        '''Verarbeitet den nächsten Abschnitt der Daten und liefert die Teile des Ergebnisses, die
+        bereits feststehen.
+
+        Standardmäßig werden alle Abschnitte gesammelt und erst bei `finalize()` an `preprocess()`
+        übergeben. Implementierungen, die Abschnitte direkt verarbeiten können, überschreiben
+        `update()` und `finalize()`.
+
+        Parameters:
+            chunk (bytes): nächster Abschnitt der Daten
+        Returns:
+            verarbeitete Daten, ggf. leer
+        '''
+        if self._stream_buffer is None:
+            self._stream_buffer = bytearray()
+        self._stream_buffer += chunk
+        return b''
+
+    def finalize(self) -> bytes:
+        '''Schließt die abschnittsweise Verarbeitung ab und liefert die restlichen Daten.
+
+        Returns:
+            verarbeitete Daten, ggf. leer
+        '''
+        data = bytes(self._stream_buffer or b'')
+        self._stream_buffer = None
+        return self.preprocess(data)
+
 class DataPostProcessor(ABC):
     ''' Nachverarbeitung von Daten nach dem Empfangen
 
     Methods:
         postprocess(self, data: bytes)
             Führt die Nachverarbeitung der Daten durch.
+        update(self, chunk: bytes)
+            Führt die Nachverarbeitung für einen Abschnitt der Daten durch.
+        finalize(self)
+            Schließt die abschnittsweise Nachverarbeitung ab.
     '''
+    _stream_buffer = None
+
     @abstractmethod
     def postprocess(self, data: bytes) -> bytes:
         pass
 
+    def update(self, chunk: bytes) -> bytes:
+        '''Verarbeitet den nächsten Abschnitt der Daten und liefert die Teile des Ergebnisses, die
+        bereits feststehen.
+
+        Standardmäßig werden alle Abschnitte gesammelt und erst bei `finalize()` an `postprocess()`
+        übergeben. Implementierungen, die Abschnitte direkt verarbeiten können, überschreiben
+        `update()` und `finalize()`.
+
+        Parameters:
+            chunk (bytes): nächster Abschnitt der Daten
+        Returns:
+            verarbeitete Daten, ggf. leer
+        '''
+        if self._stream_buffer is None:
+            self._stream_buffer = bytearray()
+        self._stream_buffer += chunk
+        return b''
+
+    def finalize(self) -> bytes:
+        '''Schließt die abschnittsweise Verarbeitung ab und liefert die restlichen Daten.
+
+        Returns:
+            verarbeitete Daten, ggf. leer
+        '''
+        data = bytes(self._stream_buffer or b'')
+        self._stream_buffer = None
+        return self.postprocess(data)
+
 class DataPreProcessorBase64(DataPreProcessor):
     ''' Vorverarbeitung, die dazu genutzt wird, Daten in base64 zu kodieren
     '''
@@ -38,7 +113,24 @@ class DataPreProcessorBase64(DataPreProcessor):
             Base64-kodierte Daten
         '''
         return base64.b64encode(data)
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Kodiert alle vollständigen Gruppen von 3 Bytes, der Rest wird mit dem nächsten Abschnitt
+        kodiert.
+        '''
+        data = (self._stream_buffer or b'') + chunk
+        usable = len(data) - len(data) % 3
+        self._stream_buffer = data[usable:]
+        return base64.b64encode(data[:usable])
+
+    def finalize(self) -> bytes:
+        data = self._stream_buffer or b''
+        self._stream_buffer = None
+        return base64.b64encode(data)
     
+# Zeichen, die bei der Base64-Dekodierung ignoriert werden
+_BASE64_IGNORED = re.compile(rb'[^A-Za-z0-9+/=]')
+
 class DataPostProcessorBase64(DataPostProcessor):
     ''' Nachverarbeitung, die dazu genutzt wird, Daten in base64 zu dekodieren
     '''
@@ -51,33 +143,197 @@ class DataPostProcessorBase64(DataPostProcessor):
         '''
         return base64.b64decode(data)
 
+    def update(self, chunk: bytes) -> bytes:
+        '''Dekodiert alle vollständigen Gruppen von 4 Zeichen, der Rest wird mit dem nächsten
+        Abschnitt dekodiert.
+
+        Wie bei `postprocess()` werden Zeichen außerhalb des Base64-Alphabets ignoriert.
+        '''
+        data = (self._stream_buffer or b'') + _BASE64_IGNORED.sub(b'', chunk)
+        usable = len(data) - len(data) % 4
+        self._stream_buffer = data[usable:]
+        return base64.b64decode(data[:usable])
+
+    def finalize(self) -> bytes:
+        data = self._stream_buffer or b''
+        self._stream_buffer = None
+        return base64.b64decode(data)
+
+def _xor_key(key: Union[int, bytes]) -> bytes:
+    if isinstance(key, int):
+        assert(0 <= key < 256)
+        return bytes([key])
+    assert(len(key) > 0)
+    return bytes(key)
+
+# Größe der Blöcke, in denen längere Schlüssel mit NumPy verknüpft werden
+_XOR_BLOCK_SIZE = 4096
+
+def _xor(data: bytes, key: bytes, inplace: bool=False, phase: int=0) -> bytes:
+    '''Verknüpft `data` mit dem sich wiederholenden `key` per XOR.
+
+    Die Verknüpfung erfolgt blockweise mit NumPy. Ist `inplace` gesetzt und `data` ein `bytearray`,
+    werden die Daten direkt darin verändert.
+
+    Parameters:
+        data (bytes): Daten, die verknüpft werden sollen
+        key (bytes): Schlüssel, der über die Daten wiederholt wird
+        inplace (bool): Daten in einem übergebenen `bytearray` direkt verändern
+        phase (int): Position im Schlüssel, mit der das erste Byte verknüpft wird
+    Returns:
+        verknüpfte Daten
+    '''
+    inplace = inplace and isinstance(data, bytearray)
+    phase %= len(key)
+    key = key[phase:] + key[:phase]
+    # Schlüssel auf einen längeren Block wiederholen, damit NumPy zusammenhängende Zeilen verknüpft
+    key_array = np.tile(np.frombuffer(key, dtype=np.uint8), max(1, _XOR_BLOCK_SIZE // len(key)))
+    data_array = np.frombuffer(data, dtype=np.uint8)
+    if inplace:
+        result = data_array
+    else:
+        result = np.empty_like(data_array)
+    full = len(data_array) - len(data_array) % len(key_array)
+    block_shape = (-1, len(key_array))
+    np.bitwise_xor(data_array[:full].reshape(block_shape), key_array, out=result[:full].reshape(block_shape))
+    rest = len(data_array) - full
+    np.bitwise_xor(data_array[full:], key_array[:rest], out=result[full:])
+    if inplace:
+        return data
+    return result.tobytes()
+
 class DataPreProcessorXOR(DataPreProcessor):
     '''Vorverarbeitung, die dazu genutzt wird, Daten mit XOR zu kodieren
+
+    Der Schlüssel kann ein einzelnes Byte oder eine Bytefolge sein, die über die gesamten Daten
+    wiederholt wird.
     '''
     
-    def __init__(self, key: int):
-        self.key = key
+    def __init__(self, key: Union[int, bytes], inplace: bool=False):
+        '''Erstellt einen Vorverarbeiter für die Kodierung mit XOR
+
+        Parameters:
+            key (int | bytes): Schlüssel, entweder ein einzelnes Byte als `int` oder eine Bytefolge
+            inplace (bool): übergebene `bytearray`-Objekte direkt verändern, statt eine Kopie zu erstellen
+        '''
+        self.key = _xor_key(key)
+        self.inplace = inplace
+        self._phase = 0
 
     def preprocess(self, data: bytes) -> bytes:
-        buffer = bytes()
-        for b in data:
-            b_xored = b ^ self.key
-            buffer += b_xored.to_bytes(1,"little")
-        return data_xored
+        '''Verknüpft die Daten per XOR mit dem Schlüssel
+        
+        Parameters:
+            data (bytes): Daten, die kodiert werden sollen
+        Returns:
+            Kodierte Daten
+        '''
+        return _xor(data, self.key, self.inplace)
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Verknüpft den nächsten Abschnitt der Daten per XOR mit dem Schlüssel, wobei die Position
+        im Schlüssel vom vorherigen Abschnitt fortgesetzt wird.
+        '''
+        phase = self._phase
+        self._phase = (phase + len(chunk)) % len(self.key)
+        return _xor(chunk, self.key, self.inplace, phase)
 
-class DataPostProcessorXOR(DataPreProcessorXOR):
+    def finalize(self) -> bytes:
+        self._phase = 0
+        return b''
+
+class DataPostProcessorXOR(DataPostProcessor):
     '''Nachverarbeitung, die dazu genutzt wird, Daten mit XOR zu dekodieren
     '''
     
-    def __init__(self, key: int):
+    def __init__(self, key: Union[int, bytes], inplace: bool=False):
+        '''Erstellt einen Nachverarbeiter für die Dekodierung mit XOR
+
+        Parameters:
+            key (int | bytes): Schlüssel, entweder ein einzelnes Byte als `int` oder eine Bytefolge
+            inplace (bool): übergebene `bytearray`-Objekte direkt verändern, statt eine Kopie zu erstellen
+        '''
+        self.key = _xor_key(key)
+        self.inplace = inplace
+        self._phase = 0
+
+    def postprocess(self, data: bytes) -> bytes:
+        '''Verknüpft die Daten per XOR mit dem Schlüssel
+        
+        Parameters:
+            data (bytes): Daten, die dekodiert werden sollen
+        Returns:
+            Dekodierte Daten
+        '''
+        return _xor(data, self.key, self.inplace)
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Verknüpft den nächsten Abschnitt der Daten per XOR mit dem Schlüssel, wobei die Position
+        im Schlüssel vom vorherigen Abschnitt fortgesetzt wird.
+        '''
+        phase = self._phase
+        self._phase = (phase + len(chunk)) % len(self.key)
+        return _xor(chunk, self.key, self.inplace, phase)
+
+    def finalize(self) -> bytes:
+        self._phase = 0
+        return b''
+
+class _AESCTRKeystream:
+    '''AES Counter Mode, der an beliebigen Positionen des Datenstroms fortgesetzt werden kann.
+
+    Im Counter Mode hängt jeder Block nur vom Zähler an seiner Position ab. Für eine Position
+    `offset` wird der Zähler daher um `offset // 16` erhöht, wobei er wie bei pycryptodome auf die
+    Länge des Zählerteils überläuft, und der Rest des angefangenen Blocks übersprungen. Große Daten
+    werden so in Abschnitte aufgeteilt, die parallel in einem Thread-Pool verarbeitet werden;
+    pycryptodome gibt dabei den GIL frei. Das Ergebnis ist identisch mit der Verarbeitung durch ein
+    einzelnes Cipher-Objekt. Der Thread-Pool wird beim ersten Bedarf erstellt, für alle weiteren
+    Abschnitte wiederverwendet und mit `close()` beendet.
+    '''
+
+    def __init__(self, key: bytes, aes_iv: bytes, aes_nonce: bytes, workers: int, chunk_size: int):
+        assert(workers >= 1)
+        assert(chunk_size > 0 and chunk_size % AES.block_size == 0)
         self.key = key
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cipher = AES.new(key, AES.MODE_CTR, initial_value=aes_iv, nonce=aes_nonce)
+        self.nonce = self.cipher.nonce
+        self.initial_value = int.from_bytes(aes_iv, 'big') if aes_iv else 0
+        self.counter_modulus = 1 << (8 * (AES.block_size - len(self.nonce)))
+        self.offset = 0
+        self._executor = None
 
-    def preprocess(self, data: bytes) -> bytes:
-        buffer = bytes()
-        for b in data:
-            b_xored = b ^ self.key
-            buffer += b_xored.to_bytes(1,"little")
-        return data_xored
+    def cipher_at(self, offset: int):
+        cipher = AES.new(self.key, AES.MODE_CTR, nonce=self.nonce,
+            initial_value=(self.initial_value + offset // AES.block_size) % self.counter_modulus)
+        cipher.encrypt(bytes(offset % AES.block_size))
+        return cipher
+
+    def seek(self, offset: int):
+        assert(offset >= 0)
+        self.cipher = self.cipher_at(offset)
+        self.offset = offset
+
+    def process(self, data: bytes) -> bytes:
+        if self.workers == 1 or len(data) <= self.chunk_size:
+            self.offset += len(data)
+            return self.cipher.encrypt(data)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        view = memoryview(data)
+        offsets = range(0, len(data), self.chunk_size)
+        chunks = self._executor.map(lambda pos: self.cipher_at(self.offset + pos).encrypt(view[pos:pos+self.chunk_size]), offsets)
+        result = b''.join(chunks)
+        self.seek(self.offset + len(data))
+        return result
+
+    def close(self):
+        '''Beendet den Thread-Pool, falls einer erstellt wurde. Er wird bei Bedarf neu erstellt.'''
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
 class DataPreProcessorAESCTR(DataPreProcessor):
     '''Vorverarbeitung, die dazu genutzt wird, Daten mit AES Counter Mode zu verschlüsseln.
@@ -86,7 +342,7 @@ class DataPreProcessorAESCTR(DataPreProcessor):
     https://www.pycryptodome.org/src/cipher/classic#ctr-mode
     '''
 
-    def __init__(self, key: bytes, aes_iv: bytes, aes_nonce: bytes):
+    def __init__(self, key: bytes, aes_iv: bytes, aes_nonce: bytes, workers: int = 1, chunk_size: int = 1<<20):
         '''Erstellt einen Vorverarbeiter für die Verschlüsselung mit AES Counter Mode
         
         Für Parameter aes_iv bzw. aes_nonce siehe:
@@ -96,6 +352,8 @@ class DataPreProcessorAESCTR(DataPreProcessor):
             key (bytes): Schlüssel, der zur Verschlüsselung eingesetzt werden soll
             aes_iv (bytes): initial_value, wie er an pycryptodome übergeben wird
             aes_nonce (bytes): nonce, wie sie an pycryptodome übergeben wird
+            workers (int): Anzahl an Threads, mit denen Daten größer als chunk_size verschlüsselt werden
+            chunk_size (int): Größe der parallel verschlüsselten Abschnitte, Vielfaches von 16
 
             len(aes_iv)+len(nonce) == 16
         '''
@@ -105,7 +363,7 @@ class DataPreProcessorAESCTR(DataPreProcessor):
             assert(len(aes_iv) == 16)
         else:
             assert(len(aes_iv) + len(aes_nonce) == 16)
-        self.cipher = AES.new(key, AES.MODE_CTR, initial_value=aes_iv, nonce=aes_nonce)
+        self.keystream = _AESCTRKeystream(key, aes_iv, aes_nonce, workers, chunk_size)
 
     def preprocess(self, data: bytes) -> bytes:
         '''Verschlüsselt übergebene Daten mit AES Counter Mode
@@ -117,11 +375,29 @@ class DataPreProcessorAESCTR(DataPreProcessor):
         Returns:
             Verschlüsselte Daten
         '''
-        return self.cipher.encrypt(data)
+        return self.keystream.process(data)
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Verschlüsselt den nächsten Abschnitt der Daten. Der Zähler wird dabei vom vorherigen Abschnitt
+        fortgesetzt.
+        '''
+        return self.keystream.process(chunk)
+
+    def finalize(self) -> bytes:
+        self.keystream.close()
+        return b''
+
+    def seek(self, offset: int):
+        '''Setzt die Verschlüsselung an einer beliebigen Position des Datenstroms fort.
+
+        Parameters:
+            offset (int): Position in Bytes, ab der die nächsten Daten verschlüsselt werden
+        '''
+        self.keystream.seek(offset)
 
 class DataPostProcessorAESCTR(DataPostProcessor):
 
-    def __init__(self, key: bytes, aes_iv: bytes, aes_nonce: bytes):
+    def __init__(self, key: bytes, aes_iv: bytes, aes_nonce: bytes, workers: int = 1, chunk_size: int = 1<<20):
         '''Erstellt einen Nachverarbeiter für die Entschlüsselung mit AES Counter Mode
         
         Für Parameter aes_iv bzw. aes_nonce siehe:
@@ -131,10 +407,12 @@ class DataPostProcessorAESCTR(DataPostProcessor):
             key (bytes): Schlüssel, der zur Verschlüsselung eingesetzt werden soll
             aes_iv (bytes): initial_value, wie er an pycryptodome übergeben wird
             aes_nonce (bytes): nonce, wie sie an pycryptodome übergeben wird
+            workers (int): Anzahl an Threads, mit denen Daten größer als chunk_size entschlüsselt werden
+            chunk_size (int): Größe der parallel entschlüsselten Abschnitte, Vielfaches von 16
 
             len(aes_iv)+len(nonce) == 16
         '''
-        self.cipher = AES.new(key, AES.MODE_CTR, initial_value=aes_iv, nonce=aes_nonce)
+        self.keystream = _AESCTRKeystream(key, aes_iv, aes_nonce, workers, chunk_size)
 
     def postprocess(self, data: bytes) -> bytes:
         '''Entschlüsselt übergebene Daten mit AES Counter Mode
@@ -146,4 +424,467 @@ class DataPostProcessorAESCTR(DataPostProcessor):
         Returns:
             Entschlüsselte Daten
         '''
-        return self.cipher.decrypt(data)
+        return self.keystream.process(data)
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Entschlüsselt den nächsten Abschnitt der Daten. Der Zähler wird dabei vom vorherigen Abschnitt
+        fortgesetzt.
+        '''
+        return self.keystream.process(chunk)
+
+    def finalize(self) -> bytes:
+        self.keystream.close()
+        return b''
+
+    def seek(self, offset: int):
+        '''Setzt die Entschlüsselung an einer beliebigen Position des Datenstroms fort.
+
+        So können Abschnitte, die in anderer Reihenfolge ankommen, einzeln entschlüsselt werden.
+
+        Parameters:
+            offset (int): Position in Bytes, an der die nächsten Daten im Datenstrom stehen
+        '''
+        self.keystream.seek(offset)
+
+class _NoCompression:
+    '''Platzhalter mit der Schnittstelle der Kompressoren aus der Standardbibliothek, der Daten
+    unverändert lässt.'''
+    def compress(self, data: bytes) -> bytes:
+        return bytes(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return bytes(data)
+
+    def flush(self) -> bytes:
+        return b''
+
+# Wörterbuchgröße für LZMA, muss bei Kompression und Dekompression übereinstimmen
+_LZMA_DICT_SIZE = 1 << 23
+
+# Codecs für DataPreProcessorCompress bzw. DataPostProcessorDecompress. Die Position in der Liste
+# entspricht dem Byte, das die Auswahl im Header kennzeichnet. Es werden jeweils die Formate ohne
+# Container (raw) verwendet, um keine zusätzlichen Bytes zu übertragen.
+_COMPRESSION_CODECS = [
+    ('none',
+        lambda level: _NoCompression(),
+        lambda: _NoCompression()),
+    ('zlib',
+        lambda level: zlib.compressobj(level, zlib.DEFLATED, -15, 9),
+        lambda: zlib.decompressobj(-15)),
+    ('bz2',
+        lambda level: bz2.BZ2Compressor(level),
+        lambda: bz2.BZ2Decompressor()),
+    ('lzma',
+        lambda level: lzma.LZMACompressor(format=lzma.FORMAT_RAW, filters=[{'id': lzma.FILTER_LZMA2, 'preset': level, 'dict_size': _LZMA_DICT_SIZE}]),
+        lambda: lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=[{'id': lzma.FILTER_LZMA2, 'dict_size': _LZMA_DICT_SIZE}])),
+]
+_COMPRESSION_CODEC_IDS = {name: codec_id for codec_id, (name, _, _) in enumerate(_COMPRESSION_CODECS)}
+
+class DataPreProcessorCompress(DataPreProcessor):
+    '''Vorverarbeitung, die Daten mit zlib, bz2 oder lzma aus der Standardbibliothek komprimiert.
+
+    Dem Ergebnis wird ein Byte vorangestellt, das den verwendeten Codec kennzeichnet. Der Empfänger
+    (`DataPostProcessorDecompress`) benötigt daher keine Konfiguration.
+
+    Im Modus `auto` werden alle Codecs auf einer Stichprobe der Daten ausprobiert und derjenige
+    gewählt, der die wenigsten Bytes erzeugt. Sind die Daten nicht komprimierbar, werden sie
+    unverändert übertragen (`none`).
+    '''
+    NONE = 'none'
+    ZLIB = 'zlib'
+    BZ2 = 'bz2'
+    LZMA = 'lzma'
+    AUTO = 'auto'
+    ALLOWED_CODECS = [NONE, ZLIB, BZ2, LZMA, AUTO]
+
+    def __init__(self, codec: str='auto', level: int=9, sample_size: int=1 << 16):
+        '''Erstellt einen Vorverarbeiter für die Kompression
+
+        Parameters:
+            codec (str): zu verwendender Codec, entweder 'none', 'zlib', 'bz2', 'lzma' oder 'auto'
+            level (int): Kompressionsstufe von 1 bis 9
+            sample_size (int): Größe der Stichprobe in Bytes, anhand derer im Modus 'auto' der
+                Codec ausgewählt wird. Kleinere Daten werden vollständig mit allen Codecs komprimiert.
+        '''
+        assert(codec in self.ALLOWED_CODECS)
+        assert(1 <= level <= 9)
+        assert(sample_size > 0)
+        self.codec = codec
+        self.level = level
+        self.sample_size = sample_size
+        self._compressor = None
+
+    def _compress(self, codec_id: int, data: bytes) -> bytes:
+        compressor = _COMPRESSION_CODECS[codec_id][1](self.level)
+        return bytes([codec_id]) + compressor.compress(data) + compressor.flush()
+
+    def _select_codec(self, sample: bytes) -> int:
+        '''Wählt den Codec, der `sample` auf die wenigsten Bytes komprimiert.'''
+        if self.codec != self.AUTO:
+            return _COMPRESSION_CODEC_IDS[self.codec]
+        sizes = [len(self._compress(codec_id, sample)) for codec_id in range(len(_COMPRESSION_CODECS))]
+        return sizes.index(min(sizes))
+
+    def preprocess(self, data: bytes) -> bytes:
+        '''Komprimiert die Daten mit dem konfigurierten bzw. automatisch gewählten Codec.
+
+        Parameters:
+            data (bytes): Daten, die komprimiert werden sollen
+        Returns:
+            Byte mit dem gewählten Codec, gefolgt von den komprimierten Daten
+        '''
+        if self.codec == self.AUTO and len(data) <= self.sample_size:
+            candidates = [self._compress(codec_id, data) for codec_id in range(len(_COMPRESSION_CODECS))]
+            return min(candidates, key=len)
+        return self._compress(self._select_codec(data[:self.sample_size]), data)
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Komprimiert den nächsten Abschnitt der Daten.
+
+        Im Modus 'auto' werden Daten gesammelt, bis die Stichprobe für die Auswahl des Codecs
+        vollständig ist.
+        '''
+        if self._compressor is None:
+            if self._stream_buffer is None:
+                self._stream_buffer = bytearray()
+            self._stream_buffer += chunk
+            if self.codec == self.AUTO and len(self._stream_buffer) < self.sample_size:
+                return b''
+            return self._start_stream()
+        return self._compressor.compress(chunk)
+
+    def _start_stream(self) -> bytes:
+        data = bytes(self._stream_buffer or b'')
+        self._stream_buffer = None
+        codec_id = self._select_codec(data[:self.sample_size])
+        self._compressor = _COMPRESSION_CODECS[codec_id][1](self.level)
+        return bytes([codec_id]) + self._compressor.compress(data)
+
+    def finalize(self) -> bytes:
+        if self._compressor is None:
+            data = bytes(self._stream_buffer or b'')
+            self._stream_buffer = None
+            return self.preprocess(data)
+        data = self._compressor.flush()
+        self._compressor = None
+        return data
+
+class DataPostProcessorDecompress(DataPostProcessor):
+    '''Nachverarbeitung, die mit `DataPreProcessorCompress` komprimierte Daten dekomprimiert.
+
+    Der verwendete Codec wird aus dem ersten Byte der Daten ausgelesen.
+    '''
+
+    def __init__(self):
+        self._decompressor = None
+
+    def postprocess(self, data: bytes) -> bytes:
+        '''Dekomprimiert die Daten mit dem im ersten Byte angegebenen Codec.
+
+        Parameters:
+            data (bytes): Byte mit dem Codec, gefolgt von den komprimierten Daten
+        Returns:
+            Dekomprimierte Daten
+        '''
+        if len(data) == 0:
+            raise ValueError("compressed data is missing codec header")
+        decompressor = self._create_decompressor(data[0])
+        return decompressor.decompress(data[1:])
+
+    def _create_decompressor(self, codec_id: int):
+        if codec_id >= len(_COMPRESSION_CODECS):
+            raise ValueError(f"Unknown compression codec: {codec_id}")
+        return _COMPRESSION_CODECS[codec_id][2]()
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Dekomprimiert den nächsten Abschnitt der Daten.'''
+        if len(chunk) == 0:
+            return b''
+        if self._decompressor is None:
+            self._decompressor = self._create_decompressor(chunk[0])
+            chunk = chunk[1:]
+        return self._decompressor.decompress(chunk)
+
+    def finalize(self) -> bytes:
+        if self._decompressor is None:
+            raise ValueError("compressed data is missing codec header")
+        self._decompressor = None
+        return b''
+
+class DataPreProcessorZlibDictionary(DataPreProcessor):
+    '''Vorverarbeitung, die Daten mit zlib und einem vorab ausgetauschten Wörterbuch (`zdict`)
+    komprimiert.
+
+    Bei kurzen, ähnlich aufgebauten Nachrichten findet zlib ohne Wörterbuch kaum Wiederholungen.
+    Mit einem Wörterbuch aus typischen Nachrichten (siehe `ccframework.zdict`) können dagegen auch
+    Nachrichten mit wenigen hundert Bytes deutlich verkleinert werden.
+
+    Dem Ergebnis wird ein Byte mit der ID des Wörterbuchs vorangestellt, damit der Empfänger bei
+    mehreren Versionen eines Wörterbuchs das passende auswählen kann.
+    '''
+
+    def __init__(self, zdict: bytes, dictionary_id: int, level: int=9):
+        '''Erstellt einen Vorverarbeiter für die Kompression mit Wörterbuch
+
+        Parameters:
+            zdict (bytes): Wörterbuch, höchstens 32768 Bytes
+            dictionary_id (int): ID bzw. Version des Wörterbuchs, `0 <= dictionary_id < 256`
+            level (int): Kompressionsstufe von 1 bis 9
+        '''
+        assert(0 < len(zdict) <= 32768)
+        assert(0 <= dictionary_id < 256)
+        assert(1 <= level <= 9)
+        self.zdict = zdict
+        self.dictionary_id = dictionary_id
+        self.level = level
+        self._compressor = None
+
+    def _create_compressor(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, self.zdict)
+
+    def preprocess(self, data: bytes) -> bytes:
+        '''Komprimiert die Daten mit dem Wörterbuch.
+
+        Parameters:
+            data (bytes): Daten, die komprimiert werden sollen
+        Returns:
+            Byte mit der ID des Wörterbuchs, gefolgt von den komprimierten Daten
+        '''
+        compressor = self._create_compressor()
+        return bytes([self.dictionary_id]) + compressor.compress(data) + compressor.flush()
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Komprimiert den nächsten Abschnitt der Daten.'''
+        if self._compressor is None:
+            self._compressor = self._create_compressor()
+            return bytes([self.dictionary_id]) + self._compressor.compress(chunk)
+        return self._compressor.compress(chunk)
+
+    def finalize(self) -> bytes:
+        if self._compressor is None:
+            return self.preprocess(b'')
+        data = self._compressor.flush()
+        self._compressor = None
+        return data
+
+class DataPostProcessorZlibDictionary(DataPostProcessor):
+    '''Nachverarbeitung, die mit `DataPreProcessorZlibDictionary` komprimierte Daten dekomprimiert.
+
+    Das Wörterbuch wird anhand der ID im ersten Byte der Daten ausgewählt.
+    '''
+
+    def __init__(self, dictionaries: {int: bytes}):
+        '''Erstellt einen Nachverarbeiter für die Dekompression mit Wörterbuch
+
+        Parameters:
+            dictionaries ({int: bytes}): bekannte Wörterbücher, zugeordnet zu ihrer ID
+        '''
+        assert(len(dictionaries) > 0)
+        self.dictionaries = dictionaries
+        self._decompressor = None
+
+    def _create_decompressor(self, dictionary_id: int):
+        if dictionary_id not in self.dictionaries:
+            raise ValueError(f"Unknown compression dictionary: {dictionary_id}")
+        return zlib.decompressobj(-15, zdict=self.dictionaries[dictionary_id])
+
+    def postprocess(self, data: bytes) -> bytes:
+        '''Dekomprimiert die Daten mit dem im ersten Byte angegebenen Wörterbuch.
+
+        Parameters:
+            data (bytes): Byte mit der ID des Wörterbuchs, gefolgt von den komprimierten Daten
+        Returns:
+            Dekomprimierte Daten
+        '''
+        if len(data) == 0:
+            raise ValueError("compressed data is missing dictionary header")
+        decompressor = self._create_decompressor(data[0])
+        return decompressor.decompress(data[1:]) + decompressor.flush()
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Dekomprimiert den nächsten Abschnitt der Daten.'''
+        if len(chunk) == 0:
+            return b''
+        if self._decompressor is None:
+            self._decompressor = self._create_decompressor(chunk[0])
+            chunk = chunk[1:]
+        return self._decompressor.decompress(chunk)
+
+    def finalize(self) -> bytes:
+        if self._decompressor is None:
+            raise ValueError("compressed data is missing dictionary header")
+        data = self._decompressor.flush()
+        self._decompressor = None
+        return data
+
+class _AlphabetCodec:
+    '''Umwandlung von Bytes in Zeichen eines beliebigen Alphabets und zurück.
+
+    Die Daten werden in Blöcke zu `block_size` Bytes aufgeteilt, die jeweils als Zahl zur Basis
+    `len(alphabet)` mit `block_digits` Stellen dargestellt werden. Die Blockgröße wird so gewählt,
+    dass möglichst wenige Zeichen pro Byte nötig sind. Da die Blöcke höchstens 7 Bytes groß sind,
+    passen sie in 64-Bit-Ganzzahlen und werden mit NumPy gemeinsam umgerechnet, der Aufwand bleibt
+    daher linear. Ein unvollständiger letzter Block wird mit der minimal nötigen Anzahl an Stellen
+    kodiert, aus der beim Dekodieren seine Länge folgt.
+
+    Ist die Größe des Alphabets eine Zweierpotenz, werden die Bits vollständiger Blöcke direkt auf
+    Zeichen abgebildet. Das Ergebnis ist dabei identisch mit der Umrechnung über Blöcke.
+    '''
+    MAX_BLOCK_SIZE = 7
+
+    def __init__(self, alphabet: bytes):
+        assert(2 <= len(alphabet) <= 256)
+        assert(len(set(alphabet)) == len(alphabet))
+        self.alphabet = np.frombuffer(bytes(alphabet), dtype=np.uint8)
+        self.base = len(alphabet)
+        self.lookup = np.full(256, -1, dtype=np.int16)
+        self.lookup[self.alphabet] = np.arange(self.base)
+
+        # Anzahl an Stellen, die für t Bytes mindestens nötig sind
+        self.digits = [self._digits_for(t) for t in range(self.MAX_BLOCK_SIZE + 1)]
+        self.block_size = min(range(1, self.MAX_BLOCK_SIZE + 1), key=lambda t: self.digits[t] / t)
+        self.block_digits = self.digits[self.block_size]
+        self.tail_sizes = {self.digits[t]: t for t in range(self.block_size)}
+
+        self.bits_per_digit = None
+        if self.base & (self.base - 1) == 0:
+            self.bits_per_digit = self.base.bit_length() - 1
+
+    def _digits_for(self, size: int) -> int:
+        digits = 0
+        while self.base ** digits < 256 ** size:
+            digits += 1
+        return digits
+
+    def encode(self, data: bytes) -> bytes:
+        full = len(data) - len(data) % self.block_size
+        if self.bits_per_digit is not None:
+            head = self._encode_bits(data[:full])
+        else:
+            head = self._encode_blocks(data[:full], self.block_size)
+        return head + self._encode_blocks(data[full:], len(data) - full)
+
+    def decode(self, data: bytes) -> bytes:
+        indices = self.lookup[np.frombuffer(data, dtype=np.uint8)]
+        if np.any(indices < 0):
+            raise ValueError("data contains characters outside of the alphabet")
+        tail_digits = len(indices) % self.block_digits
+        if tail_digits not in self.tail_sizes:
+            raise ValueError("invalid length of encoded data")
+        full = len(indices) - tail_digits
+        if self.bits_per_digit is not None:
+            head = self._decode_bits(indices[:full])
+        else:
+            head = self._decode_blocks(indices[:full], self.block_size)
+        return head + self._decode_blocks(indices[full:], self.tail_sizes[tail_digits])
+
+    def _encode_blocks(self, data: bytes, size: int) -> bytes:
+        if len(data) == 0:
+            return b''
+        digits = self.digits[size]
+        blocks = np.frombuffer(data, dtype=np.uint8).reshape(-1, size)
+        values = np.zeros(len(blocks), dtype=np.uint64)
+        for column in range(size):
+            values = (values << np.uint64(8)) | blocks[:, column]
+        result = np.empty((len(blocks), digits), dtype=np.uint8)
+        base = np.uint64(self.base)
+        for column in range(digits - 1, -1, -1):
+            result[:, column] = values % base
+            values //= base
+        return self.alphabet[result].tobytes()
+
+    def _decode_blocks(self, indices: np.ndarray, size: int) -> bytes:
+        if size == 0:
+            return b''
+        digits = self.digits[size]
+        values = np.zeros(len(indices) // digits, dtype=np.uint64)
+        base = np.uint64(self.base)
+        # base ** digits ist höchstens 2 ** 64, daher kann kein Überlauf auftreten
+        for column in indices.reshape(-1, digits).T:
+            values = values * base + column.astype(np.uint64)
+        if np.any(values >> np.uint64(8 * size)):
+            raise ValueError("encoded block is out of range")
+        result = np.empty((len(values), size), dtype=np.uint8)
+        for column in range(size - 1, -1, -1):
+            result[:, column] = values & np.uint64(0xff)
+            values >>= np.uint64(8)
+        return result.tobytes()
+
+    def _encode_bits(self, data: bytes) -> bytes:
+        # vollständige Blöcke bestehen aus genau block_digits * bits_per_digit Bits
+        bits_per_digit = self.bits_per_digit
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        weights = 1 << np.arange(bits_per_digit - 1, -1, -1)
+        return self.alphabet[bits.reshape(-1, bits_per_digit).dot(weights)].tobytes()
+
+    def _decode_bits(self, indices: np.ndarray) -> bytes:
+        bits = np.unpackbits(indices.astype(np.uint8).reshape(-1, 1), axis=1)[:, 8 - self.bits_per_digit:]
+        return np.packbits(bits.reshape(-1)).tobytes()
+
+class DataPreProcessorAlphabet(DataPreProcessor):
+    '''Vorverarbeitung, die Daten in Zeichen eines beliebigen Alphabets kodiert.
+
+    Gedacht für Felder, die nur bestimmte Zeichen zulassen, z.B. die Zeichenklasse eines regulären
+    Ausdrucks bei `PacketHandlerSendRegexPayload`. Im Gegensatz zu Base64 wird dabei annähernd die
+    informationstheoretisch mögliche Dichte von `log2(len(alphabet))` Bits pro Zeichen erreicht.
+    '''
+
+    def __init__(self, alphabet: bytes):
+        '''Erstellt einen Vorverarbeiter für die Kodierung in ein Alphabet
+
+        Parameters:
+            alphabet (bytes): erlaubte Zeichen, 2 bis 256 verschiedene Bytes
+        '''
+        self.codec = _AlphabetCodec(alphabet)
+
+    def preprocess(self, data: bytes) -> bytes:
+        '''Kodiert die Daten in Zeichen des Alphabets.
+
+        Parameters:
+            data (bytes): Daten, die kodiert werden sollen
+        Returns:
+            Kodierte Daten, bestehend nur aus Zeichen des Alphabets
+        '''
+        return self.codec.encode(data)
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Kodiert alle vollständigen Blöcke, der Rest wird mit dem nächsten Abschnitt kodiert.'''
+        data = (self._stream_buffer or b'') + chunk
+        usable = len(data) - len(data) % self.codec.block_size
+        self._stream_buffer = data[usable:]
+        return self.codec.encode(data[:usable])
+
+class DataPostProcessorAlphabet(DataPostProcessor):
+    '''Nachverarbeitung, die mit `DataPreProcessorAlphabet` kodierte Daten dekodiert.
+
+    Zeichen aus `padding` werden vor dem Dekodieren entfernt. So kann z.B. das Mikroprotokoll das
+    letzte Stück mit Null-Bytes auffüllen, obwohl diese nicht zum Alphabet gehören.
+    '''
+
+    def __init__(self, alphabet: bytes, padding: bytes=b''):
+        '''Erstellt einen Nachverarbeiter für die Dekodierung aus einem Alphabet
+
+        Parameters:
+            alphabet (bytes): erlaubte Zeichen, wie bei der Kodierung angegeben
+            padding (bytes): Füllzeichen außerhalb des Alphabets, die ignoriert werden, z.B. `b'\\x00'`
+        '''
+        assert(not set(padding) & set(alphabet))
+        self.codec = _AlphabetCodec(alphabet)
+        self.padding = padding
+
+    def postprocess(self, data: bytes) -> bytes:
+        '''Dekodiert Zeichen des Alphabets zu Bytes.
+
+        Parameters:
+            data (bytes): kodierte Daten
+        Returns:
+            Dekodierte Daten
+        '''
+        return self.codec.decode(bytes(data).translate(None, self.padding))
+
+    def update(self, chunk: bytes) -> bytes:
+        '''Dekodiert alle vollständigen Blöcke, der Rest wird mit dem nächsten Abschnitt dekodiert.'''
+        data = (self._stream_buffer or b'') + bytes(chunk).translate(None, self.padding)
+        usable = len(data) - len(data) % self.codec.block_digits
+        self._stream_buffer = data[usable:]
+        return self.codec.decode(data[:usable])
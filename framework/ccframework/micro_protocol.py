@@ -1,10 +1,94 @@
 from abc import ABC
 from abc import abstractmethod
+import bisect
 import enum
+import math
+import zlib
+from typing import Callable, Iterable, Iterator
 from bitstring import Bits
+import numpy as np
 
+from .bit_accumulator import BitAccumulator
 from .slicer import SimpleBitSlicer
 
+def _encode_varint(value: int) -> bytes:
+    '''Kodiert eine nicht-negative Zahl als LEB128-Varint (7 Bits pro Byte, niederwertige Bits
+    zuerst, gesetztes höchstes Bit kennzeichnet weitere Bytes).'''
+    assert(value >= 0)
+    result = bytearray()
+    while value > 0x7f:
+        result.append(0x80 | (value & 0x7f))
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+class _VarintDecoder:
+    '''Dekodiert einen LEB128-Varint aus Bits, die stückweise ankommen.
+
+    Bits, die nach dem Ende des Varints übergeben wurden, werden als Rest zurückgegeben.
+    '''
+    def __init__(self):
+        self.value = None
+        self._result = 0
+        self._shift = 0
+        self._pending = 0
+        self._pending_bits = 0
+
+    def feed(self, data: Bits) -> Bits:
+        '''Verarbeitet weitere Bits. Sobald der Varint vollständig ist, steht er in `value` und
+        die übrigen Bits werden zurückgegeben, vorher `None`.'''
+        assert(self.value is None)
+        if len(data) > 0:
+            self._pending = (self._pending << len(data)) | data.uint
+            self._pending_bits += len(data)
+        while self._pending_bits >= 8:
+            self._pending_bits -= 8
+            byte = self._pending >> self._pending_bits
+            self._pending &= (1 << self._pending_bits) - 1
+            self._result |= (byte & 0x7f) << self._shift
+            self._shift += 7
+            if byte & 0x80 == 0:
+                self.value = self._result
+                if self._pending_bits == 0:
+                    return Bits()
+                return Bits(uint=self._pending, length=self._pending_bits)
+        return None
+
+class _LengthPrefixedReader:
+    '''Liest Nutzdaten, denen ihre Länge in Bits als LEB128-Varint vorangestellt ist.
+
+    Die Bits werden stückweise übergeben. Sobald die Länge erreicht ist, ist `finished` gesetzt und
+    überzählige Bits (Padding) werden verworfen. Ist `max_length` gesetzt, werden größere Längen
+    mit einem `ValueError` abgelehnt.
+    '''
+    def __init__(self, max_length: int=None):
+        self.max_length = max_length
+        self.header = _VarintDecoder()
+        self.remaining = None
+        self.finished = False
+
+    def feed(self, data: Bits) -> (Bits, int):
+        '''Verarbeitet weitere Bits.
+
+        Returns:
+            enthaltene Nutzdaten oder `None` und, nur wenn die Länge mit diesen Bits bekannt wurde,
+            die Länge der Nutzdaten in Bits
+        '''
+        expected_length = None
+        if self.remaining is None:
+            data = self.header.feed(data)
+            if data is None:
+                return None, None
+            if self.max_length is not None and self.header.value > self.max_length:
+                raise ValueError(f"Announced length {self.header.value} exceeds max_length {self.max_length}")
+            self.remaining = expected_length = self.header.value
+        if len(data) >= self.remaining:
+            if len(data) > self.remaining:
+                data = data[:self.remaining]
+            self.finished = True
+        self.remaining -= len(data)
+        return (data if len(data) > 0 else None), expected_length
+
 class TransmissionState(enum.Enum):
     '''Klasse, die Zustand einer Übertragung repräsentiert.
     '''
@@ -19,10 +103,22 @@ class MicroProtocolResponse:
     ''' Fasst Rückgabewerte bei Empfang mit einem Mikroprotokoll zu einem einzelnen Objekt zusammen,
     um sie leichter als Returnwert nutzen zu können.
     Diese Rückgabewerte bestehen aus Zustand der Übertragung und, sofern vorhanden, den empfangenen Daten.
+    Ist dem Mikroprotokoll die Länge der Nutzdaten bekannt, kann es diese in `expected_length` (in Bits)
+    einmalig mitteilen, damit der Empfangspuffer vorab reserviert werden kann.
+    Bei Kanälen mit Rückrichtung (z.B. Anfrage/Antwort) enthält `ack` Daten, die der Adapter an den
+    Sender zurückschicken soll.
+    Bei `MicroProtocolReceive.postprocess_int()` sind die Daten eine Ganzzahl, deren Länge in Bits in
+    `data_length` steht.
     '''
-    def __init__(self, transmission_state: TransmissionState, data: bytes=None):
+    __slots__ = ('transmission_state', 'data', 'data_length', 'expected_length', 'ack')
+
+    def __init__(self, transmission_state: TransmissionState, data: bytes=None, expected_length: int=None, ack: Bits=None,
+            data_length: int=None):
         self.transmission_state = transmission_state
         self.data = data
+        self.data_length = data_length
+        self.expected_length = expected_length
+        self.ack = ack
 
 class MicroProtocolSend(ABC):
     ''' Mikroprotokoll für den Versand von Daten
@@ -45,6 +141,40 @@ class MicroProtocolSend(ABC):
         '''
         pass
 
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        ''' Bereitet Daten auf den Versand vor und liefert die versandbereiten Stücke über einen
+        Iterator.
+
+        Standardmäßig wird dafür `preprocess()` genutzt, Implementierungen können die Stücke aber
+        auch erst bei Bedarf erzeugen.
+
+        Parameters:
+            data (Bits): Daten, die zum Versand vorbereitet werden sollen
+
+        Returns:
+            Iterator über die versandbereiten Daten
+        '''
+        transmission_data = self.preprocess(data)
+        if type(transmission_data) == Bits:
+            transmission_data = [transmission_data]
+        return iter(transmission_data)
+
+    def preprocess_stream(self, chunks: Iterable[bytes]) -> Iterator[Bits]:
+        ''' Bereitet abschnittsweise vorliegende Daten auf den Versand vor und liefert die
+        versandbereiten Stücke über einen Iterator.
+
+        Standardmäßig werden dafür alle Abschnitte zusammengefügt und an `iter_preprocess()`
+        übergeben. Implementierungen können die Abschnitte aber auch nacheinander verarbeiten, um
+        nie die gesamte Übertragung im Speicher zu halten.
+
+        Parameters:
+            chunks (Iterable[bytes]): Abschnitte der Daten, die versendet werden sollen
+
+        Returns:
+            Iterator über die versandbereiten Daten
+        '''
+        return self.iter_preprocess(Bits(b''.join(chunks)))
+
 class MicroProtocolReceive(ABC):
     ''' Mikroprotokoll für den Empfang von Daten
     
@@ -70,6 +200,57 @@ class MicroProtocolReceive(ABC):
         '''
         pass
 
+    def postprocess_int(self, value: int, length: int) -> MicroProtocolResponse:
+        '''Wertet ein empfangenes Stück aus, das als Ganzzahl mit `length` Bits vorliegt.
+
+        Gedacht für den Empfang einzelner Pakete, bei dem PacketHandler, Mikroprotokoll und Adapter
+        keine `Bits`-Objekte erzeugen sollen. Die Daten der Antwort sind ebenfalls eine Ganzzahl
+        (`data_length` Bits). Standardmäßig wird dafür `postprocess()` genutzt, Mikroprotokolle
+        können diese Methode überschreiben und dabei dieselbe Antwort wiederverwenden. Eine Antwort
+        ist daher nur bis zum nächsten Aufruf gültig.
+
+        Parameters:
+            value (int): empfangene Daten als vorzeichenlose Ganzzahl
+            length (int): Länge der empfangenen Daten in Bits
+
+        Returns:
+            MicroProtocolResponse, die Zustand der Übertragung und eventuell empfangene Daten beinhaltet
+        '''
+        resp = self.postprocess(Bits(uint=value, length=length) if length > 0 else Bits())
+        if resp.data is not None:
+            resp.data_length = len(resp.data)
+            resp.data = resp.data.uint if resp.data_length > 0 else 0
+        return resp
+
+    def postprocess_many(self, slices: [Bits]) -> MicroProtocolResponse:
+        '''Wertet mehrere empfangene Stücke auf einmal aus, z.B. aus einem Paketmitschnitt.
+
+        Standardmäßig wird dafür `postprocess` für jedes Stück aufgerufen. Die Nutzdaten werden so
+        zusammengefasst, wie sie der ProtocolAdapter bei einzelner Verarbeitung übernehmen würde.
+        Mikroprotokolle können diese Methode überschreiben, um den gesamten Block auf einmal
+        auszuwerten.
+
+        Parameters:
+            slices ([Bits]): Stücke in Empfangsreihenfolge
+
+        Returns:
+            MicroProtocolResponse mit dem Zustand nach dem letzten Stück, allen empfangenen Daten
+            sowie der zuletzt gemeldeten erwarteten Länge und Bestätigung
+        '''
+        data = []
+        expected_length = None
+        ack = None
+        for data_slice in slices:
+            resp = self.postprocess(data_slice)
+            if resp.expected_length is not None:
+                expected_length = resp.expected_length
+            if resp.ack is not None:
+                ack = resp.ack
+            if resp.data is not None and resp.transmission_state is not TransmissionState.WAITING_FOR_TRANSMISSION:
+                data.append(resp.data)
+        return MicroProtocolResponse(self.transmission_state, Bits().join(data) if data else None,
+            expected_length, ack)
+
 class MinimalMicroProtocolSend(MicroProtocolSend):
     ''' Minimalistisches Mikroprotokoll, das lediglich Start und Ende einer Übertragung festellen kann.
 
@@ -115,13 +296,38 @@ class MinimalMicroProtocolSend(MicroProtocolSend):
             Vorbereitete Daten, die durch den ProtocolAdapter versendet werden können.
         '''
         assert(type(data) == Bits)
+        return list(self.iter_preprocess(data))
+
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        '''Vorbereitung der Daten zum Versand wie bei `preprocess()`, wobei die einzelnen Stücke erst
+        erzeugt werden, wenn sie abgerufen werden.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Iterator über die vorbereiteten Daten
+        '''
+        assert(type(data) == Bits)
+        zero_bits = Bits(self.slice_size)
+        yield zero_bits
+        yield from self.slicer.iter_slices(data)
+        yield zero_bits
+
+    def preprocess_stream(self, chunks: Iterable[bytes]) -> Iterator[Bits]:
+        '''Vorbereitung von abschnittsweise vorliegenden Daten, z.B. aus einer Datei, zum Versand.
+
+        Die Abschnitte werden erst gelesen, wenn die entsprechenden Stücke abgerufen werden. Dadurch
+        bleibt der Speicherbedarf unabhängig von der Größe der Übertragung.
 
-        data_to_send = list()
-        zero_bits = Bits('0b' + '0'*self.slice_size)
-        data_to_send.append(zero_bits)
-        data_to_send += self.slicer.slice(data)
-        data_to_send.append(zero_bits)
-        return data_to_send
+        Parameters:
+            chunks (Iterable[bytes]): Abschnitte der Daten, die versendet werden sollen.
+        Returns:
+            Iterator über die vorbereiteten Daten
+        '''
+        zero_bits = Bits(self.slice_size)
+        yield zero_bits
+        yield from self.slicer.iter_slices_stream(chunks)
+        yield zero_bits
 
 
 class MinimalMicroProtocolReceive(MicroProtocolReceive):
@@ -150,6 +356,8 @@ class MinimalMicroProtocolReceive(MicroProtocolReceive):
             self.slice_size = slice_size
         elif unit == self.BYTES:
             self.slice_size = slice_size * 8
+        self.zero_bits = Bits(self.slice_size)
+        self.response = MicroProtocolResponse(self.transmission_state)
 
     def postprocess(self, data: Bits) -> MicroProtocolResponse:
         '''Verarbeitung von Empfangenen Daten.
@@ -170,7 +378,7 @@ class MinimalMicroProtocolReceive(MicroProtocolReceive):
         '''
         assert(type(data) == Bits)
 
-        zero_bits = Bits('0b' + '0'*self.slice_size)
+        zero_bits = self.zero_bits
         transmission_data = None
         if self.transmission_state is TransmissionState.WAITING_FOR_TRANSMISSION:
             if data == zero_bits:
@@ -185,3 +393,1452 @@ class MinimalMicroProtocolReceive(MicroProtocolReceive):
         else:
             raise Exception(f"Unexpected transmission_state: {self.transmission_state}")
         return MicroProtocolResponse(self.transmission_state, transmission_data)
+
+    def postprocess_int(self, value: int, length: int) -> MicroProtocolResponse:
+        '''Verarbeitung eines als Ganzzahl empfangenen Stücks wie bei `postprocess()`.
+
+        Die Markierung ist hier die Zahl `0`, es wird weder ein `Bits`-Objekt noch eine neue
+        MicroProtocolResponse erzeugt, sondern stets `self.response` aktualisiert.
+        '''
+        resp = self.response
+        resp.data = None
+        if self.transmission_state is TransmissionState.WAITING_FOR_TRANSMISSION:
+            if value == 0 and length == self.slice_size:
+                self.transmission_state = TransmissionState.ACTIVE_TRANSMISSION
+        elif self.transmission_state is TransmissionState.ACTIVE_TRANSMISSION:
+            if value == 0 and length == self.slice_size:
+                self.transmission_state = TransmissionState.FINISHED_TRANSMISSION
+            else:
+                resp.data = value
+                resp.data_length = length
+        resp.transmission_state = self.transmission_state
+        return resp
+
+    def postprocess_many(self, slices: [Bits]) -> MicroProtocolResponse:
+        '''Verarbeitung mehrerer empfangener Stücke auf einmal.
+
+        Alle Stücke werden zu einem Array zusammengefasst, in dem die Null-Markierungen für Start
+        und Ende mit NumPy gesucht werden. Die Nutzdaten dazwischen werden als ein zusammenhängender
+        Abschnitt geliefert. Das Ergebnis entspricht dem Aufruf von `postprocess` für jedes Stück.
+
+        Parameters:
+            slices ([Bits]): Stücke in Empfangsreihenfolge
+
+        Returns:
+            MicroProtocolResponse mit dem Zustand nach dem letzten Stück und allen Nutzdaten
+        '''
+        count = len(slices)
+        if count == 0 or self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            return MicroProtocolResponse(self.transmission_state)
+        if any(len(data_slice) != self.slice_size for data_slice in slices):
+            # Stücke abweichender Länge sind nie Markierungen, passen aber nicht in ein Array
+            return super().postprocess_many(slices)
+
+        joined = Bits().join(slices)
+        packed = np.frombuffer(joined.tobytes(), dtype=np.uint8)
+        if self.slice_size % 8 == 0:
+            rows = packed.reshape(count, self.slice_size // 8)
+        else:
+            rows = np.unpackbits(packed)[:count * self.slice_size].reshape(count, self.slice_size)
+        markers = np.flatnonzero(~rows.any(axis=1))
+
+        position = 0
+        if self.transmission_state is TransmissionState.WAITING_FOR_TRANSMISSION:
+            if len(markers) == 0:
+                return MicroProtocolResponse(self.transmission_state)
+            position = int(markers[0]) + 1
+            self.transmission_state = TransmissionState.ACTIVE_TRANSMISSION
+
+        end = np.searchsorted(markers, position)
+        if end < len(markers):
+            end = int(markers[end])
+            self.transmission_state = TransmissionState.FINISHED_TRANSMISSION
+        else:
+            end = count
+        transmission_data = None
+        if end > position:
+            transmission_data = joined[position * self.slice_size:end * self.slice_size]
+        return MicroProtocolResponse(self.transmission_state, transmission_data)
+
+class LengthPrefixedMicroProtocolSend(MicroProtocolSend):
+    '''Mikroprotokoll, das die Länge der Nutzdaten vor diesen überträgt.
+
+    Wie bei `MinimalMicroProtocolSend` wird der Start durch ein Stück aus Null-Bits markiert. Danach
+    folgt die Länge der Nutzdaten in Bits als LEB128-Varint und direkt im Anschluss die Nutzdaten.
+    Der Empfänger erkennt das Ende an der Länge, wodurch kein abschließendes Null-Stück nötig ist
+    und Stücke aus Null-Bits als Nutzdaten übertragen werden können.
+
+    Da die Länge vorab bekannt sein muss, werden bei `preprocess_stream()` alle Abschnitte
+    zusammengefügt.
+    '''
+    BYTES = 'bytes'
+    BITS = 'bits'
+    ALLOWED_UNITS = [BYTES, BITS]
+
+    def __init__(self, slice_size: int, unit='bytes', padding: Bits=None):
+        '''Erstellt ein LengthPrefixedMicroProtocolSend
+
+        Parameters:
+            slice_size (int): Länge der Stücke, in die die zu versendenden Daten aufgeteilt werden sollen
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            padding (Bits): Padding für das letzte Stück, standardmäßig Null-Bits. Der Empfänger
+                verwirft es anhand der übertragenen Länge.
+        '''
+        assert(unit in self.ALLOWED_UNITS)
+        if unit == self.BITS:
+            self.slice_size = slice_size
+        elif unit == self.BYTES:
+            self.slice_size = slice_size * 8
+        if padding is None:
+            padding = Bits(self.slice_size)
+        self.slicer = SimpleBitSlicer(slice_size=self.slice_size, padding=padding)
+
+    def preprocess(self, data: Bits) -> [Bits]:
+        '''Vorbereitung der Daten zum Versand.
+
+        So wird aus `00110` bei `slice_size` von `4` in `bits`:
+        `['0000', '0000', '0101', '0011', '0000']`
+        (Startmarkierung, Länge `5` als Varint `00000101`, Nutzdaten und Padding)
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Vorbereitete Daten, die durch den ProtocolAdapter versendet werden können.
+        '''
+        assert(type(data) == Bits)
+        return list(self.iter_preprocess(data))
+
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        '''Vorbereitung der Daten zum Versand wie bei `preprocess()`, wobei die einzelnen Stücke erst
+        erzeugt werden, wenn sie abgerufen werden.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Iterator über die vorbereiteten Daten
+        '''
+        assert(type(data) == Bits)
+        yield Bits(self.slice_size)
+        yield from self.slicer.iter_slices(Bits(_encode_varint(len(data))) + data)
+
+class LengthPrefixedMicroProtocolReceive(MicroProtocolReceive):
+    '''Mikroprotokoll für den Empfang von Daten, die mit `LengthPrefixedMicroProtocolSend`
+    versendet wurden.
+
+    Nach der Startmarkierung wird zuerst die Länge gelesen. Ab dann werden alle Stücke als Nutzdaten
+    behandelt, bis die angegebene Länge erreicht ist; Padding im letzten Stück wird abgeschnitten.
+    Die Länge wird einmalig über `MicroProtocolResponse.expected_length` mitgeteilt. Da sie
+    ungeprüft aus der Übertragung stammt, kann sie mit `max_length` begrenzt werden.
+    '''
+    BYTES = 'bytes'
+    BITS = 'bits'
+    ALLOWED_UNITS = [BYTES, BITS]
+
+    def __init__(self, slice_size: int, unit='bytes', max_length: int=None):
+        '''Erstellt ein LengthPrefixedMicroProtocolReceive
+
+        Parameters:
+            slice_size (int): Länge der Stücke, in die die zu versendenden Daten aufgeteilt werden sollen
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            max_length (int): größte akzeptierte Länge der Nutzdaten in Bits, standardmäßig
+                unbegrenzt. Größere Längen führen zu einem `ValueError`.
+        '''
+        assert(unit in self.ALLOWED_UNITS)
+        self.transmission_state = TransmissionState.WAITING_FOR_TRANSMISSION
+        if unit == self.BITS:
+            self.slice_size = slice_size
+        elif unit == self.BYTES:
+            self.slice_size = slice_size * 8
+        self.zero_bits = Bits(self.slice_size)
+        self.reader = _LengthPrefixedReader(max_length)
+
+    def postprocess(self, data: Bits) -> MicroProtocolResponse:
+        '''Verarbeitung von Empfangenen Daten.
+
+        Parameters:
+            data (Bits): vom ProtocolAdapter aus der Übertragung extrahierte Daten, die ausgewertet
+                werden sollen.
+        Returns:
+            MicroProtocolResponse, die Zustand der Übertragung und evtl. empfangene Daten enthält.
+        '''
+        assert(type(data) == Bits)
+
+        if self.transmission_state is TransmissionState.WAITING_FOR_TRANSMISSION:
+            if data == self.zero_bits:
+                self.transmission_state = TransmissionState.ACTIVE_TRANSMISSION
+            return MicroProtocolResponse(self.transmission_state)
+        elif self.transmission_state is TransmissionState.ACTIVE_TRANSMISSION:
+            payload, expected_length = self.reader.feed(data)
+            if self.reader.finished:
+                self.transmission_state = TransmissionState.FINISHED_TRANSMISSION
+            return MicroProtocolResponse(self.transmission_state, payload, expected_length)
+        elif self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            return MicroProtocolResponse(self.transmission_state)
+        else:
+            raise Exception(f"Unexpected transmission_state: {self.transmission_state}")
+
+class SyncMicroProtocolSend(MicroProtocolSend):
+    '''Mikroprotokoll, das eine Übertragung mit einer Präambel einleitet, die der Empfänger an
+    beliebiger Bit-Position im Datenstrom finden kann.
+
+    Nach der Präambel folgt wie bei `LengthPrefixedMicroProtocolSend` die Länge der Nutzdaten in Bits
+    als LEB128-Varint und direkt im Anschluss die Nutzdaten. Präambel, Länge und Nutzdaten werden
+    zusammen in Stücke aufgeteilt, die Präambel muss also nicht auf ein eigenes Stück fallen.
+    '''
+    BYTES = 'bytes'
+    BITS = 'bits'
+    ALLOWED_UNITS = [BYTES, BITS]
+    # Synchronisationsmarkierung aus CCSDS 131.0-B, geringe Autokorrelation bei Verschiebung
+    DEFAULT_PREAMBLE = Bits('0x1acffc1d')
+
+    def __init__(self, slice_size: int, unit='bytes', preamble: Bits=None, padding: Bits=None):
+        '''Erstellt ein SyncMicroProtocolSend
+
+        Parameters:
+            slice_size (int): Länge der Stücke, in die die zu versendenden Daten aufgeteilt werden sollen
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            preamble (Bits): Präambel, standardmäßig `DEFAULT_PREAMBLE`
+            padding (Bits): Padding für das letzte Stück, standardmäßig Null-Bits. Der Empfänger
+                verwirft es anhand der übertragenen Länge.
+        '''
+        assert(unit in self.ALLOWED_UNITS)
+        if unit == self.BITS:
+            self.slice_size = slice_size
+        elif unit == self.BYTES:
+            self.slice_size = slice_size * 8
+        if preamble is None:
+            preamble = self.DEFAULT_PREAMBLE
+        assert(len(preamble) > 0)
+        self.preamble = preamble
+        if padding is None:
+            padding = Bits(self.slice_size)
+        self.slicer = SimpleBitSlicer(slice_size=self.slice_size, padding=padding)
+
+    def preprocess(self, data: Bits) -> [Bits]:
+        '''Vorbereitung der Daten zum Versand.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Vorbereitete Daten, die durch den ProtocolAdapter versendet werden können.
+        '''
+        assert(type(data) == Bits)
+        return list(self.iter_preprocess(data))
+
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        '''Vorbereitung der Daten zum Versand wie bei `preprocess()`, wobei die einzelnen Stücke erst
+        erzeugt werden, wenn sie abgerufen werden.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Iterator über die vorbereiteten Daten
+        '''
+        assert(type(data) == Bits)
+        yield from self.slicer.iter_slices(self.preamble + Bits(_encode_varint(len(data))) + data)
+
+class SyncMicroProtocolReceive(MicroProtocolReceive):
+    '''Mikroprotokoll für den Empfang von Daten, die mit `SyncMicroProtocolSend` versendet wurden.
+
+    Solange die Übertragung nicht erkannt wurde, werden die empfangenen Bits einzeln in ein
+    Schiebefenster mit der Länge der Präambel übernommen. Die Präambel gilt als gefunden, sobald
+    sich Fenster und Präambel in höchstens `max_errors` Bits unterscheiden (Hamming-Abstand über
+    XOR und Popcount). Dadurch wird jedes Bit genau einmal betrachtet, ohne bereits gesehene Bits
+    erneut zu durchsuchen, und die Stücke müssen nicht an der Präambel ausgerichtet sein.
+
+    Danach werden die Stücke ohne weitere Suche wie bei `LengthPrefixedMicroProtocolReceive`
+    ausgewertet. Die Stücke dürfen beliebig lang sein, z.B. wenn ein Mitschnitt mitten in einer
+    Übertragung beginnt oder der Kanal Bits verliert.
+    '''
+    BYTES = 'bytes'
+    BITS = 'bits'
+    ALLOWED_UNITS = [BYTES, BITS]
+
+    def __init__(self, slice_size: int, unit='bytes', preamble: Bits=None, max_errors: int=0, max_length: int=None):
+        '''Erstellt ein SyncMicroProtocolReceive
+
+        Parameters:
+            slice_size (int): Länge der Stücke, in die die zu versendenden Daten aufgeteilt werden sollen
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            preamble (Bits): Präambel, standardmäßig `SyncMicroProtocolSend.DEFAULT_PREAMBLE`
+            max_errors (int): Anzahl der Bitfehler, die in der Präambel toleriert werden
+            max_length (int): größte akzeptierte Länge der Nutzdaten in Bits, wie bei
+                `LengthPrefixedMicroProtocolReceive`
+        '''
+        assert(unit in self.ALLOWED_UNITS)
+        if preamble is None:
+            preamble = SyncMicroProtocolSend.DEFAULT_PREAMBLE
+        assert(0 <= max_errors < len(preamble))
+        self.transmission_state = TransmissionState.WAITING_FOR_TRANSMISSION
+        if unit == self.BITS:
+            self.slice_size = slice_size
+        elif unit == self.BYTES:
+            self.slice_size = slice_size * 8
+        self.preamble = preamble.uint
+        self.preamble_length = len(preamble)
+        self.max_errors = max_errors
+        self.window = 0
+        self.window_mask = (1 << self.preamble_length) - 1
+        # Anzahl der Bits, die noch fehlen, bis das Fenster erstmals gefüllt ist
+        self.window_missing = self.preamble_length
+        self.reader = _LengthPrefixedReader(max_length)
+
+    def _find_preamble(self, data: Bits) -> int:
+        '''Schiebt die Bits aus `data` in das Fenster, bis die Präambel gefunden wurde.
+
+        Returns:
+            Position des ersten Bits nach der Präambel in `data` oder `None`
+        '''
+        length = len(data)
+        window = self.window
+        missing = self.window_missing
+        position = 0
+        # byteweise, damit nicht für jedes Bit eine große Ganzzahl verschoben wird; im letzten Byte
+        # sind nur die vorderen Bits gültig
+        for byte in data.tobytes():
+            for shift in range(7, 7 - min(8, length - position), -1):
+                window = ((window << 1) | ((byte >> shift) & 1)) & self.window_mask
+                position += 1
+                if missing > 0:
+                    missing -= 1
+                    if missing > 0:
+                        continue
+                if (window ^ self.preamble).bit_count() <= self.max_errors:
+                    self.window = window
+                    self.window_missing = 0
+                    return position
+        self.window = window
+        self.window_missing = missing
+        return None
+
+    def postprocess(self, data: Bits) -> MicroProtocolResponse:
+        '''Verarbeitung von Empfangenen Daten.
+
+        Parameters:
+            data (Bits): vom ProtocolAdapter aus der Übertragung extrahierte Daten, die ausgewertet
+                werden sollen.
+        Returns:
+            MicroProtocolResponse, die Zustand der Übertragung und evtl. empfangene Daten enthält.
+        '''
+        assert(type(data) == Bits)
+
+        if self.transmission_state is TransmissionState.WAITING_FOR_TRANSMISSION:
+            start = self._find_preamble(data)
+            if start is None:
+                return MicroProtocolResponse(self.transmission_state)
+            self.transmission_state = TransmissionState.ACTIVE_TRANSMISSION
+            data = data[start:]
+        if self.transmission_state is TransmissionState.ACTIVE_TRANSMISSION:
+            payload, expected_length = self.reader.feed(data)
+            if self.reader.finished:
+                self.transmission_state = TransmissionState.FINISHED_TRANSMISSION
+            return MicroProtocolResponse(self.transmission_state, payload, expected_length)
+        elif self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            return MicroProtocolResponse(self.transmission_state)
+        else:
+            raise Exception(f"Unexpected transmission_state: {self.transmission_state}")
+
+class SequenceMicroProtocolSend(MicroProtocolSend):
+    '''Mikroprotokoll, das jedem Stück eine Sequenznummer voranstellt.
+
+    Dadurch kann der Empfänger Stücke, die in anderer Reihenfolge, doppelt oder über mehrere Wege
+    (z.B. parallele NFQ-Queues, mehrere Verbindungen) ankommen, wieder zusammensetzen. Jedes Stück
+    besteht aus `seq_bits` Bits Sequenznummer und `slice_size - seq_bits` Bits Nutzdaten. Die
+    Sequenznummer läuft modulo `2 ** seq_bits` über. Den Nutzdaten wird wie bei
+    `LengthPrefixedMicroProtocolSend` ihre Länge als Varint vorangestellt, eine Startmarkierung gibt
+    es nicht.
+
+    Stücke dürfen höchstens um die Fenstergröße des Empfängers (standardmäßig `2 ** (seq_bits - 1)`)
+    vertauscht werden.
+    '''
+    BYTES = 'bytes'
+    BITS = 'bits'
+    ALLOWED_UNITS = [BYTES, BITS]
+
+    def __init__(self, slice_size: int, unit='bytes', seq_bits: int=8, padding: Bits=None):
+        '''Erstellt ein SequenceMicroProtocolSend
+
+        Parameters:
+            slice_size (int): Länge der Stücke inkl. Sequenznummer
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            seq_bits (int): Länge der Sequenznummer in Bits
+            padding (Bits): Padding für das letzte Stück, standardmäßig Null-Bits
+        '''
+        assert(unit in self.ALLOWED_UNITS)
+        if unit == self.BITS:
+            self.slice_size = slice_size
+        elif unit == self.BYTES:
+            self.slice_size = slice_size * 8
+        assert(1 <= seq_bits < self.slice_size)
+        self.seq_bits = seq_bits
+        self.payload_size = self.slice_size - seq_bits
+        if padding is None:
+            padding = Bits(self.payload_size)
+        self.slicer = SimpleBitSlicer(slice_size=self.payload_size, padding=padding)
+
+    def preprocess(self, data: Bits) -> [Bits]:
+        '''Vorbereitung der Daten zum Versand.
+
+        So wird aus `00110` bei `slice_size` von `6` in `bits` und `seq_bits` von `2`:
+        `['000000', '010101', '100011', '110000']`
+        (Länge `5` als Varint `00000101`, Nutzdaten und Padding, jeweils mit Sequenznummer)
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Vorbereitete Daten, die durch den ProtocolAdapter versendet werden können.
+        '''
+        assert(type(data) == Bits)
+        return list(self.iter_preprocess(data))
+
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        '''Vorbereitung der Daten zum Versand wie bei `preprocess()`, wobei die einzelnen Stücke erst
+        erzeugt werden, wenn sie abgerufen werden.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Iterator über die vorbereiteten Daten
+        '''
+        assert(type(data) == Bits)
+        seq_mask = (1 << self.seq_bits) - 1
+        payloads = self.slicer.iter_slices(Bits(_encode_varint(len(data))) + data)
+        for seq, payload in enumerate(payloads):
+            yield Bits(uint=seq & seq_mask, length=self.seq_bits) + payload
+
+class SequenceMicroProtocolReceive(MicroProtocolReceive):
+    '''Mikroprotokoll für den Empfang von Daten, die mit `SequenceMicroProtocolSend` versendet
+    wurden.
+
+    Stücke, die vor ihren Vorgängern ankommen, werden in einem Fenster zwischengespeichert. Sobald
+    eine Lücke geschlossen ist, werden alle zusammenhängenden Nutzdaten auf einmal geliefert.
+    Doppelte Stücke und Stücke außerhalb des Fensters werden verworfen und in `duplicates` gezählt.
+
+    Da es keine Startmarkierung gibt, wird jedes übergebene Stück als Teil der Übertragung
+    behandelt; die Pakete müssen also z.B. durch Firewall-Regeln vorab ausgewählt werden.
+    '''
+    BYTES = 'bytes'
+    BITS = 'bits'
+    ALLOWED_UNITS = [BYTES, BITS]
+
+    def __init__(self, slice_size: int, unit='bytes', seq_bits: int=8, window: int=None, max_length: int=None):
+        '''Erstellt ein SequenceMicroProtocolReceive
+
+        Parameters:
+            slice_size (int): Länge der Stücke inkl. Sequenznummer
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            seq_bits (int): Länge der Sequenznummer in Bits
+            window (int): Anzahl an Stücken nach dem nächsten erwarteten, die zwischengespeichert
+                werden, höchstens und standardmäßig `2 ** (seq_bits - 1)`
+            max_length (int): größte akzeptierte Länge der Nutzdaten in Bits, wie bei
+                `LengthPrefixedMicroProtocolReceive`
+        '''
+        assert(unit in self.ALLOWED_UNITS)
+        self.transmission_state = TransmissionState.WAITING_FOR_TRANSMISSION
+        if unit == self.BITS:
+            self.slice_size = slice_size
+        elif unit == self.BYTES:
+            self.slice_size = slice_size * 8
+        assert(1 <= seq_bits < self.slice_size)
+        self.seq_bits = seq_bits
+        self.seq_modulus = 1 << seq_bits
+        if window is None:
+            window = self.seq_modulus >> 1 or 1
+        assert(1 <= window <= max(self.seq_modulus >> 1, 1))
+        self.window = window
+        # nächste erwartete Sequenznummer, ohne Überlauf gezählt
+        self.next_seq = 0
+        self.pending = dict()
+        self.duplicates = 0
+        self.reader = _LengthPrefixedReader(max_length)
+
+    def postprocess(self, data: Bits) -> MicroProtocolResponse:
+        '''Verarbeitung von Empfangenen Daten.
+
+        Parameters:
+            data (Bits): vom ProtocolAdapter aus der Übertragung extrahierte Daten, die ausgewertet
+                werden sollen.
+        Returns:
+            MicroProtocolResponse, die Zustand der Übertragung und alle ab jetzt zusammenhängend
+            vorliegenden Daten enthält.
+        '''
+        assert(type(data) == Bits)
+        if self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            return MicroProtocolResponse(self.transmission_state)
+        self.transmission_state = TransmissionState.ACTIVE_TRANSMISSION
+
+        distance = (data[:self.seq_bits].uint - self.next_seq) % self.seq_modulus
+        seq = self.next_seq + distance
+        if distance >= self.window or seq in self.pending:
+            self.duplicates += 1
+            return MicroProtocolResponse(self.transmission_state)
+        self.pending[seq] = data[self.seq_bits:]
+        if distance > 0:
+            return MicroProtocolResponse(self.transmission_state)
+
+        contiguous = list()
+        while self.next_seq in self.pending:
+            contiguous.append(self.pending.pop(self.next_seq))
+            self.next_seq += 1
+        payload, expected_length = self.reader.feed(Bits().join(contiguous))
+        if self.reader.finished:
+            self.transmission_state = TransmissionState.FINISHED_TRANSMISSION
+            self.pending.clear()
+        return MicroProtocolResponse(self.transmission_state, payload, expected_length)
+
+class FECMicroProtocolSend(MicroProtocolSend):
+    '''Vorwärtsfehlerkorrektur, die um ein beliebiges anderes Mikroprotokoll gelegt wird.
+
+    Die Stücke des inneren Mikroprotokolls werden in Blöcke zu `group_size * interleave` Stücken
+    eingeteilt. Für jede der `interleave` Spalten eines Blocks (Stück `i` gehört zur Spalte
+    `i % interleave`) wird ein Paritätsstück aus dem XOR aller Stücke der Spalte angehängt. Der
+    Empfänger kann so pro Spalte ein verlorenes Stück ohne Rückkanal wiederherstellen, durch die
+    Verschränkung auch bis zu `interleave` direkt aufeinanderfolgende. Der Mehraufwand beträgt
+    `1 / group_size`.
+
+    Jedem Stück wird eine Sequenznummer mit `seq_bits` Bits vorangestellt, an der der Empfänger
+    Verluste und die Position im Block erkennt. Ein unvollständiger letzter Block wird mit
+    Null-Stücken aufgefüllt, die das innere Mikroprotokoll nach dem Ende der Übertragung ignoriert.
+    '''
+
+    def __init__(self, microprotocol: MicroProtocolSend, group_size: int=4, interleave: int=1, seq_bits: int=8):
+        '''Erstellt ein FECMicroProtocolSend
+
+        Parameters:
+            microprotocol (MicroProtocolSend): inneres Mikroprotokoll, das Stücke mit fester Länge
+                `slice_size` (in Bits) erzeugt
+            group_size (int): Anzahl an Stücken, die durch ein Paritätsstück geschützt werden
+            interleave (int): Anzahl an verschränkten Gruppen pro Block
+            seq_bits (int): Länge der Sequenznummer in Bits
+        '''
+        assert(group_size >= 1 and interleave >= 1)
+        # Empfänger benötigt zwei Blöcke in der Hälfte des Sequenznummernraums
+        assert(4 * interleave * (group_size + 1) <= 1 << seq_bits)
+        self.microprotocol = microprotocol
+        self.group_size = group_size
+        self.interleave = interleave
+        self.seq_bits = seq_bits
+        self.inner_size = microprotocol.slice_size
+        self.slice_size = seq_bits + self.inner_size
+
+    def preprocess(self, data: Bits) -> [Bits]:
+        '''Vorbereitung der Daten zum Versand durch das innere Mikroprotokoll und Ergänzung der
+        Paritätsstücke.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Vorbereitete Daten, die durch den ProtocolAdapter versendet werden können.
+        '''
+        assert(type(data) == Bits)
+        return list(self.iter_preprocess(data))
+
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        return self._encode(self.microprotocol.iter_preprocess(data))
+
+    def preprocess_stream(self, chunks: Iterable[bytes]) -> Iterator[Bits]:
+        return self._encode(self.microprotocol.preprocess_stream(chunks))
+
+    def _encode(self, slices: Iterable[Bits]) -> Iterator[Bits]:
+        seq_mask = (1 << self.seq_bits) - 1
+        data_per_block = self.group_size * self.interleave
+        parity = [0] * self.interleave
+        seq = 0
+        count = 0
+        for data_slice in slices:
+            assert(len(data_slice) == self.inner_size)
+            value = data_slice.uint
+            parity[count % self.interleave] ^= value
+            yield Bits(uint=((seq & seq_mask) << self.inner_size) | value, length=self.slice_size)
+            seq += 1
+            count += 1
+            if count == data_per_block:
+                for value in parity:
+                    yield Bits(uint=((seq & seq_mask) << self.inner_size) | value, length=self.slice_size)
+                    seq += 1
+                parity = [0] * self.interleave
+                count = 0
+        if count == 0:
+            return
+        for i in range(count, data_per_block):
+            yield Bits(uint=(seq & seq_mask) << self.inner_size, length=self.slice_size)
+            seq += 1
+        for value in parity:
+            yield Bits(uint=((seq & seq_mask) << self.inner_size) | value, length=self.slice_size)
+            seq += 1
+
+class FECMicroProtocolReceive(MicroProtocolReceive):
+    '''Empfang von Daten, die mit `FECMicroProtocolSend` versendet wurden.
+
+    Stücke werden anhand ihrer Sequenznummer in Blöcke einsortiert. Sobald alle Datenstücke eines
+    Blocks vorliegen oder mit Hilfe der Parität wiederhergestellt wurden, werden sie der Reihe nach
+    an das innere Mikroprotokoll übergeben. Trifft bereits ein Stück des übernächsten Blocks ein,
+    gilt der aktuelle Block als abgeschlossen; nicht wiederherstellbare Stücke werden dann in `lost`
+    gezählt und übersprungen. Wiederhergestellte Stücke werden in `recovered` gezählt.
+
+    Wie bei `SequenceMicroProtocolReceive` wird jedes übergebene Stück als Teil der Übertragung
+    behandelt.
+    '''
+
+    def __init__(self, microprotocol: MicroProtocolReceive, group_size: int=4, interleave: int=1, seq_bits: int=8):
+        '''Erstellt ein FECMicroProtocolReceive
+
+        Parameters:
+            microprotocol (MicroProtocolReceive): inneres Mikroprotokoll mit fester Stücklänge
+                `slice_size` (in Bits)
+            group_size (int): Anzahl an Stücken, die durch ein Paritätsstück geschützt werden
+            interleave (int): Anzahl an verschränkten Gruppen pro Block
+            seq_bits (int): Länge der Sequenznummer in Bits
+        '''
+        assert(group_size >= 1 and interleave >= 1)
+        assert(4 * interleave * (group_size + 1) <= 1 << seq_bits)
+        self.microprotocol = microprotocol
+        self.group_size = group_size
+        self.interleave = interleave
+        self.seq_bits = seq_bits
+        self.seq_modulus = 1 << seq_bits
+        self.inner_size = microprotocol.slice_size
+        self.slice_size = seq_bits + self.inner_size
+        self.data_per_block = group_size * interleave
+        self.block_size = self.data_per_block + interleave
+        self.transmission_state = microprotocol.transmission_state
+        # aktueller Block, ohne Überlauf gezählt, und zwischengespeicherte Blöcke
+        self.block = 0
+        self.blocks = dict()
+        self.recovered = 0
+        self.lost = 0
+
+    def postprocess(self, data: Bits) -> MicroProtocolResponse:
+        '''Verarbeitung von Empfangenen Daten.
+
+        Parameters:
+            data (Bits): vom ProtocolAdapter aus der Übertragung extrahierte Daten, die ausgewertet
+                werden sollen.
+        Returns:
+            MicroProtocolResponse mit dem Zustand des inneren Mikroprotokolls und allen Daten, die es
+            für die dabei übergebenen Stücke geliefert hat.
+        '''
+        assert(type(data) == Bits)
+        if self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            return MicroProtocolResponse(self.transmission_state)
+
+        value = data.uint
+        base = self.block * self.block_size
+        distance = ((value >> self.inner_size) - base) % self.seq_modulus
+        if distance >= self.seq_modulus >> 1:
+            # Stück eines bereits abgeschlossenen Blocks
+            return MicroProtocolResponse(self.transmission_state)
+        block, position = divmod(base + distance, self.block_size)
+        slots = self.blocks.setdefault(block, [None] * self.block_size)
+        slots[position] = value & ((1 << self.inner_size) - 1)
+
+        parts = list()
+        expected_length = None
+        while self.transmission_state is not TransmissionState.FINISHED_TRANSMISSION:
+            slots = self.blocks.get(self.block)
+            if slots is None:
+                if not self.blocks or max(self.blocks) < self.block + 2:
+                    break
+                slots = [None] * self.block_size
+            else:
+                self._recover(slots)
+            if None in slots[:self.data_per_block] and max(self.blocks) < self.block + 2:
+                break
+            for value in slots[:self.data_per_block]:
+                if value is None:
+                    self.lost += 1
+                    continue
+                resp = self.microprotocol.postprocess(Bits(uint=value, length=self.inner_size))
+                self.transmission_state = resp.transmission_state
+                if resp.data is not None:
+                    parts.append(resp.data)
+                if resp.expected_length is not None:
+                    expected_length = resp.expected_length
+                if self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+                    break
+            self.blocks.pop(self.block, None)
+            self.block += 1
+
+        if self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            self.blocks.clear()
+        payload = Bits().join(parts) if parts else None
+        return MicroProtocolResponse(self.transmission_state, payload, expected_length)
+
+    def _recover(self, slots: list):
+        for column in range(self.interleave):
+            indices = list(range(column, self.data_per_block, self.interleave)) + [self.data_per_block + column]
+            missing = [i for i in indices if slots[i] is None]
+            if len(missing) != 1 or missing[0] >= self.data_per_block:
+                continue
+            value = 0
+            for i in indices:
+                if i != missing[0]:
+                    value ^= slots[i]
+            slots[missing[0]] = value
+            self.recovered += 1
+
+class _SplitMix64:
+    '''Kleiner deterministischer Pseudozufallszahlengenerator (SplitMix64), damit Sender und
+    Empfänger unabhängig von der Python-Version dieselben Zahlen erzeugen.'''
+    MASK = (1 << 64) - 1
+
+    def __init__(self, seed: int):
+        self.state = seed & self.MASK
+
+    def next(self) -> int:
+        self.state = (self.state + 0x9e3779b97f4a7c15) & self.MASK
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xbf58476d1ce4e5b9) & self.MASK
+        z = ((z ^ (z >> 27)) * 0x94d049bb133111eb) & self.MASK
+        return z ^ (z >> 31)
+
+    def below(self, n: int) -> int:
+        '''Zufallszahl aus range(n)'''
+        return (self.next() * n) >> 64
+
+class _LTCode:
+    '''Gemeinsame Berechnungen von Sender und Empfänger eines LT-Codes (Luby Transform).
+
+    Für jedes kodierte Symbol werden Grad und Quellsymbole allein aus seiner Nummer und dem
+    gemeinsamen `seed` abgeleitet. Der Grad folgt der robusten Soliton-Verteilung.
+    '''
+    def __init__(self, k: int, seed: int, c: float=0.03, delta: float=0.5):
+        self.k = k
+        self.seed = seed
+        # robuste Soliton-Verteilung als kumulierte Wahrscheinlichkeiten
+        weights = [0.0, 1 / k] + [1 / (d * (d - 1)) for d in range(2, k + 1)]
+        r = c * math.log(k / delta) * math.sqrt(k)
+        spike = min(k, max(1, int(round(k / r)))) if r > 0 else k
+        for d in range(1, spike):
+            weights[d] += r / (d * k)
+        weights[spike] += r * math.log(r / delta) / k if r > delta else 0.0
+        total = sum(weights)
+        self.cdf = list()
+        cumulative = 0.0
+        for weight in weights[1:]:
+            cumulative += weight / total
+            self.cdf.append(cumulative)
+
+    def indices(self, counter: int) -> [int]:
+        '''Quellsymbole, aus denen das kodierte Symbol mit der Nummer `counter` besteht'''
+        rng = _SplitMix64((self.seed << 32) ^ counter)
+        degree = min(bisect.bisect_right(self.cdf, (rng.next() >> 11) / (1 << 53)) + 1, self.k)
+        chosen = set()
+        while len(chosen) < degree:
+            chosen.add(rng.below(self.k))
+        return list(chosen)
+
+class FountainMicroProtocolSend(MicroProtocolSend):
+    '''Mikroprotokoll, das Daten mit einem LT-Code (Fountain-Code) in einen unbegrenzten Strom von
+    kodierten Symbolen umwandelt.
+
+    Die Nutzdaten werden mit vorangestellter Länge (Varint, wie bei `LengthPrefixedMicroProtocolSend`)
+    in `k` Quellsymbole zu `slice_size - counter_bits` Bits aufgeteilt. Jedes Stück besteht aus
+    einer Symbolnummer mit `counter_bits` Bits und dem XOR mehrerer Quellsymbole, die sich aus der
+    Nummer ergeben. Jedes `meta_interval`-te Stück enthält stattdessen `k`.
+
+    Der Empfänger kann zu einem beliebigen Zeitpunkt einsteigen und ist fertig, sobald er etwas mehr
+    als `k` Symbole empfangen hat. Die Reihenfolge der Stücke spielt keine Rolle. Ohne `max_symbols`
+    endet der Strom nicht; Adapter wie `ProtocolSendAdapterPCAP` senden dann so lange, bis sie
+    abgebrochen werden.
+    '''
+    BYTES = 'bytes'
+    BITS = 'bits'
+    ALLOWED_UNITS = [BYTES, BITS]
+
+    def __init__(self, slice_size: int, unit='bytes', counter_bits: int=16, meta_interval: int=16, seed: int=0, max_symbols: int=None):
+        '''Erstellt ein FountainMicroProtocolSend
+
+        Parameters:
+            slice_size (int): Länge der Stücke inkl. Symbolnummer
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            counter_bits (int): Länge der Symbolnummer in Bits, nach `2 ** counter_bits` Symbolen
+                wiederholt sich der Strom
+            meta_interval (int): Abstand der Stücke, die statt eines Symbols `k` enthalten
+            seed (int): gemeinsamer Startwert für die Auswahl der Quellsymbole, wie beim Empfänger
+            max_symbols (int): Anzahl der Stücke, nach denen der Strom endet, standardmäßig unbegrenzt
+        '''
+        assert(unit in self.ALLOWED_UNITS)
+        if unit == self.BITS:
+            self.slice_size = slice_size
+        elif unit == self.BYTES:
+            self.slice_size = slice_size * 8
+        assert(1 <= counter_bits < self.slice_size)
+        assert(meta_interval >= 2)
+        self.counter_bits = counter_bits
+        self.symbol_size = self.slice_size - counter_bits
+        self.meta_interval = meta_interval
+        self.seed = seed
+        self.max_symbols = max_symbols
+        self.slicer = SimpleBitSlicer(slice_size=self.symbol_size, padding=Bits(self.symbol_size))
+
+    def preprocess(self, data: Bits) -> [Bits]:
+        '''Vorbereitung der Daten zum Versand. Nur mit `max_symbols` möglich, da der Strom
+        ansonsten nicht endet; siehe `iter_preprocess()`.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Vorbereitete Daten, die durch den ProtocolAdapter versendet werden können.
+        '''
+        assert(type(data) == Bits)
+        assert(self.max_symbols is not None)
+        return list(self.iter_preprocess(data))
+
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        '''Erzeugt den Strom der kodierten Symbole.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Iterator über die Stücke, unbegrenzt oder bis `max_symbols`
+        '''
+        assert(type(data) == Bits)
+        source = [s.uint for s in self.slicer.iter_slices(Bits(_encode_varint(len(data))) + data)]
+        k = len(source)
+        if k >= 1 << self.symbol_size:
+            raise ValueError(f"{k} source symbols do not fit into symbols of {self.symbol_size} bits")
+        code = _LTCode(k, self.seed)
+        counter_mask = (1 << self.counter_bits) - 1
+        counter = 0
+        while self.max_symbols is None or counter < self.max_symbols:
+            number = counter & counter_mask
+            if number % self.meta_interval == 0:
+                value = k
+            else:
+                value = 0
+                for index in code.indices(number):
+                    value ^= source[index]
+            yield Bits(uint=(number << self.symbol_size) | value, length=self.slice_size)
+            counter += 1
+
+class FountainMicroProtocolReceive(MicroProtocolReceive):
+    '''Mikroprotokoll für den Empfang von Daten, die mit `FountainMicroProtocolSend` versendet wurden.
+
+    Die Symbole werden mit einem Peeling-Decoder verarbeitet: Symbole, die nur noch ein unbekanntes
+    Quellsymbol enthalten, lösen dieses auf, das dann aus allen anderen Symbolen entfernt wird. Bis
+    `k` aus einem Meta-Stück bekannt ist, werden Symbole zwischengespeichert. Sind alle Quellsymbole
+    bekannt, werden die Nutzdaten auf einmal geliefert und die Übertragung ist beendet.
+
+    Da es keine Startmarkierung gibt, wird jedes übergebene Stück als Teil der Übertragung behandelt.
+    '''
+    BYTES = 'bytes'
+    BITS = 'bits'
+    ALLOWED_UNITS = [BYTES, BITS]
+
+    def __init__(self, slice_size: int, unit='bytes', counter_bits: int=16, meta_interval: int=16, seed: int=0):
+        '''Erstellt ein FountainMicroProtocolReceive
+
+        Parameters:
+            slice_size (int): Länge der Stücke inkl. Symbolnummer
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            counter_bits (int): Länge der Symbolnummer in Bits, wie beim Sender
+            meta_interval (int): Abstand der Stücke, die `k` enthalten, wie beim Sender
+            seed (int): gemeinsamer Startwert, wie beim Sender
+        '''
+        assert(unit in self.ALLOWED_UNITS)
+        self.transmission_state = TransmissionState.WAITING_FOR_TRANSMISSION
+        if unit == self.BITS:
+            self.slice_size = slice_size
+        elif unit == self.BYTES:
+            self.slice_size = slice_size * 8
+        assert(1 <= counter_bits < self.slice_size)
+        self.counter_bits = counter_bits
+        self.symbol_size = self.slice_size - counter_bits
+        self.meta_interval = meta_interval
+        self.seed = seed
+        self.code = None
+        self.seen = set()
+        # Symbole, die vor `k` angekommen sind
+        self.early = list()
+        # bekannte Quellsymbole und noch nicht aufgelöste Symbole als [Indizes, Wert]
+        self.known = dict()
+        self.symbols = dict()
+        self.waiting = dict()
+        self.next_symbol = 0
+
+    def postprocess(self, data: Bits) -> MicroProtocolResponse:
+        '''Verarbeitung von Empfangenen Daten.
+
+        Parameters:
+            data (Bits): vom ProtocolAdapter aus der Übertragung extrahierte Daten, die ausgewertet
+                werden sollen.
+        Returns:
+            MicroProtocolResponse, die Zustand der Übertragung und, sobald alle Quellsymbole bekannt
+            sind, die vollständigen Nutzdaten enthält.
+        '''
+        assert(type(data) == Bits)
+        if self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            return MicroProtocolResponse(self.transmission_state)
+        self.transmission_state = TransmissionState.ACTIVE_TRANSMISSION
+
+        value = data.uint
+        number = value >> self.symbol_size
+        value &= (1 << self.symbol_size) - 1
+        if number in self.seen:
+            return MicroProtocolResponse(self.transmission_state)
+        self.seen.add(number)
+
+        if number % self.meta_interval == 0:
+            if self.code is None and value > 0:
+                self.code = _LTCode(value, self.seed)
+                for early_number, early_value in self.early:
+                    self._add_symbol(early_number, early_value)
+                self.early = None
+        elif self.code is None:
+            self.early.append((number, value))
+        else:
+            self._add_symbol(number, value)
+
+        if self.code is None or len(self.known) < self.code.k:
+            return MicroProtocolResponse(self.transmission_state)
+        return self._finish()
+
+    def _add_symbol(self, number: int, value: int):
+        indices = set()
+        for index in self.code.indices(number):
+            if index in self.known:
+                value ^= self.known[index]
+            else:
+                indices.add(index)
+        if len(indices) == 0:
+            return
+        symbol_id = self.next_symbol
+        self.next_symbol += 1
+        self.symbols[symbol_id] = [indices, value]
+        for index in indices:
+            self.waiting.setdefault(index, list()).append(symbol_id)
+        if len(indices) == 1:
+            self._peel([symbol_id])
+
+    def _peel(self, ready: [int]):
+        while ready:
+            symbol = self.symbols.pop(ready.pop(), None)
+            if symbol is None or len(symbol[0]) != 1:
+                continue
+            index = symbol[0].pop()
+            if index in self.known:
+                continue
+            self.known[index] = symbol[1]
+            for symbol_id in self.waiting.pop(index, ()):
+                other = self.symbols.get(symbol_id)
+                if other is None or index not in other[0]:
+                    continue
+                other[0].discard(index)
+                other[1] ^= symbol[1]
+                if len(other[0]) == 1:
+                    ready.append(symbol_id)
+
+    def _finish(self) -> MicroProtocolResponse:
+        reader = _LengthPrefixedReader()
+        source = Bits().join(Bits(uint=self.known[i], length=self.symbol_size) for i in range(self.code.k))
+        payload, expected_length = reader.feed(source)
+        if not reader.finished:
+            raise ValueError("decoded data is shorter than its length header")
+        self.transmission_state = TransmissionState.FINISHED_TRANSMISSION
+        self.symbols.clear()
+        self.waiting.clear()
+        return MicroProtocolResponse(self.transmission_state, payload, expected_length)
+
+class SelectiveRepeatMicroProtocolSend(SequenceMicroProtocolSend):
+    '''Zuverlässiges Mikroprotokoll für aktive Kanäle mit Rückrichtung, z.B. Anfrage/Antwort.
+
+    Die Stücke entsprechen denen von `SequenceMicroProtocolSend`. Der Empfänger bestätigt sie in der
+    Antwort mit der nächsten erwarteten Sequenznummer und einer Bitmaske der danach bereits
+    empfangenen Stücke (selektive Bestätigung, SACK). Es werden nur unbestätigte Stücke wiederholt:
+    nach Ablauf des Retransmission-Timeouts, das wie in RFC 6298 aus der gemessenen Round-Trip-Time
+    berechnet wird, oder wenn ein später gesendetes Stück bestätigt wurde und seither ein Viertel
+    der Round-Trip-Time bzw. die doppelte Schwankung vergangen ist (zeitbasierte Verlusterkennung
+    wie RACK, RFC 8985). Dadurch führt die Umsortierung paralleler Anfragen nicht zu unnötigen
+    Wiederholungen.
+
+    Die Anzahl gleichzeitig unbestätigter Stücke (Fenster) wächst mit jeder Bestätigung, anfangs
+    um eins pro Bestätigung, ab `ssthresh` um eins pro Round-Trip-Time, und wird bei Verlusten
+    halbiert (AIMD). So passt sie sich an Round-Trip-Time und Verlustrate des Kanals an.
+
+    Ablauf für Adapter (siehe `ProtocolSendAdapterRequestResponse`): `start()`, dann wiederholt
+    `next_slices()` senden und Antworten an `handle_ack()` übergeben, bis `finished` gesetzt ist.
+    Ohne Rückrichtung verhält sich `preprocess()` wie bei `SequenceMicroProtocolSend`.
+    '''
+    def __init__(self, slice_size: int, unit='bytes', seq_bits: int=16, sack_bits: int=32, initial_window: int=4,
+            max_window: int=None, min_rto: float=0.2, max_rto: float=60.0, padding: Bits=None):
+        '''Erstellt ein SelectiveRepeatMicroProtocolSend
+
+        Parameters:
+            slice_size (int): Länge der Stücke inkl. Sequenznummer
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            seq_bits (int): Länge der Sequenznummer in Bits
+            sack_bits (int): Länge der Bitmaske in den Bestätigungen, wie beim Empfänger
+            initial_window (int): Fenstergröße zu Beginn
+            max_window (int): maximale Fenstergröße, höchstens und standardmäßig `2 ** (seq_bits - 1)`
+            min_rto (float): untere Grenze des Retransmission-Timeouts in Sekunden
+            max_rto (float): obere Grenze des Retransmission-Timeouts in Sekunden
+            padding (Bits): Padding für das letzte Stück, standardmäßig Null-Bits
+        '''
+        super().__init__(slice_size, unit, seq_bits, padding)
+        self.sack_bits = sack_bits
+        self.seq_modulus = 1 << seq_bits
+        if max_window is None:
+            max_window = max(self.seq_modulus >> 1, 1)
+        assert(1 <= max_window <= max(self.seq_modulus >> 1, 1))
+        self.max_window = max_window
+        self.initial_window = min(initial_window, max_window)
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        # bis zum Aufruf von start() gibt es nichts zu senden
+        self.finished = True
+
+    def start(self, data: Bits):
+        '''Beginnt eine neue Übertragung.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        '''
+        assert(type(data) == Bits)
+        self.source = self.iter_preprocess(data)
+        self.exhausted = False
+        self.finished = False
+        # niedrigste unbestätigte und nächste neue Sequenznummer, ohne Überlauf gezählt
+        self.base = 0
+        self.next_seq = 0
+        self.unacked = dict()
+        self.sent_at = dict()
+        self.retransmitted = set()
+        # Sendezeitpunkt und Round-Trip-Time des zuletzt gesendeten bestätigten Stücks
+        self.rack_sent = None
+        self.rack_rtt = 0.0
+        self.recovery_point = 0
+        self.retransmissions = 0
+        self.window = float(self.initial_window)
+        self.ssthresh = float(self.max_window)
+        self.srtt = None
+        self.rttvar = None
+        self.rto = 1.0
+
+    def next_slices(self, now: float) -> [Bits]:
+        '''Liefert die Stücke, die jetzt gesendet werden sollen: fällige Wiederholungen und neue
+        Stücke, soweit das Fenster es erlaubt.
+
+        Parameters:
+            now (float): aktuelle Zeit in Sekunden, z.B. `time.monotonic()`
+        Returns:
+            zu sendende Stücke
+        '''
+        result = list()
+        timed_out = [seq for seq, sent in self.sent_at.items() if now - sent >= self.rto]
+        if timed_out:
+            self._on_loss()
+            self.rto = min(self.rto * 2, self.max_rto)
+        for seq in sorted(set(timed_out + self._detect_losses(now))):
+            result.append(self._transmit(seq, now, retransmission=True))
+
+        while not self.exhausted and len(self.unacked) < int(self.window) and self.next_seq - self.base < self.max_window:
+            data_slice = next(self.source, None)
+            if data_slice is None:
+                self.exhausted = True
+                break
+            self.unacked[self.next_seq] = data_slice
+            result.append(self._transmit(self.next_seq, now))
+            self.next_seq += 1
+        self._update_finished()
+        return result
+
+    def next_timeout(self, now: float) -> float:
+        '''Zeit in Sekunden bis zum nächsten Retransmission-Timeout oder `None`, wenn keine Stücke
+        unbestätigt sind.'''
+        if not self.sent_at:
+            return None
+        return max(0.0, min(self.sent_at.values()) + self.rto - now)
+
+    def handle_ack(self, ack: Bits, now: float):
+        '''Verarbeitet eine Bestätigung des Empfängers.
+
+        Parameters:
+            ack (Bits): Bestätigung, wie sie `SelectiveRepeatMicroProtocolReceive` erzeugt
+            now (float): aktuelle Zeit in Sekunden
+        '''
+        if len(ack) < self.seq_bits + self.sack_bits:
+            return
+        distance = (ack[:self.seq_bits].uint - self.base) % self.seq_modulus
+        if distance > self.next_seq - self.base:
+            # veraltete Bestätigung
+            return
+        cumulative = self.base + distance
+        bitmap = ack[self.seq_bits:self.seq_bits + self.sack_bits].uint
+        acked = [seq for seq in self.unacked if seq < cumulative]
+        for i in range(self.sack_bits):
+            if bitmap >> (self.sack_bits - 1 - i) & 1 and cumulative + 1 + i in self.unacked:
+                acked.append(cumulative + 1 + i)
+
+        rtt = None
+        for seq in acked:
+            del self.unacked[seq]
+            sent = self.sent_at.pop(seq)
+            if seq not in self.retransmitted:
+                # Karn-Algorithmus: nur Stücke ohne Wiederholung liefern eindeutige Messungen
+                rtt = now - sent
+                if self.rack_sent is None or sent >= self.rack_sent:
+                    self.rack_sent = sent
+                    self.rack_rtt = rtt
+            if self.window < self.ssthresh:
+                self.window += 1
+            else:
+                self.window += 1 / self.window
+        self.window = min(self.window, float(self.max_window))
+        if rtt is not None:
+            self._update_rto(rtt)
+        self.base = min(self.unacked, default=self.next_seq)
+        self._update_finished()
+
+    def _detect_losses(self, now: float) -> [int]:
+        if self.rack_sent is None:
+            return []
+        # Schwankungen der Round-Trip-Time gelten ebenfalls als Umsortierung, nicht als Verlust
+        reordering_window = max(self.srtt / 4, 2 * self.rttvar)
+        lost = [seq for seq, sent in self.sent_at.items()
+            if sent < self.rack_sent and now - sent >= self.rack_rtt + reordering_window]
+        if any(seq >= self.recovery_point for seq in lost):
+            self._on_loss()
+        return lost
+
+    def _transmit(self, seq: int, now: float, retransmission: bool=False) -> Bits:
+        self.sent_at[seq] = now
+        if retransmission:
+            self.retransmitted.add(seq)
+            self.retransmissions += 1
+        return self.unacked[seq]
+
+    def _on_loss(self):
+        self.ssthresh = max(self.window / 2, 1.0)
+        self.window = self.ssthresh
+        self.recovery_point = self.next_seq
+
+    def _update_rto(self, rtt: float):
+        # RFC 6298, Abschnitt 2
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.rto = min(max(self.srtt + 4 * self.rttvar, self.min_rto), self.max_rto)
+
+    def _update_finished(self):
+        self.finished = self.exhausted and not self.unacked
+
+class SelectiveRepeatMicroProtocolReceive(SequenceMicroProtocolReceive):
+    '''Mikroprotokoll für den Empfang von Daten, die mit `SelectiveRepeatMicroProtocolSend`
+    versendet wurden.
+
+    Der Empfang entspricht `SequenceMicroProtocolReceive`. Zusätzlich enthält jede Antwort in `ack`
+    eine Bestätigung: die nächste erwartete Sequenznummer (`seq_bits` Bits), gefolgt von einer
+    Bitmaske mit `sack_bits` Bits, deren i-tes Bit (höchstwertiges zuerst) angibt, ob das Stück
+    `nächste + 1 + i` bereits empfangen wurde. Auch nach Ende der Übertragung werden wiederholte
+    Stücke bestätigt, falls eine Bestätigung verloren ging.
+    '''
+
+    def __init__(self, slice_size: int, unit='bytes', seq_bits: int=16, sack_bits: int=32, window: int=None,
+            max_length: int=None):
+        '''Erstellt ein SelectiveRepeatMicroProtocolReceive
+
+        Parameters:
+            slice_size (int): Länge der Stücke inkl. Sequenznummer
+            unit (str): Einheit, in der `slice_size` angegeben wurde, entweder 'bytes' oder 'bits'
+            seq_bits (int): Länge der Sequenznummer in Bits
+            sack_bits (int): Länge der Bitmaske in den Bestätigungen
+            window (int): Anzahl an Stücken nach dem nächsten erwarteten, die zwischengespeichert
+                werden, höchstens und standardmäßig `2 ** (seq_bits - 1)`
+            max_length (int): größte akzeptierte Länge der Nutzdaten in Bits, wie bei
+                `LengthPrefixedMicroProtocolReceive`
+        '''
+        super().__init__(slice_size, unit, seq_bits, window, max_length)
+        self.sack_bits = sack_bits
+
+    def postprocess(self, data: Bits) -> MicroProtocolResponse:
+        '''Verarbeitung von Empfangenen Daten wie bei `SequenceMicroProtocolReceive`, ergänzt um
+        die Bestätigung in `ack`.
+
+        Parameters:
+            data (Bits): vom ProtocolAdapter aus der Übertragung extrahierte Daten
+        Returns:
+            MicroProtocolResponse mit Zustand, evtl. empfangenen Daten und Bestätigung
+        '''
+        resp = super().postprocess(data)
+        bitmap = 0
+        for i in range(self.sack_bits):
+            if self.next_seq + 1 + i in self.pending:
+                bitmap |= 1 << (self.sack_bits - 1 - i)
+        resp.ack = Bits(uint=((self.next_seq % self.seq_modulus) << self.sack_bits) | bitmap,
+            length=self.seq_bits + self.sack_bits)
+        return resp
+
+class MultiplexMicroProtocolSend(MicroProtocolSend):
+    '''Mikroprotokoll, das die Stücke eines inneren Mikroprotokolls mit einer Stream-ID versieht.
+
+    Dadurch können mehrere Übertragungen, z.B. von mehreren Sendern oder mehrere Nachrichten eines
+    Senders, denselben Kanal und denselben Empfänger (`MultiplexMicroProtocolReceive`) nutzen. Jedem
+    Stück wird die Stream-ID mit `stream_bits` Bits vorangestellt.
+    '''
+
+    def __init__(self, microprotocol: MicroProtocolSend, stream_id: int=0, stream_bits: int=4):
+        '''Erstellt ein MultiplexMicroProtocolSend
+
+        Parameters:
+            microprotocol (MicroProtocolSend): inneres Mikroprotokoll, das Stücke mit fester Länge
+                `slice_size` (in Bits) erzeugt
+            stream_id (int): Stream-ID dieses Senders
+            stream_bits (int): Länge der Stream-ID in Bits
+        '''
+        assert(0 <= stream_id < 1 << stream_bits)
+        self.microprotocol = microprotocol
+        self.stream_id = stream_id
+        self.stream_bits = stream_bits
+        self.slice_size = stream_bits + microprotocol.slice_size
+
+    def preprocess(self, data: Bits) -> [Bits]:
+        '''Vorbereitung der Daten zum Versand durch das innere Mikroprotokoll, jedes Stück erhält
+        zusätzlich die Stream-ID.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Vorbereitete Daten, die durch den ProtocolAdapter versendet werden können.
+        '''
+        assert(type(data) == Bits)
+        return list(self.iter_preprocess(data))
+
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        return self._tag(self.stream_id, self.microprotocol.iter_preprocess(data))
+
+    def preprocess_stream(self, chunks: Iterable[bytes]) -> Iterator[Bits]:
+        return self._tag(self.stream_id, self.microprotocol.preprocess_stream(chunks))
+
+    def interleave(self, messages: {int: Bits}) -> Iterator[Bits]:
+        '''Bereitet mehrere Nachrichten mit jeweils eigener Stream-ID vor und wechselt zwischen ihren
+        Stücken ab, sodass alle Nachrichten gleichzeitig übertragen werden.
+
+        Parameters:
+            messages (dict): Nachrichten nach Stream-ID
+        Returns:
+            Iterator über die vorbereiteten Daten aller Nachrichten
+        '''
+        streams = [self._tag(stream_id, self.microprotocol.iter_preprocess(data)) for stream_id, data in messages.items()]
+        while streams:
+            for stream in list(streams):
+                data_slice = next(stream, None)
+                if data_slice is None:
+                    streams.remove(stream)
+                else:
+                    yield data_slice
+
+    def _tag(self, stream_id: int, slices: Iterable[Bits]) -> Iterator[Bits]:
+        assert(0 <= stream_id < 1 << self.stream_bits)
+        header = Bits(uint=stream_id, length=self.stream_bits)
+        for data_slice in slices:
+            yield header + data_slice
+
+class _Stream:
+    '''Zustand einer einzelnen Übertragung in `MultiplexMicroProtocolReceive`'''
+    def __init__(self, microprotocol: MicroProtocolReceive):
+        self.microprotocol = microprotocol
+        self.buffer = BitAccumulator()
+
+class MultiplexMicroProtocolReceive(MicroProtocolReceive):
+    '''Mikroprotokoll für den Empfang mehrerer Übertragungen, die mit `MultiplexMicroProtocolSend`
+    versendet wurden.
+
+    Für jede Stream-ID werden ein eigenes inneres Mikroprotokoll und ein eigener Empfangspuffer
+    angelegt. Ist eine Übertragung abgeschlossen, wird sie als Paar aus Stream-ID und Daten an
+    `completed_streams` angehängt und an `on_complete` übergeben. Wird die Stream-ID danach erneut
+    verwendet, beginnt eine neue Übertragung, deren Daten als weiteres Paar folgen. Die Daten werden
+    nicht über `MicroProtocolResponse.data` geliefert, der Puffer des Adapters bleibt also leer.
+
+    Die Übertragung insgesamt gilt als beendet, sobald `expected_streams` Übertragungen
+    abgeschlossen sind; ohne diese Angabe läuft der Empfang, bis er abgebrochen wird.
+    '''
+
+    def __init__(self, microprotocol_factory: Callable[[], MicroProtocolReceive], stream_bits: int=4,
+            expected_streams: int=None, on_complete: Callable[[int, bytes], None]=None):
+        '''Erstellt ein MultiplexMicroProtocolReceive
+
+        Parameters:
+            microprotocol_factory: erzeugt für jede Übertragung ein neues inneres Mikroprotokoll,
+                z.B. `lambda: MinimalMicroProtocolReceive(slice_size=4)`
+            stream_bits (int): Länge der Stream-ID in Bits
+            expected_streams (int): Anzahl an Übertragungen, nach denen der Empfang endet (optional)
+            on_complete: wird mit Stream-ID und Daten jeder abgeschlossenen Übertragung aufgerufen
+                (optional)
+        '''
+        self.microprotocol_factory = microprotocol_factory
+        self.stream_bits = stream_bits
+        self.expected_streams = expected_streams
+        self.on_complete = on_complete
+        self.slice_size = stream_bits + microprotocol_factory().slice_size
+        self.transmission_state = TransmissionState.WAITING_FOR_TRANSMISSION
+        self.streams = dict()
+        # (Stream-ID, Daten) in der Reihenfolge, in der die Übertragungen abgeschlossen wurden
+        self.completed_streams = list()
+
+    def postprocess(self, data: Bits) -> MicroProtocolResponse:
+        '''Ordnet empfangene Daten anhand der Stream-ID einer Übertragung zu und verarbeitet sie mit
+        deren innerem Mikroprotokoll.
+
+        Parameters:
+            data (Bits): vom ProtocolAdapter aus der Übertragung extrahierte Daten
+        Returns:
+            MicroProtocolResponse mit dem Zustand aller Übertragungen, ohne Daten
+        '''
+        assert(type(data) == Bits)
+        if self.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            return MicroProtocolResponse(self.transmission_state)
+
+        stream_id = data[:self.stream_bits].uint
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            stream = self.streams[stream_id] = _Stream(self.microprotocol_factory())
+        resp = stream.microprotocol.postprocess(data[self.stream_bits:])
+        if resp.expected_length is not None:
+            stream.buffer.reserve(resp.expected_length)
+        if resp.data is not None and resp.transmission_state is not TransmissionState.WAITING_FOR_TRANSMISSION:
+            stream.buffer.append(resp.data)
+        if resp.transmission_state is TransmissionState.ACTIVE_TRANSMISSION:
+            self.transmission_state = TransmissionState.ACTIVE_TRANSMISSION
+        elif resp.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            del self.streams[stream_id]
+            self._complete(stream_id, bytes(stream.buffer.finalize()))
+        return MicroProtocolResponse(self.transmission_state)
+
+    def _complete(self, stream_id: int, data: bytes):
+        self.completed_streams.append((stream_id, data))
+        if self.on_complete is not None:
+            self.on_complete(stream_id, data)
+        if self.expected_streams is not None and len(self.completed_streams) >= self.expected_streams:
+            self.transmission_state = TransmissionState.FINISHED_TRANSMISSION
+        else:
+            self.transmission_state = TransmissionState.ACTIVE_TRANSMISSION
+
+def _crc_table(poly: int, width: int) -> [int]:
+    '''Tabelle für die byteweise Berechnung einer CRC (höchstwertiges Bit zuerst)'''
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = list()
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for i in range(8):
+            crc = ((crc << 1) ^ poly) if crc & top else (crc << 1)
+        table.append(crc & mask)
+    return table
+
+class _TableCRC:
+    '''CRC mit vorberechneter Tabelle, z.B. CRC-8 (Polynom 0x07) oder CRC-16-CCITT (Polynom 0x1021,
+    Startwert 0xFFFF)'''
+    def __init__(self, poly: int, width: int, init: int):
+        self.table = _crc_table(poly, width)
+        self.width = width
+        self.init = init
+        self.shift = width - 8
+        self.mask = (1 << width) - 1
+
+    def __call__(self, data: bytes) -> int:
+        crc = self.init
+        table, shift, mask = self.table, self.shift, self.mask
+        for byte in data:
+            crc = ((crc << 8) & mask) ^ table[(crc >> shift) ^ byte]
+        return crc
+
+_CRC_FUNCTIONS = {
+    8: _TableCRC(0x07, 8, 0x00),
+    16: _TableCRC(0x1021, 16, 0xffff),
+    32: zlib.crc32,
+}
+
+class CRCMicroProtocolSend(MicroProtocolSend):
+    '''Mikroprotokoll, das an jedes Stück eines inneren Mikroprotokolls eine CRC anhängt.
+
+    Damit kann der Empfänger (`CRCMicroProtocolReceive`) fremde oder beschädigte Stücke erkennen
+    und verwerfen, bevor sie in den Empfangspuffer gelangen. Unterstützt werden CRC-8 (Polynom
+    0x07), CRC-16-CCITT (Polynom 0x1021, Startwert 0xFFFF) und CRC-32 (wie zlib), jeweils über die
+    Bytes des Stücks (`Bits.tobytes()`).
+    '''
+    ALLOWED_CRC_BITS = sorted(_CRC_FUNCTIONS)
+
+    def __init__(self, microprotocol: MicroProtocolSend, crc_bits: int=8):
+        '''Erstellt ein CRCMicroProtocolSend
+
+        Parameters:
+            microprotocol (MicroProtocolSend): inneres Mikroprotokoll, das Stücke mit fester Länge
+                `slice_size` (in Bits) erzeugt
+            crc_bits (int): Länge der CRC, 8, 16 oder 32 Bits
+        '''
+        assert(crc_bits in self.ALLOWED_CRC_BITS)
+        self.microprotocol = microprotocol
+        self.crc_bits = crc_bits
+        self.crc = _CRC_FUNCTIONS[crc_bits]
+        self.slice_size = microprotocol.slice_size + crc_bits
+
+    def preprocess(self, data: Bits) -> [Bits]:
+        '''Vorbereitung der Daten zum Versand durch das innere Mikroprotokoll, an jedes Stück wird
+        zusätzlich die CRC angehängt.
+
+        Parameters:
+            data (Bits): Daten, die versendet werden sollen.
+        Returns:
+            Vorbereitete Daten, die durch den ProtocolAdapter versendet werden können.
+        '''
+        assert(type(data) == Bits)
+        return list(self.iter_preprocess(data))
+
+    def iter_preprocess(self, data: Bits) -> Iterator[Bits]:
+        return self._append_crc(self.microprotocol.iter_preprocess(data))
+
+    def preprocess_stream(self, chunks: Iterable[bytes]) -> Iterator[Bits]:
+        return self._append_crc(self.microprotocol.preprocess_stream(chunks))
+
+    def _append_crc(self, slices: Iterable[Bits]) -> Iterator[Bits]:
+        for data_slice in slices:
+            yield data_slice + Bits(uint=self.crc(data_slice.tobytes()), length=self.crc_bits)
+
+class CRCMicroProtocolReceive(MicroProtocolReceive):
+    '''Empfang von Daten, die mit `CRCMicroProtocolSend` versendet wurden.
+
+    Stücke, deren CRC nicht stimmt, werden verworfen und in `rejected` gezählt. Alle anderen
+    werden ohne CRC an das innere Mikroprotokoll übergeben, dessen Zustand auch der Zustand dieses
+    Mikroprotokolls ist.
+    '''
+    ALLOWED_CRC_BITS = sorted(_CRC_FUNCTIONS)
+
+    def __init__(self, microprotocol: MicroProtocolReceive, crc_bits: int=8):
+        '''Erstellt ein CRCMicroProtocolReceive
+
+        Parameters:
+            microprotocol (MicroProtocolReceive): inneres Mikroprotokoll mit fester Stücklänge
+                `slice_size` (in Bits)
+            crc_bits (int): Länge der CRC, 8, 16 oder 32 Bits, wie beim Sender
+        '''
+        assert(crc_bits in self.ALLOWED_CRC_BITS)
+        self.microprotocol = microprotocol
+        self.crc_bits = crc_bits
+        self.crc = _CRC_FUNCTIONS[crc_bits]
+        self.inner_size = microprotocol.slice_size
+        self.slice_size = self.inner_size + crc_bits
+        self.rejected = 0
+
+    @property
+    def transmission_state(self) -> TransmissionState:
+        return self.microprotocol.transmission_state
+
+    def postprocess(self, data: Bits) -> MicroProtocolResponse:
+        '''Prüft die CRC empfangener Daten und übergibt sie bei Erfolg an das innere Mikroprotokoll.
+
+        Parameters:
+            data (Bits): vom ProtocolAdapter aus der Übertragung extrahierte Daten
+        Returns:
+            MicroProtocolResponse des inneren Mikroprotokolls, bei falscher CRC nur dessen Zustand
+        '''
+        assert(type(data) == Bits)
+        data_slice = data[:self.inner_size]
+        if len(data) != self.slice_size or self.crc(data_slice.tobytes()) != data[self.inner_size:].uint:
+            self.rejected += 1
+            return MicroProtocolResponse(self.transmission_state)
+        return self.microprotocol.postprocess(data_slice)
+
@@ -1,12 +1,44 @@
 from .micro_protocol import MicroProtocolSend, MicroProtocolReceive, TransmissionState
-from .packet_handler import PacketHandlerSend, PacketHandlerReceive
+from .micro_protocol import SequenceMicroProtocolSend, SequenceMicroProtocolReceive, FountainMicroProtocolSend, FountainMicroProtocolReceive
+from .packet_handler import PacketHandlerSend, PacketHandlerReceive, SharedSendBuffer, l4_payload, patch_packet
 from .protocol_adapter import ProtocolSendAdapter, ProtocolReceiveAdapter
+from .ring_buffer import PacketRingBuffer
 
 from abc import abstractmethod
+import asyncio
+import multiprocessing
+import queue
+import select
+import threading
+from typing import Iterable, Iterator
+
 from bitstring import Bits
 from netfilterqueue import NetfilterQueue
 from scapy.all import *
 
+async def _run_nfqueue_async(queue_id: int, callback, done: asyncio.Future):
+    '''Verarbeitet Pakete einer Netfilter-Queue in der laufenden Ereignisschleife, bis `done` erfüllt
+    ist oder der Task abgebrochen wird.'''
+    loop = asyncio.get_running_loop()
+    nfqueue = NetfilterQueue()
+    nfqueue.bind(queue_id, callback)
+    fd = nfqueue.get_fd()
+
+    def read():
+        # Fehler im Callback beenden die Verarbeitung über `done` statt in der Ereignisschleife
+        try:
+            nfqueue.run(False)
+        except Exception as e:
+            if not done.done():
+                done.set_exception(e)
+
+    loop.add_reader(fd, read)
+    try:
+        await done
+    finally:
+        loop.remove_reader(fd)
+        nfqueue.unbind()
+
 class ProtocolSendAdapterNFQ(ProtocolSendAdapter):
     '''Adapter, der Daten mit der Linux-Kernel-Funktion Netfilter-Queue senden kann.
 
@@ -34,11 +66,19 @@ class ProtocolSendAdapterNFQ(ProtocolSendAdapter):
         Parameters:
             data (bytes): Daten, die versendet werden
         '''
-        transmission_data = Bits(data)
-        if self.microprotocol != None:
-            transmission_data = self.microprotocol.preprocess(transmission_data)
-        if type(transmission_data) == Bits:
-            transmission_data = [transmission_data]
+        self._run(self.prepare_transmission(data))
+
+    def send_stream(self, source):
+        '''Nimmt abschnittsweise vorliegende Daten, z.B. eine Datei, zum Versand entgegen.
+        Die Stücke werden erst erzeugt, wenn ein Paket aus der Netfilter-Queue eintrifft, in das sie
+        eingebettet werden können.
+
+        Parameters:
+            source: geöffnete Datei im Binärmodus oder Abschnitte der Daten
+        '''
+        self._run(self.prepare_transmission_stream(source))
+
+    def _run(self, transmission_data):
         self.packet_handler.set_send_buffer(transmission_data)
 
         nfqueue = NetfilterQueue()
@@ -49,19 +89,54 @@ class ProtocolSendAdapterNFQ(ProtocolSendAdapter):
             print(e)
         nfqueue.unbind()
 
-    def handle_packet(self, packet):
-        '''Verarbeitet einzelne, aus der Netfilter-Queue erhaltene, Pakete
-        Diese werden an den PacketHandlerSend, der bei der Erstellung des Adapters angegeben wurde,
-        übergeben und dort manipuliert.
+    async def send_async(self, data: bytes):
+        '''Sendet Daten wie `send()`, verarbeitet die Netfilter-Queue aber in der laufenden
+        asyncio-Ereignisschleife, sodass sich z.B. mehrere Queues, andere Adapter und Timer eine
+        Schleife ohne Threads teilen können.
+
+        Der Dateideskriptor der Queue wird mit `loop.add_reader()` registriert und bereitstehende
+        Pakete mit `run(block=False)` verarbeitet. Sobald alle Stücke versendet wurden, wird ein
+        Future erfüllt, auf das hier gewartet wird; danach eintreffende Pakete werden unverändert
+        angenommen. Wird der Task abgebrochen, wird die Queue ebenfalls freigegeben.
+
+        Parameters:
+            data (bytes): Daten, die versendet werden
+        '''
+        self.packet_handler.set_send_buffer(self.prepare_transmission(data))
+        if not self.packet_handler.has_slices():
+            return
+        done = asyncio.get_running_loop().create_future()
+
+        def handle_packet(packet):
+            try:
+                if not done.done():
+                    self.embed(packet)
+                    if not self.packet_handler.has_slices():
+                        done.set_result(None)
+            finally:
+                packet.accept()
+
+        await _run_nfqueue_async(self.queue_id, handle_packet, done)
+
+    def embed(self, packet):
+        '''Bettet mit dem PacketHandlerSend Daten in ein aus der Netfilter-Queue erhaltenes Paket ein.
+        Das Paket wird hier nicht angenommen, das übernimmt der Aufrufer.
+
         Anschließend werden hier einige Metadaten der Pakete neu berechnet, damit die Pakete auch
         nach Manipulation noch gültig sind (insb. Längenangaben und Prüfsummen).
-
-        Wird hier festgestellt, dass alle Daten versendet wurden, wird eine Exception ausgelöst,
-        wodurch die Verarbeitung der Pakete aus der Netfilter-Queue beendet wird.
+        PacketHandler mit `RAW` verändern stattdessen die Bytes des Pakets direkt, wobei nur die
+        UDP- bzw. TCP-Prüfsumme inkrementell angepasst wird (siehe `patch_packet()`).
 
         Parameters:
             packet: Paket, das verarbeitet werden soll
         '''
+        if self.packet_handler.RAW:
+            # Daten direkt in eine Kopie der Bytes einbetten, Prüfsumme inkrementell anpassen
+            raw = bytearray(packet.get_payload())
+            if patch_packet(raw, self.packet_handler):
+                packet.set_payload(bytes(raw))
+            return
+
         packet.retain() # keep copy of payload after .get_payload
         payload_bytes = packet.get_payload() # raw bytes starting with IP header
         parsed_packet = IP(payload_bytes) # scapy object
@@ -80,9 +155,25 @@ class ProtocolSendAdapterNFQ(ProtocolSendAdapter):
 
         packet_payload_to_send = parsed_packet.build()
         packet.set_payload(packet_payload_to_send)
-        packet.accept()
 
-        if len(self.packet_handler.send_buffer) == 0:
+    def handle_packet(self, packet):
+        '''Verarbeitet einzelne, aus der Netfilter-Queue erhaltene, Pakete
+        Diese werden mit `embed()` an den PacketHandlerSend, der bei der Erstellung des Adapters
+        angegeben wurde, übergeben und dort manipuliert.
+
+        Das Paket wird in jedem Fall genau einmal angenommen, auch wenn beim Einbetten ein Fehler
+        auftritt. Wird hier festgestellt, dass alle Daten versendet wurden, wird eine Exception
+        ausgelöst, wodurch die Verarbeitung der Pakete aus der Netfilter-Queue beendet wird.
+
+        Parameters:
+            packet: Paket, das verarbeitet werden soll
+        '''
+        try:
+            self.embed(packet)
+        finally:
+            packet.accept()
+
+        if not self.packet_handler.has_slices():
             raise Exception("done sending")
 
 class ProtocolReceiveAdapterNFQ(ProtocolReceiveAdapter):
@@ -92,18 +183,35 @@ class ProtocolReceiveAdapterNFQ(ProtocolReceiveAdapter):
     Daten auswerten kann.
     '''
 
-    def __init__(self, queue_id: int, packet_handler: PacketHandlerReceive=None, microprotocol: MicroProtocolReceive=None):
+    def __init__(self, queue_id: int, packet_handler: PacketHandlerReceive=None, microprotocol: MicroProtocolReceive=None,
+            int_mode: bool=False, ring_buffer: PacketRingBuffer=None, poll_interval: float=0.1):
         '''Erstellt einen ProtocolReceiveAdapterNFQ
 
         Parameters:
             queue_id (int): ID der Netfilter-Queue, die zum Empfangen der Daten genutzt werden soll.
             packet_handler (PacketHandlerReceive): Methode zur Extraktion der Daten aus den Paketen
             microprotocol (MicroProtocolReceive): Mikroprotokoll, das zur Nachverarbeitung der Daten genutzt werden soll (optional)
+            int_mode (bool): Daten als Ganzzahlen statt als `Bits` zwischen PacketHandler, Mikroprotokoll
+                und Empfangspuffer weitergeben. Der PacketHandler muss dafür `handle_packet_int()` und
+                eine feste `slice_size` haben, z.B. `PacketHandlerReceiveFixedPositionPayload`.
+            ring_buffer (PacketRingBuffer): wenn angegeben, werden die Pakete nur in diesen Puffer
+                kopiert und sofort angenommen, dekodiert wird in einem eigenen Thread. Erfordert ein
+                Mikroprotokoll, das das Ende der Übertragung erkennt. Der Puffer wird nicht geschlossen.
+            poll_interval (float): Zeit in Sekunden, nach der bei `ring_buffer` ohne neue Pakete
+                geprüft wird, ob die Übertragung beendet ist
         '''
         assert(packet_handler is not None)
+        assert(not int_mode or hasattr(packet_handler, 'handle_packet_int'))
+        assert(ring_buffer is None or microprotocol is not None)
         super().__init__(microprotocol=microprotocol)
         self.packet_handler = packet_handler
         self.queue_id = queue_id
+        self.int_mode = int_mode
+        self.ring_buffer = ring_buffer
+        self.poll_interval = poll_interval
+        self._decode_lock = threading.Lock()
+        self._finished = threading.Event()
+        self._decode_error = None
 
     def receive(self) -> bytes:
         '''Empfängt Daten aus Paketen aus einer Netfilter-Queue und liefert diese Daten zurück. 
@@ -115,6 +223,8 @@ class ProtocolReceiveAdapterNFQ(ProtocolReceiveAdapter):
         Returns:
             Empfangene Daten
         '''
+        if self.ring_buffer is not None:
+            return b''.join(self._receive_decoupled())
         nfqueue = NetfilterQueue()
         nfqueue.bind(self.queue_id, self.handle_packet)
         try:
@@ -122,14 +232,161 @@ class ProtocolReceiveAdapterNFQ(ProtocolReceiveAdapter):
         except Exception as e:
             print(e)
         nfqueue.unbind()
-        tmp_buf = self.buffer
-        self.buffer = Bits()
-        return tmp_buf.tobytes()
+        return self.buffer.finalize()
+
+    def receive_stream(self) -> Iterator[bytes]:
+        '''Empfängt Daten aus Paketen aus einer Netfilter-Queue und liefert diese abschnittsweise zurück.
+
+        Statt `nfqueue.run()` dauerhaft blockieren zu lassen, wird auf neue Pakete am Dateideskriptor
+        der Queue gewartet und diese anschließend ohne Blockieren verarbeitet. Zwischen diesen
+        Durchläufen werden die bisher empfangenen Daten weitergereicht.
+
+        Returns:
+            Iterator über die empfangenen Daten
+        '''
+        if self.ring_buffer is not None:
+            yield from self._receive_decoupled()
+            return
+        nfqueue = NetfilterQueue()
+        nfqueue.bind(self.queue_id, self.handle_packet)
+        try:
+            while True:
+                select.select([nfqueue.get_fd()], [], [])
+                try:
+                    nfqueue.run(block=False)
+                except Exception as e:
+                    print(e)
+                    break
+                chunk = self.drain_buffer()
+                if chunk:
+                    yield chunk
+        finally:
+            nfqueue.unbind()
+        yield self.buffer.finalize()
+
+    async def receive_async(self) -> bytes:
+        '''Empfängt Daten wie `receive()`, verarbeitet die Netfilter-Queue aber in der laufenden
+        asyncio-Ereignisschleife, siehe `ProtocolSendAdapterNFQ.send_async()`.
+
+        Die Übertragung endet, sobald das Mikroprotokoll das Ende erkennt; danach eintreffende Pakete
+        werden nur noch angenommen. Ein `ring_buffer` wird hier nicht unterstützt, da die Pakete
+        ohnehin nur bei Bedarf in der Ereignisschleife verarbeitet werden.
+
+        Returns:
+            Empfangene Daten
+        '''
+        assert(self.microprotocol is not None)
+        assert(self.ring_buffer is None)
+        done = asyncio.get_running_loop().create_future()
+
+        def handle_packet(packet):
+            try:
+                if not done.done():
+                    self.decode(packet.get_payload())
+                    if self.microprotocol.transmission_state == TransmissionState.FINISHED_TRANSMISSION:
+                        done.set_result(None)
+            finally:
+                packet.accept()
+
+        await _run_nfqueue_async(self.queue_id, handle_packet, done)
+        return self.buffer.finalize()
+
+    def _receive_decoupled(self) -> Iterator[bytes]:
+        '''Empfängt Daten, wobei der Callback der Netfilter-Queue die Pakete nur in `ring_buffer`
+        kopiert und ein eigener Thread sie dekodiert, bis das Mikroprotokoll das Ende erkennt.
+
+        Löst das Dekodieren eine Exception aus, endet der Empfang und sie wird hier erneut ausgelöst.
+        '''
+        self._finished = finished = threading.Event()
+        self._decode_error = None
+        decoder = threading.Thread(target=self._decode_loop, args=(finished,), daemon=True)
+        decoder.start()
+        nfqueue = NetfilterQueue()
+        nfqueue.bind(self.queue_id, self.handle_packet_decoupled)
+        try:
+            while not finished.is_set():
+                readable, _, _ = select.select([nfqueue.get_fd()], [], [], self.poll_interval)
+                if readable:
+                    nfqueue.run(block=False)
+                with self._decode_lock:
+                    chunk = self.drain_buffer()
+                if chunk:
+                    yield chunk
+        finally:
+            nfqueue.unbind()
+            finished.set()
+            decoder.join()
+        if self._decode_error is not None:
+            raise self._decode_error
+        yield self.buffer.finalize()
+
+    def _decode_loop(self, finished: threading.Event):
+        try:
+            while not finished.is_set():
+                payload_bytes = self.ring_buffer.get(timeout=self.poll_interval)
+                if payload_bytes is None:
+                    continue
+                with self._decode_lock:
+                    self.decode(payload_bytes)
+                if self.microprotocol.transmission_state == TransmissionState.FINISHED_TRANSMISSION:
+                    finished.set()
+        except Exception as e:
+            # wird von `_receive_decoupled()` im aufrufenden Thread erneut ausgelöst; bis dahin
+            # werden weitere Pakete ohne Kopie angenommen
+            self._decode_error = e
+            finished.set()
+
+    def handle_packet_decoupled(self, packet):
+        '''Kopiert ein aus der Netfilter-Queue erhaltenes Paket in `ring_buffer` und nimmt es sofort
+        an, ohne es auszuwerten. Ist der Puffer voll, wird je nach dessen Einstellung gewartet oder das
+        Paket nur weitergeleitet. Ist die Übertragung beendet, entnimmt der Thread keine Pakete mehr;
+        sie werden dann ohne Kopie angenommen.
+
+        Parameters:
+            packet: Paket, das verarbeitet werden soll
+        '''
+        if not self._finished.is_set():
+            payload_bytes = packet.get_payload()
+            # in Abständen prüfen, ob der Thread noch Plätze freigibt
+            while not self.ring_buffer.put(payload_bytes, timeout=self.poll_interval):
+                if self._finished.is_set() or self.ring_buffer.backpressure == PacketRingBuffer.DROP:
+                    break
+        packet.accept()
+
+    def decode(self, payload_bytes: bytes):
+        '''Extrahiert mit dem PacketHandlerReceive Daten aus einem rohen IP-Paket und übergibt sie
+        an das Mikroprotokoll.
+
+        PacketHandler mit `RAW` erhalten nur die UDP- bzw. TCP-Payload, die direkt aus den Bytes des
+        IP-Pakets gelesen wird, alle anderen ein mit Scapy geparstes Paket.
+
+        Parameters:
+            payload_bytes (bytes): Paket beginnend mit dem IP-Header
+        '''
+        if self.packet_handler.RAW:
+            # UDP- bzw. TCP-Payload direkt aus den Bytes lesen, ohne Scapy
+            payload = l4_payload(memoryview(payload_bytes))
+            if payload is not None:
+                if self.int_mode:
+                    value = self.packet_handler.extract_int(payload)
+                    if value is not None:
+                        self.handle_received_int(value, self.packet_handler.slice_size)
+                else:
+                    self.handle_received_data(self.packet_handler.handle_payload(payload))
+        else:
+            parsed_packet = IP(payload_bytes) # scapy object
+            if self.int_mode:
+                value = self.packet_handler.handle_packet_int(parsed_packet)
+                if value is not None:
+                    self.handle_received_int(value, self.packet_handler.slice_size)
+            else:
+                data = self.packet_handler.handle_packet(parsed_packet)
+                self.handle_received_data(data)
 
     def handle_packet(self, packet):
         '''Verarbeitet einzelne, aus der Netfilter-Queue erhaltene, Pakete
-        Diese werden an den PacketHandlerReceive, der bei der Erstellung des Adapters angegeben wurde,
-        übergeben und dort ausgewertet.
+        Diese werden mit `decode()` an den PacketHandlerReceive, der bei der Erstellung des Adapters
+        angegeben wurde, übergeben und dort ausgewertet.
         Wird hier festgestellt, dass die Übertragung beendet ist, wird eine Exception ausgelöst,
         wodurch die Verarbeitung der Pakete aus der Netfilter-Queue beendet wird.
 
@@ -138,12 +395,203 @@ class ProtocolReceiveAdapterNFQ(ProtocolReceiveAdapter):
         '''
         packet.retain() # keep copy of payload after .get_payload
         payload_bytes = packet.get_payload() # raw bytes starting with IP header
-        parsed_packet = IP(payload_bytes) # scapy object
 
-        data = self.packet_handler.handle_packet(parsed_packet)
-        self.handle_received_data(data)
+        self.decode(payload_bytes)
 
         packet.accept()
         
-        if self.microprotocol.transmission_state == TransmissionState.FINISHED_TRANSMISSION:
+        if self.microprotocol != None and self.microprotocol.transmission_state == TransmissionState.FINISHED_TRANSMISSION:
             raise Exception("transmission finished")
+
+def _check_worker(worker: multiprocessing.Process):
+    '''Löst eine Exception aus, wenn ein Prozess eines Fanout-Adapters mit einem Fehler beendet wurde.'''
+    if worker.exitcode not in (None, 0):
+        raise Exception(f"worker process {worker.name} exited with code {worker.exitcode}")
+
+class ProtocolSendAdapterNFQFanout(ProtocolSendAdapter):
+    '''Adapter, der Daten über mehrere Netfilter-Queues gleichzeitig sendet, z.B. mit der
+    nftables-Regel `queue num 0-3 fanout`.
+
+    Für jede Queue wird ein eigener Prozess gestartet, der die Pakete wie `ProtocolSendAdapterNFQ`
+    verarbeitet. Die Stücke werden über einen `SharedSendBuffer` verteilt, dessen gemeinsamer Zähler
+    bestimmt, welcher Prozess das nächste Stück einbettet. Da die Pakete der einzelnen Queues in
+    beliebiger Reihenfolge beim Empfänger ankommen können, muss das Mikroprotokoll die Reihenfolge
+    wiederherstellen können, also `SequenceMicroProtocolSend` (bzw. eine Unterklasse) oder
+    `FountainMicroProtocolSend` sein.
+    '''
+
+    def __init__(self, queue_ids: Iterable[int], packet_handler: PacketHandlerSend=None, microprotocol: MicroProtocolSend=None,
+            poll_interval: float=0.1):
+        '''Erstellt einen ProtocolSendAdapterNFQFanout
+
+        Parameters:
+            queue_ids (Iterable[int]): IDs der Netfilter-Queues, z.B. `range(0, 4)`
+            packet_handler (PacketHandlerSend): Methode zur Einbettung der Daten in die Pakete
+            microprotocol (MicroProtocolSend): Mikroprotokoll, das zur Vorbereitung der Daten genutzt
+                wird und dem Empfänger das Ordnen der Stücke ermöglicht
+            poll_interval (float): Zeit in Sekunden, nach der ein Prozess ohne neue Pakete prüft, ob
+                alle Stücke versendet wurden
+        '''
+        assert(packet_handler is not None)
+        assert(isinstance(microprotocol, (SequenceMicroProtocolSend, FountainMicroProtocolSend)))
+        super().__init__(microprotocol)
+        self.queue_ids = list(queue_ids)
+        assert(len(self.queue_ids) > 0)
+        self.packet_handler = packet_handler
+        self.poll_interval = poll_interval
+
+    def send(self, data: bytes):
+        '''Nimmt Daten zum Versand entgegen und verarbeitet die Netfilter-Queues in je einem Prozess,
+        bis alle Stücke versendet wurden.
+
+        Parameters:
+            data (bytes): Daten, die versendet werden
+        '''
+        self._run(self.prepare_transmission(data))
+
+    def _run(self, transmission_data):
+        self.packet_handler.send_buffer = SharedSendBuffer(transmission_data)
+        # fork, damit PacketHandler und SendBuffer nicht serialisiert werden müssen
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=self._worker, args=(queue_id,)) for queue_id in self.queue_ids]
+        for worker in workers:
+            worker.start()
+        try:
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(self.poll_interval)
+                    _check_worker(worker)
+            for worker in workers:
+                _check_worker(worker)
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+
+    def _worker(self, queue_id: int):
+        adapter = ProtocolSendAdapterNFQ(queue_id, self.packet_handler)
+
+        def handle_packet(packet):
+            try:
+                adapter.handle_packet(packet)
+            except IndexError:
+                # ein anderer Prozess hat das letzte Stück zwischen Prüfung und Entnahme beansprucht,
+                # das Paket wurde unverändert angenommen
+                raise Exception("done sending")
+
+        nfqueue = NetfilterQueue()
+        nfqueue.bind(queue_id, handle_packet)
+        try:
+            while self.packet_handler.has_slices():
+                readable, _, _ = select.select([nfqueue.get_fd()], [], [], self.poll_interval)
+                if readable:
+                    try:
+                        nfqueue.run(block=False)
+                    except Exception as e:
+                        print(e)
+                        break
+        finally:
+            nfqueue.unbind()
+
+class _ProtocolReceiveAdapterNFQWorker(ProtocolReceiveAdapterNFQ):
+    '''Extrahiert in einem Prozess von `ProtocolReceiveAdapterNFQFanout` die Daten aus den Paketen
+    einer Queue und sammelt sie für die Weitergabe an den Hauptprozess.'''
+
+    def __init__(self, queue_id: int, packet_handler: PacketHandlerReceive, int_mode: bool):
+        super().__init__(queue_id, packet_handler, int_mode=int_mode)
+        self.batch = []
+
+    def handle_received_data(self, data: Bits):
+        if data is not None:
+            self.batch.append(data)
+
+    def handle_received_int(self, value: int, length: int):
+        self.batch.append((value, length))
+
+class ProtocolReceiveAdapterNFQFanout(ProtocolReceiveAdapter):
+    '''Adapter, der Daten aus mehreren Netfilter-Queues gleichzeitig empfängt, z.B. mit der
+    nftables-Regel `queue num 0-3 fanout`.
+
+    Für jede Queue extrahiert ein eigener Prozess wie `ProtocolReceiveAdapterNFQ` die Daten aus den
+    Paketen und gibt sie blockweise über eine `multiprocessing.Queue` an den Hauptprozess weiter.
+    Dort werden die Blöcke aller Prozesse zusammengeführt und an das Mikroprotokoll übergeben. Die
+    Reihenfolge innerhalb einer Queue bleibt erhalten, zwischen den Queues nicht; das Mikroprotokoll
+    muss die Stücke daher anhand von Sequenznummern ordnen, z.B. `SequenceMicroProtocolReceive`.
+    '''
+
+    def __init__(self, queue_ids: Iterable[int], packet_handler: PacketHandlerReceive=None, microprotocol: MicroProtocolReceive=None,
+            int_mode: bool=False, poll_interval: float=0.1):
+        '''Erstellt einen ProtocolReceiveAdapterNFQFanout
+
+        Parameters:
+            queue_ids (Iterable[int]): IDs der Netfilter-Queues, z.B. `range(0, 4)`
+            packet_handler (PacketHandlerReceive): Methode zur Extraktion der Daten aus den Paketen
+            microprotocol (MicroProtocolReceive): Mikroprotokoll, das zur Nachverarbeitung der Daten
+                genutzt wird, die Stücke ordnet und das Ende der Übertragung erkennt, also
+                `SequenceMicroProtocolReceive` (bzw. eine Unterklasse) oder `FountainMicroProtocolReceive`
+            int_mode (bool): Daten als Ganzzahlen weitergeben, siehe `ProtocolReceiveAdapterNFQ`
+            poll_interval (float): Zeit in Sekunden, nach der ein Prozess ohne neue Pakete prüft, ob
+                die Übertragung beendet ist bzw. der Hauptprozess, ob alle Prozesse noch laufen
+        '''
+        assert(packet_handler is not None)
+        assert(isinstance(microprotocol, (SequenceMicroProtocolReceive, FountainMicroProtocolReceive)))
+        assert(not int_mode or hasattr(packet_handler, 'handle_packet_int'))
+        super().__init__(microprotocol=microprotocol)
+        self.queue_ids = list(queue_ids)
+        assert(len(self.queue_ids) > 0)
+        self.packet_handler = packet_handler
+        self.int_mode = int_mode
+        self.poll_interval = poll_interval
+
+    def receive(self) -> bytes:
+        '''Empfängt Daten aus allen Netfilter-Queues, bis das Mikroprotokoll das Ende der
+        Übertragung erkennt, und liefert diese zurück.'''
+        return b''.join(self.receive_stream())
+
+    def receive_stream(self) -> Iterator[bytes]:
+        '''Empfängt Daten aus allen Netfilter-Queues und liefert diese abschnittsweise zurück.'''
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        stop = context.Event()
+        workers = [context.Process(target=self._worker, args=(queue_id, results, stop)) for queue_id in self.queue_ids]
+        for worker in workers:
+            worker.start()
+        try:
+            while self.microprotocol.transmission_state is not TransmissionState.FINISHED_TRANSMISSION:
+                try:
+                    batch = results.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    for worker in workers:
+                        _check_worker(worker)
+                    continue
+                for item in batch:
+                    if self.int_mode:
+                        self.handle_received_int(*item)
+                    else:
+                        self.handle_received_data(item)
+                chunk = self.drain_buffer()
+                if chunk:
+                    yield chunk
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join(self.poll_interval * 10)
+                if worker.is_alive():
+                    worker.terminate()
+        yield self.buffer.finalize()
+
+    def _worker(self, queue_id: int, results, stop):
+        adapter = _ProtocolReceiveAdapterNFQWorker(queue_id, self.packet_handler, self.int_mode)
+        nfqueue = NetfilterQueue()
+        nfqueue.bind(queue_id, adapter.handle_packet)
+        try:
+            while not stop.is_set():
+                readable, _, _ = select.select([nfqueue.get_fd()], [], [], self.poll_interval)
+                if readable:
+                    nfqueue.run(block=False)
+                if adapter.batch:
+                    results.put(adapter.batch)
+                    adapter.batch = []
+        finally:
+            nfqueue.unbind()
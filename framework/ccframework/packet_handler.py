@@ -1,5 +1,10 @@
 from abc import ABC
 from abc import abstractmethod
+from collections import deque
+import itertools
+import multiprocessing
+import operator
+from typing import Iterable
 
 from bitstring import Bits, BitArray
 from scapy.all import *
@@ -7,17 +12,201 @@ from scapy.all import *
 from .protocol_adapter import ProtocolReceiveAdapter
 from .micro_protocol import TransmissionState
 
+class SendBuffer:
+    '''Warteschlange der zu sendenden Stücke, aus der Pakete in konstanter Zeit bedient werden.
+
+    Die Stücke werden erst bei Bedarf aus der übergebenen Quelle (Liste oder Iterator) abgerufen.
+    Stücke, die nicht eingebettet werden konnten, können mit `requeue()` wieder vorne eingereiht
+    werden.
+    '''
+
+    def __init__(self, data: Iterable[Bits]=()):
+        '''Erstellt einen SendBuffer
+
+        Parameters:
+            data (Iterable[Bits]): Stücke, die versendet werden sollen
+        '''
+        self._queue = deque()
+        self._source = iter(data)
+        self.sent = 0
+
+    def _fill(self) -> bool:
+        if len(self._queue) == 0:
+            bits = next(self._source, None)
+            if bits is None:
+                return False
+            self._queue.append(bits)
+        return True
+
+    def is_empty(self) -> bool:
+        '''Prüft, ob keine zu sendenden Stücke mehr vorhanden sind.'''
+        return not self._fill()
+
+    def peek(self) -> Bits:
+        '''Liefert das nächste zu sendende Stück, ohne es zu entnehmen.'''
+        if not self._fill():
+            raise IndexError("send buffer is empty")
+        return self._queue[0]
+
+    def pop(self) -> Bits:
+        '''Entnimmt das nächste zu sendende Stück.'''
+        if not self._fill():
+            raise IndexError("send buffer is empty")
+        self.sent += 1
+        return self._queue.popleft()
+
+    def requeue(self, bits: Bits):
+        '''Reiht ein entnommenes Stück, das nicht versendet werden konnte, wieder vorne ein.'''
+        self.sent -= 1
+        self._queue.appendleft(bits)
+
+    def remaining(self) -> int:
+        '''Anzahl der noch zu sendenden Stücke.
+
+        Bei Quellen, die ihre Länge nicht kennen (z.B. Generatoren), ist das nur eine untere Schranke.
+        Sie ist jedoch genau dann `0`, wenn keine Stücke mehr vorhanden sind.
+        '''
+        remaining = len(self._queue) + operator.length_hint(self._source)
+        if remaining == 0 and not self.is_empty():
+            remaining = 1
+        return remaining
+
+    def __len__(self) -> int:
+        return self.remaining()
+
+class SharedSendBuffer(SendBuffer):
+    '''SendBuffer, den sich mehrere Prozesse teilen, z.B. je ein Prozess pro Netfilter-Queue.
+
+    Jeder Prozess ruft die Stücke aus seiner eigenen Kopie der Quelle ab, welches als nächstes
+    versendet wird, bestimmt ein gemeinsamer Zähler. Stücke, die andere Prozesse beansprucht haben,
+    werden dabei übersprungen. Jedes Stück wird dadurch von genau einem Prozess entnommen, ohne dass
+    die Quelle vorab vollständig abgerufen wird; auch unbegrenzte Quellen wie
+    `FountainMicroProtocolSend` sind so möglich. Die Reihenfolge beim Empfänger ist dabei nicht
+    garantiert, weshalb ein Mikroprotokoll mit Sequenznummern wie `SequenceMicroProtocolSend`
+    genutzt werden sollte.
+
+    Der SendBuffer muss vor dem Start der Prozesse (mit `fork`) erstellt werden, damit alle Prozesse
+    dieselbe Quelle und denselben Zähler erhalten.
+
+    Ein Stück wird erst mit `peek()` bzw. `pop()` beansprucht, also wenn ein Paket zum Einbetten
+    vorliegt. `is_empty()` prüft nur, ohne zu beanspruchen, damit ein Prozess ohne Pakete keine
+    Stücke zurückhält. Dadurch kann `pop()` trotz vorheriger Prüfung einen `IndexError` auslösen,
+    wenn ein anderer Prozess das letzte Stück zwischenzeitlich beansprucht hat.
+    '''
+
+    def __init__(self, data: Iterable[Bits]=()):
+        '''Erstellt einen SharedSendBuffer
+
+        Parameters:
+            data (Iterable[Bits]): Stücke, die versendet werden sollen
+        '''
+        super().__init__(data)
+        self.counter = multiprocessing.Value('Q', 0)
+        # Anzahl aller Stücke, `-1` solange kein Prozess das Ende der Quelle erreicht hat
+        self._length = multiprocessing.Value('q', len(data) if hasattr(data, '__len__') else -1)
+        # Index des nächsten Stücks in der lokalen Quelle und zuletzt abgerufenes Stück
+        self._position = 0
+        self._lookahead = None
+        self._lookahead_index = None
+
+    def _slice_at(self, index: int) -> Bits:
+        '''Liefert das Stück mit dem angegebenen Index aus der lokalen Quelle oder `None`, wenn die
+        Quelle vorher endet. Der Index darf nicht kleiner als bei vorherigen Aufrufen sein.'''
+        if index == self._lookahead_index:
+            return self._lookahead
+        assert(index >= self._position)
+        bits = next(itertools.islice(self._source, index - self._position, None), None)
+        self._position = index + 1
+        self._lookahead = bits
+        self._lookahead_index = index
+        if bits is None:
+            with self._length.get_lock():
+                if self._length.value < 0 or index < self._length.value:
+                    self._length.value = index
+        return bits
+
+    def _fill(self) -> bool:
+        if len(self._queue) == 0:
+            with self.counter.get_lock():
+                index = self.counter.value
+                if 0 <= self._length.value <= index:
+                    return False
+                self.counter.value = index + 1
+            bits = self._slice_at(index)
+            if bits is None:
+                return False
+            self._queue.append(bits)
+        return True
+
+    def is_empty(self) -> bool:
+        '''Prüft, ob weder unbeanspruchte noch von diesem Prozess beanspruchte Stücke vorhanden
+        sind, ohne dabei ein Stück zu beanspruchen.'''
+        if len(self._queue) > 0:
+            return False
+        index = self.counter.value
+        if self._length.value < 0:
+            # nächstes unbeanspruchtes Stück abrufen, um ein Ende der Quelle zu erkennen
+            self._slice_at(index)
+        return 0 <= self._length.value <= index
+
+    def remaining(self) -> int:
+        '''Anzahl der Stücke, die noch von keinem Prozess entnommen wurden, zuzüglich der Stücke,
+        die dieser Prozess bereits entnommen, aber noch nicht versendet hat.
+
+        Ist das Ende der Quelle noch nicht bekannt, ist das wie bei `SendBuffer` nur eine untere
+        Schranke.
+        '''
+        if self.is_empty():
+            return 0
+        index = self.counter.value
+        length = self._length.value
+        if length >= 0:
+            return len(self._queue) + max(0, length - index)
+        return len(self._queue) + max(1, operator.length_hint(self._source) + self._position - index)
+
 class PacketHandlerSend(ABC):
     '''Interface, das Pakete (z.B. aus Paketmitschnitten oder aus Netfilter-Queue) erhält und
     manipulieren kann.
+
+    PacketHandler, die Daten ohne Längenänderung in die UDP- bzw. TCP-Payload einbetten, setzen
+    `RAW` und implementieren `patch_payload()`. Adapter können die Pakete dann mit `patch_packet()`
+    direkt verändern, ohne sie mit Scapy zu parsen und neu aufzubauen.
     '''
+    RAW = False
+
     def __init__(self):
-        self.send_buffer = list()
+        self.send_buffer = SendBuffer()
     
-    def set_send_buffer(self, data: [Bits]):
+    def set_send_buffer(self, data: Iterable[Bits]):
         '''Speichert Daten, die versendet werden sollen, in einem Puffer in diesem Objekt.
+
+        Neben Listen können auch Iteratoren übergeben werden. Deren Stücke werden erst abgerufen,
+        wenn sie in einem Paket eingebettet werden sollen.
+        '''
+        self.send_buffer = SendBuffer(data)
+
+    def has_slices(self) -> bool:
+        '''Prüft, ob noch zu sendende Daten im Puffer vorhanden sind.
         '''
-        self.send_buffer = data
+        return not self.send_buffer.is_empty()
+
+    def next_slice(self) -> Bits:
+        '''Entnimmt das nächste zu sendende Stück aus dem Puffer.
+        '''
+        return self.send_buffer.pop()
+
+    def patch_payload(self, payload: memoryview) -> (int, bytes):
+        '''Bettet einen Teil der zu sendenden Daten direkt in die UDP- bzw. TCP-Payload ein, nur bei
+        `RAW` genutzt. Die Länge der Payload darf sich dabei nicht ändern.
+
+        Parameters:
+            payload (memoryview): beschreibbare Payload des Pakets
+
+        Returns:
+            Position der ersten geänderten Bytes in der Payload und deren bisheriger Inhalt oder
+            `None`, wenn nichts eingebettet wurde
+        '''
+        raise NotImplementedError()
 
     @abstractmethod
     def handle_packet(self, packet):
@@ -29,13 +218,145 @@ class PacketHandlerSend(ABC):
         '''
         pass
 
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+def _l4_layout(raw) -> (int, int, int, int):
+    '''Liest Protokoll, Beginn des UDP- bzw. TCP-Headers sowie Beginn und Ende der Payload aus einem
+    rohen IPv4-Paket, siehe `l4_payload()`.'''
+    if len(raw) < 20 or raw[0] >> 4 != 4:
+        return None
+    ihl = (raw[0] & 0x0f) * 4
+    total_length = min((raw[2] << 8) | raw[3], len(raw))
+    if ihl < 20:
+        return None
+    # More-Fragments-Flag oder Fragment-Offset gesetzt: nur ein Teil der Payload vorhanden
+    if (raw[6] & 0x3f) or raw[7]:
+        return None
+    protocol = raw[9]
+    if protocol == IPPROTO_UDP:
+        if total_length < ihl + 8:
+            return None
+        start = ihl + 8
+    elif protocol == IPPROTO_TCP:
+        if total_length < ihl + 20:
+            return None
+        start = ihl + (raw[ihl + 12] >> 4) * 4
+    else:
+        return None
+    if start > total_length:
+        return None
+    return protocol, ihl, start, total_length
+
+def l4_payload(raw: memoryview) -> memoryview:
+    '''Liefert die UDP- bzw. TCP-Payload eines rohen IPv4-Pakets, wie es z.B. die Netfilter-Queue
+    liefert, ohne das Paket mit Scapy zu parsen.
+
+    Dafür werden nur Version, Header-Länge (IHL), Gesamtlänge, Fragment-Felder und Protokoll aus dem
+    IP-Header sowie die Header-Länge von TCP gelesen.
+
+    Parameters:
+        raw (memoryview): Paket beginnend mit dem IP-Header
+
+    Returns:
+        Payload als memoryview auf `raw` oder `None` für andere Protokolle, IPv6, Fragmente und
+        unvollständige Pakete
+    '''
+    layout = _l4_layout(raw)
+    if layout is None:
+        return None
+    return raw[layout[2]:layout[3]]
+
+def incremental_checksum(checksum: int, old: bytes, new: bytes) -> int:
+    '''Aktualisiert eine Internet-Prüfsumme nach RFC 1624 (`HC' = ~(~HC + ~m + m')`), wenn die
+    16-Bit-Wörter `old` durch `new` ersetzt wurden, ohne die übrigen Daten erneut zu summieren.
+
+    Parameters:
+        checksum (int): bisherige Prüfsumme
+        old (bytes): bisherige Wörter, gerade Länge und an Wortgrenzen ausgerichtet
+        new (bytes): neue Wörter gleicher Länge
+
+    Returns:
+        neue Prüfsumme
+    '''
+    assert(len(old) == len(new) and len(old) % 2 == 0)
+    total = ~checksum & 0xffff
+    for i in range(0, len(old), 2):
+        total += (~((old[i] << 8) | old[i + 1]) & 0xffff) + ((new[i] << 8) | new[i + 1])
+    while total > 0xffff:
+        total = (total & 0xffff) + (total >> 16)
+    return ~total & 0xffff
+
+def patch_packet(raw: bytearray, packet_handler: PacketHandlerSend) -> bool:
+    '''Bettet mit `PacketHandlerSend.patch_payload()` Daten direkt in ein rohes IPv4-Paket ein und
+    aktualisiert die UDP- bzw. TCP-Prüfsumme inkrementell über die geänderten Wörter.
+
+    Längen ändern sich dabei nicht, sodass das Paket nicht neu aufgebaut werden muss. Eine
+    UDP-Prüfsumme von `0` (keine Prüfsumme) bleibt unverändert, eine berechnete `0` wird bei UDP als
+    `0xffff` übertragen.
+
+    Parameters:
+        raw (bytearray): Paket beginnend mit dem IP-Header, wird verändert
+        packet_handler (PacketHandlerSend): PacketHandler mit `RAW`
+
+    Returns:
+        ob Daten eingebettet wurden
+    '''
+    layout = _l4_layout(raw)
+    if layout is None:
+        return False
+    protocol, l4_start, start, end = layout
+    with memoryview(raw) as view:
+        patched = packet_handler.patch_payload(view[start:end])
+    if patched is None:
+        return False
+    offset, old = patched
+    if len(old) == 0:
+        return True
+
+    # Geänderten Bereich auf 16-Bit-Wörter ab Beginn des UDP- bzw. TCP-Headers erweitern
+    first = start + offset
+    last = first + len(old)
+    if (first - l4_start) % 2:
+        old = raw[first - 1:first] + old
+        first -= 1
+    if (last - l4_start) % 2:
+        old = old + raw[last:last + 1] if last < end else old + b'\x00'
+        last += 1
+    new = bytes(raw[first:last]) if last <= end else bytes(raw[first:end]) + b'\x00'
+
+    checksum_index = l4_start + (6 if protocol == IPPROTO_UDP else 16)
+    checksum = (raw[checksum_index] << 8) | raw[checksum_index + 1]
+    if protocol == IPPROTO_UDP and checksum == 0:
+        return True
+    checksum = incremental_checksum(checksum, old, new)
+    if protocol == IPPROTO_UDP and checksum == 0:
+        checksum = 0xffff
+    raw[checksum_index] = checksum >> 8
+    raw[checksum_index + 1] = checksum & 0xff
+    return True
+
 class PacketHandlerReceive(ABC):
     '''Interface, das Pakete (z.B. aus Paketmitschnitten oder aus Netfilter-Queue) erhält, und daraus
     Daten extrahiert.
+
+    PacketHandler, die nur die UDP- bzw. TCP-Payload benötigen, setzen `RAW` und implementieren
+    `handle_payload()`. Adapter können ihnen dann die Payload direkt übergeben, ohne das Paket mit
+    Scapy zu parsen.
     '''
+    RAW = False
+
     def __init__(self):
         self.adapter = None
 
+    def handle_payload(self, payload: memoryview):
+        '''Extrahiert Daten aus der UDP- bzw. TCP-Payload eines Pakets, nur bei `RAW` genutzt.
+
+        Parameters:
+            payload (memoryview): Payload des Pakets, siehe `l4_payload()`
+        '''
+        raise NotImplementedError()
+
     @abstractmethod
     def handle_packet(self, packet):
         '''Extrahiert daten aus dem übergebenen Paket
@@ -52,6 +373,7 @@ class PacketHandlerSendFixedPositionPayload(PacketHandlerSend):
     Diese Position wird durch ein Offset ab dem Beginn der UDP- bzw. TCP-Payload festgelegt(`start_index`).
     Dadurch werden Daten der Länge `slice_size` beginnend ab dieser Position eingebettet.
     '''
+    RAW = True
     BYTES = 'bytes'
     BITS = 'bits'
     ALLOWED_UNITS = [BYTES, BITS]
@@ -77,8 +399,8 @@ class PacketHandlerSendFixedPositionPayload(PacketHandlerSend):
     def handle_packet(self, packet):
         '''Ersetzt Daten in übergebenen UDP bzw- TCP-Paketen entsprechend der Konfiguration
 
-        Das Paket wird nur manipuliert, wenn es sich um ein UDP-Paket handelt. Andere Pakete bleiben
-        unverändert.
+        Das Paket wird nur manipuliert, wenn es sich um ein UDP-Paket handelt, dessen Payload lang genug
+        ist. Andere Pakete bleiben unverändert und es wird kein Stück aus dem Puffer entnommen.
 
         Parameters:
             packet: Paket, in dem Daten ersetzt werden sollen.
@@ -91,23 +413,54 @@ class PacketHandlerSendFixedPositionPayload(PacketHandlerSend):
         else:
             return
 
-        bits_to_send = self.send_buffer.pop(0)
+        payload_bytes = bytes(packet[proto].payload)
+        if len(payload_bytes) * 8 < self.start_index + self.slice_size:
+            return
+
+        bits_to_send = self.next_slice()
         assert len(bits_to_send) == self.slice_size
 
         print(f"trying to send: {bits_to_send.tobytes()}")
 
-        packet_data_array = BitArray(bytes(packet[proto].payload))
+        packet_data_array = BitArray(payload_bytes)
         for i in range(0,self.slice_size):
             packet_data_array[i+self.start_index] = bits_to_send[i]
         full_payload_to_send = packet_data_array.tobytes()
         packet[proto].payload = Raw(full_payload_to_send)
 
+    def patch_payload(self, payload: memoryview) -> (int, bytes):
+        '''Ersetzt Daten wie `handle_packet()`, aber direkt in der übergebenen Payload.
+
+        Parameters:
+            payload (memoryview): beschreibbare Payload des Pakets
+
+        Returns:
+            Position der ersetzten Bytes und deren bisheriger Inhalt oder `None`, wenn die Payload zu
+            kurz ist
+        '''
+        end = self.start_index + self.slice_size
+        if len(payload) * 8 < end:
+            return None
+
+        bits_to_send = self.next_slice()
+        assert len(bits_to_send) == self.slice_size
+
+        first_byte = self.start_index // 8
+        last_byte = (end + 7) // 8
+        old = bytes(payload[first_byte:last_byte])
+        shift = last_byte * 8 - end
+        mask = ((1 << self.slice_size) - 1) << shift
+        value = (int.from_bytes(old, 'big') & ~mask) | (bits_to_send.uint << shift)
+        payload[first_byte:last_byte] = value.to_bytes(last_byte - first_byte, 'big')
+        return first_byte, old
+
 class PacketHandlerReceiveFixedPositionPayload(PacketHandlerReceive):
     '''Kann Daten von fest definierten Positionen in UDP oder TCP-Paketen extrahieren.
 
     Diese Position wird durch ein Offset ab dem Beginn der UDP- bzw. TCP-Payload festgelegt(`start_index`).
     Dadurch werden Daten der Länge `slice_size` beginnend ab dieser Position extrahiert.
     '''
+    RAW = True
     BYTES = 'bytes'
     BITS = 'bits'
     ALLOWED_UNITS = [BYTES, BITS]
@@ -128,6 +481,7 @@ class PacketHandlerReceiveFixedPositionPayload(PacketHandlerReceive):
         elif unit == self.BYTES:
             self.slice_size = slice_size * 8
             self.start_index = start_index * 8
+        self.slice_mask = (1 << self.slice_size) - 1
 
     def handle_packet(self, packet):
         '''Extrahiert Daten aus übergebenen UDP- bzw. TCP-Paketen entsprechend der Konfiguration
@@ -157,6 +511,56 @@ class PacketHandlerReceiveFixedPositionPayload(PacketHandlerReceive):
         print(f"got data={bits_in.tobytes()}")
         return bits_in
 
+    def handle_packet_int(self, packet) -> int:
+        '''Extrahiert Daten wie `handle_packet()`, liefert diese aber als Ganzzahl mit
+        `slice_size` Bits, ohne `Bits`-Objekte zu erzeugen oder etwas auszugeben.
+
+        Parameters:
+            packet: Paket, aus dem Daten extrahiert werden sollen.
+
+        Returns:
+            Extrahierte Daten als Ganzzahl oder `None`, wenn es kein UDP- bzw. TCP-Paket ist oder die
+            Payload zu kurz ist
+        '''
+        if UDP in packet:
+            payload = packet[UDP].payload
+        elif TCP in packet:
+            payload = packet[TCP].payload
+        else:
+            return None
+        return self.extract_int(memoryview(bytes(payload)))
+
+    def handle_payload(self, payload: memoryview) -> Bits:
+        '''Extrahiert Daten wie `handle_packet()` direkt aus der UDP- bzw. TCP-Payload.
+
+        Parameters:
+            payload (memoryview): Payload des Pakets
+
+        Returns:
+            Extrahierte Daten aus diesem Paket
+        '''
+        first_byte = self.start_index // 8
+        end = self.start_index + self.slice_size
+        payload_bits = Bits(bytes(payload[first_byte:(end + 7) // 8]))
+        offset = self.start_index - first_byte * 8
+        return payload_bits[offset:offset + self.slice_size]
+
+    def extract_int(self, payload: memoryview) -> int:
+        '''Liest `slice_size` Bits ab `start_index` aus einer UDP- bzw. TCP-Payload.
+
+        Parameters:
+            payload (memoryview): Payload des Pakets
+
+        Returns:
+            Extrahierte Daten als Ganzzahl oder `None`, wenn die Payload zu kurz ist
+        '''
+        end = self.start_index + self.slice_size
+        last_byte = (end + 7) // 8
+        if last_byte > len(payload):
+            return None
+        value = int.from_bytes(payload[self.start_index // 8:last_byte], 'big')
+        return (value >> (-end % 8)) & self.slice_mask
+
 
 class PacketHandlerSendRegexPayload(PacketHandlerSend):
     '''Kann Daten in einem UDP oder TCP-Paket mittels eines regulären Ausdrucks suchen und ersetzen.
@@ -177,8 +581,9 @@ class PacketHandlerSendRegexPayload(PacketHandlerSend):
     def handle_packet(self, packet):
         '''Ersetzt Daten in übergebenen UDP- bzw. TCP-Paketen entsprechend der Konfiguration
 
-        Das Paket wird nur manipuliert, wenn es sich um ein UDP- bzw. TCP-Paket handelt. Andere 
-        Pakete bleiben unverändert.
+        Das Paket wird nur manipuliert, wenn es sich um ein UDP- bzw. TCP-Paket handelt, in dem der
+        reguläre Ausdruck gefunden wird. Andere Pakete bleiben unverändert und es wird kein Stück aus
+        dem Puffer entnommen.
 
         Parameters:
             packet: Paket, in dem Daten ersetzt werden sollen.
@@ -191,12 +596,16 @@ class PacketHandlerSendRegexPayload(PacketHandlerSend):
         else:
             return
 
-        data_to_send = self.send_buffer.pop(0).tobytes().decode("utf-8")
-
         payload_bytes = bytes(packet[proto].payload)
         payload_str = payload_bytes.decode("utf-8")
 
-        replaced_payload = self.regex.sub(data_to_send, payload_str, 1)
+        match = self.regex.search(payload_str)
+        if match is None:
+            return
+
+        data_to_send = self.next_slice().tobytes().decode("utf-8")
+
+        replaced_payload = payload_str[:match.start()] + data_to_send + payload_str[match.end():]
 
         full_payload_to_send = replaced_payload.encode("utf-8")
         packet[proto].payload = Raw(full_payload_to_send)
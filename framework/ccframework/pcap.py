@@ -4,8 +4,9 @@ from .packet_handler import PacketHandlerSend, PacketHandlerReceive
 
 from bitstring import Bits
 from scapy.all import *
-from scapy.utils import rdpcap
+from scapy.utils import rdpcap, PcapReader
 import itertools
+from typing import Iterator
 
 class ProtocolSendAdapterPCAP(ProtocolSendAdapter):
     '''Adapter, der Pakete aus einem Paketmitschnitt versenden kann
@@ -61,16 +62,23 @@ class ProtocolSendAdapterPCAP(ProtocolSendAdapter):
         Parameters:
             data (bytes): Daten, die versendet werden
         '''
-        transmission_data = Bits(data)
-        if self.microprotocol != None:
-            transmission_data = self.microprotocol.preprocess(transmission_data)
-        if type(transmission_data) == Bits:
-            transmission_data = [transmission_data]
+        self._send_slices(self.prepare_transmission(data))
+
+    def send_stream(self, source):
+        '''Nimmt abschnittsweise vorliegende Daten, z.B. eine Datei, zum Versand entgegen.
+        Die Stücke werden erst erzeugt, wenn das nächste Paket aus dem Paketmitschnitt versendet wird.
+
+        Parameters:
+            source: geöffnete Datei im Binärmodus oder Abschnitte der Daten
+        '''
+        self._send_slices(self.prepare_transmission_stream(source))
+
+    def _send_slices(self, transmission_data):
         self.packet_handler.set_send_buffer(transmission_data)
 
         for packet in itertools.cycle(self.pcap_packets):
             self.handle_packet(packet)
-            if len(self.packet_handler.send_buffer) == 0:
+            if not self.packet_handler.has_slices():
                 break
     
     def handle_packet(self, packet):
@@ -122,30 +130,55 @@ class ProtocolSendAdapterPCAP(ProtocolSendAdapter):
 class ProtocolReceiveAdapterPCAP(ProtocolReceiveAdapter):
     '''Adapter, der Daten aus bereits vorliegenden Paketmitschnitt-Dateien extrahieren kann.
     '''
-    def __init__(self, pcap_file_path: str, packet_handler: PacketHandlerReceive=None, microprotocol: MicroProtocolReceive=None):
+    def __init__(self, pcap_file_path: str, packet_handler: PacketHandlerReceive=None, microprotocol: MicroProtocolReceive=None,
+            batch_size: int=4096):
         '''Erstellt einen ProtocolReceiveAdapterPCAP
         
         Parameters: 
             pcap_file_path (str): Pfad zum Paketmitschnitt im Dateisystem
             packet_handler (PacketHandlerReceive): Methode zur Extraktion der Daten aus den Paketen
             microprotocol (MicroProtocolReceive): Mikroprotokoll, das zur Nachverarbeitung der Daten genutzt werden soll (optional)
+            batch_size (int): Anzahl der Pakete, deren Daten gemeinsam an das Mikroprotokoll übergeben werden
         '''
         assert(packet_handler is not None)
+        assert(batch_size > 0)
         super().__init__(microprotocol=microprotocol)
         self.packet_handler = packet_handler
         self.pcap_file_path = pcap_file_path
+        self.batch_size = batch_size
 
     def receive(self) -> bytes:
         '''Empfängt Daten aus einem Paketmitschnitt und liefert diese zurück.
 
         Zunächst wird der Paketmitschnitt ausgelesen und die enthaltenen Pakete anschließend 
         nacheinander an den PacketHandlerReceive übergeben, der die relevanten Daten ausliest und
-        zurückgibt.
+        zurückgibt. Diese werden blockweise mit `handle_received_batch` ausgewertet.
         '''
         pcap_packets = rdpcap(self.pcap_file_path)
+        for batch in self._batches(pcap_packets):
+            self.handle_received_batch(batch)
+        return self.buffer.finalize()
+
+    def receive_stream(self) -> Iterator[bytes]:
+        '''Empfängt Daten aus einem Paketmitschnitt und liefert diese abschnittsweise zurück.
+
+        Die Pakete werden dabei nacheinander aus der Datei gelesen, statt den gesamten
+        Paketmitschnitt zu laden.
+        '''
+        with PcapReader(self.pcap_file_path) as pcap_packets:
+            for batch in self._batches(pcap_packets):
+                self.handle_received_batch(batch)
+                chunk = self.drain_buffer()
+                if chunk:
+                    yield chunk
+        yield self.buffer.finalize()
+
+    def _batches(self, pcap_packets) -> Iterator[list]:
+        batch = []
         for packet in pcap_packets:
-            data = self.packet_handler.handle_packet(packet)
-            self.handle_received_data(data)
-        tmp_buf = self.buffer
-        self.buffer = Bits()
-        return tmp_buf.tobytes()
+            batch.append(self.packet_handler.handle_packet(packet))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -1,11 +1,39 @@
 from abc import ABC
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import fileinput
+import time
+from typing import BinaryIO, Iterable, Iterator, Union
 
 from bitstring import Bits
 from scapy.all import *
 
-from .micro_protocol import MicroProtocolSend, MicroProtocolReceive, TransmissionState
+from .bit_accumulator import BitAccumulator
+from .micro_protocol import MicroProtocolSend, MicroProtocolReceive, TransmissionState, SelectiveRepeatMicroProtocolSend, MultiplexMicroProtocolReceive
+
+# Standardgröße der Abschnitte, in denen Daten aus Dateien gelesen werden
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+def iter_chunks(source: Union[BinaryIO, Iterable[bytes]], chunk_size: int=DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    '''Liefert Daten aus einer Datei bzw. einem dateiähnlichen Objekt abschnittsweise.
+
+    Ist `source` kein dateiähnliches Objekt (ohne Methode `read`), wird es als bereits abschnittsweise
+    vorliegende Daten behandelt und unverändert durchgereicht.
+
+    Parameters:
+        source: geöffnete Datei im Binärmodus oder Abschnitte der Daten
+        chunk_size (int): maximale Größe der gelesenen Abschnitte in Bytes
+    Returns:
+        Iterator über die Abschnitte der Daten
+    '''
+    if not hasattr(source, 'read'):
+        yield from source
+        return
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
 
 class ProtocolSendAdapter(ABC):
     '''Adapter zum Senden von Daten mit beliebigen Protokollen'''
@@ -22,7 +50,104 @@ class ProtocolSendAdapter(ABC):
     def send(self, data: bytes):
         '''Sendet übergebene Daten'''
         pass
+
+    def send_stream(self, source: Union[BinaryIO, Iterable[bytes]]):
+        '''Sendet Daten, die abschnittsweise vorliegen, z.B. aus einer Datei.
+
+        Standardmäßig werden dafür alle Abschnitte zusammengefügt und an `send()` übergeben.
+        Adapter, die die Stücke erst bei Bedarf abrufen, können diese Methode überschreiben, um
+        nie die gesamte Übertragung im Speicher zu halten.
+
+        Parameters:
+            source: geöffnete Datei im Binärmodus oder Abschnitte der Daten
+        '''
+        self.send(b''.join(iter_chunks(source)))
+
+    def prepare_transmission(self, data: bytes) -> Iterator[Bits]:
+        '''Bereitet Daten mit dem Mikroprotokoll, sofern vorhanden, auf den Versand vor.
+
+        Parameters:
+            data (bytes): Daten, die versendet werden sollen
+        Returns:
+            Iterator über die versandbereiten Daten
+        '''
+        transmission_data = Bits(data)
+        if self.microprotocol != None:
+            return self.microprotocol.iter_preprocess(transmission_data)
+        return iter([transmission_data])
+
+    def prepare_transmission_stream(self, source: Union[BinaryIO, Iterable[bytes]]) -> Iterator[Bits]:
+        '''Bereitet abschnittsweise vorliegende Daten mit dem Mikroprotokoll, sofern vorhanden, auf
+        den Versand vor. Die Abschnitte werden erst gelesen, wenn die Stücke abgerufen werden.
+
+        Parameters:
+            source: geöffnete Datei im Binärmodus oder Abschnitte der Daten
+        Returns:
+            Iterator über die versandbereiten Daten
+        '''
+        chunks = iter_chunks(source)
+        if self.microprotocol != None:
+            return self.microprotocol.preprocess_stream(chunks)
+        return iter([Bits(b''.join(chunks))])
     
+class ProtocolSendAdapterRequestResponse(ProtocolSendAdapter):
+    '''Basis für aktive Adapter, die jedes Stück in einer eigenen Anfrage senden, z.B. einem
+    HTTP-POST, und deren Antwort Daten des Mikroprotokolls enthalten kann.
+
+    Mit `SelectiveRepeatMicroProtocolSend` werden mehrere Anfragen gleichzeitig in einem Thread-Pool
+    gestellt, die Antworten als Bestätigungen ausgewertet und verlorene Stücke wiederholt. Mit
+    anderen Mikroprotokollen werden die Stücke nacheinander gesendet.
+
+    Implementierungen müssen lediglich `request()` bereitstellen.
+    '''
+
+    def __init__(self, microprotocol: MicroProtocolSend=None, max_workers: int=32):
+        '''Erstellt einen ProtocolSendAdapterRequestResponse
+
+        Parameters:
+            microprotocol: Mikroprotokoll, das genutzt werden soll (optional)
+            max_workers (int): maximale Anzahl gleichzeitiger Anfragen
+        '''
+        super().__init__(microprotocol)
+        self.max_workers = max_workers
+
+    @abstractmethod
+    def request(self, data: Bits) -> bytes:
+        '''Sendet ein Stück in einer Anfrage und liefert den Inhalt der Antwort.
+
+        Wird ggf. aus mehreren Threads gleichzeitig aufgerufen. Eine verlorene Anfrage kann mit einer
+        Exception signalisiert werden.
+
+        Parameters:
+            data (Bits): zu sendendes Stück
+        Returns:
+            Inhalt der Antwort, z.B. eine Bestätigung des Mikroprotokolls
+        '''
+        pass
+
+    def send(self, data: bytes):
+        '''Sendet übergebene Daten in einzelnen Anfragen'''
+        if not isinstance(self.microprotocol, SelectiveRepeatMicroProtocolSend):
+            for data_slice in self.prepare_transmission(data):
+                self.request(data_slice)
+            return
+
+        mp = self.microprotocol
+        mp.start(Bits(data))
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not mp.finished:
+                for data_slice in mp.next_slices(time.monotonic()):
+                    pending.add(executor.submit(self.request, data_slice))
+                timeout = mp.next_timeout(time.monotonic())
+                if not pending:
+                    time.sleep(timeout or 0)
+                    continue
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None and future.result():
+                        mp.handle_ack(Bits(future.result()), time.monotonic())
+
 class ProtocolReceiveAdapter(ABC):
     '''Adapter zum Empfangen von Daten mit beliebigen Protokollen'''
 
@@ -32,7 +157,7 @@ class ProtocolReceiveAdapter(ABC):
         Parameters:
             microprotocol: Mikroprotokoll, das genutzt werden soll (optional)
         '''
-        self.buffer = Bits()
+        self.buffer = BitAccumulator()
         self.microprotocol = microprotocol
 
     @abstractmethod
@@ -40,23 +165,104 @@ class ProtocolReceiveAdapter(ABC):
         '''Empfängt Daten und liefert diese zurück'''
         pass
 
-    def handle_received_data(self, data: Bits):
+    def receive_stream(self) -> Iterator[bytes]:
+        '''Empfängt Daten und liefert diese abschnittsweise zurück.
+
+        Standardmäßig wird dafür `receive()` genutzt und das Ergebnis als einzelner Abschnitt
+        geliefert. Adapter, die Daten nach und nach empfangen, können diese Methode überschreiben.
+        '''
+        yield self.receive()
+
+    def receive_streams(self) -> [(int, bytes)]:
+        '''Empfängt mehrere Übertragungen, die mit `MultiplexMicroProtocolSend` über denselben Kanal
+        gesendet wurden, und liefert jede einzeln zurück.
+
+        Dafür wird `receive()` genutzt, das Mikroprotokoll muss ein `MultiplexMicroProtocolReceive`
+        sein und endet nach dessen `expected_streams` Übertragungen.
+
+        Returns:
+            Paare aus Stream-ID und Daten der abgeschlossenen Übertragungen in der Reihenfolge ihres
+            Abschlusses. Wurde eine Stream-ID mehrfach verwendet, kommt sie mehrfach vor.
+        '''
+        assert(isinstance(self.microprotocol, MultiplexMicroProtocolReceive))
+        self.receive()
+        return self.microprotocol.completed_streams
+
+    def drain_buffer(self, chunk_size: int=DEFAULT_CHUNK_SIZE) -> bytes:
+        '''Entnimmt die bisher empfangenen vollständigen Bytes aus dem Empfangspuffer, sofern es
+        mindestens `chunk_size` sind. Andernfalls wird ein leeres Objekt geliefert.
+        '''
+        if len(self.buffer) < chunk_size * 8:
+            return b''
+        return self.buffer.drain()
+
+    def handle_received_data(self, data: Bits) -> Bits:
         '''Verarbeitet vom Mikroprotokoll übergebene Daten abhängig vom Übertragungszustand und
         speichert diese im Empfangspuffer
+
+        Returns:
+            Bestätigung des Mikroprotokolls, die bei Kanälen mit Rückrichtung an den Sender
+            zurückgeschickt werden soll, sonst `None`
+        '''
+        if self.microprotocol != None:
+            return self._handle_response(self.microprotocol.postprocess(data))
+        else:
+            self.buffer.append(data)
+            return None
+
+    def handle_received_int(self, value: int, length: int) -> Bits:
+        '''Verarbeitet empfangene Daten, die als Ganzzahl mit `length` Bits vorliegen, wie
+        `handle_received_data()`, aber mit `MicroProtocolReceive.postprocess_int()` und ohne
+        `Bits`-Objekte.
+
+        Returns:
+            Bestätigung des Mikroprotokolls, sonst `None`
         '''
         if self.microprotocol != None:
-            resp = self.microprotocol.postprocess(data)
-            if resp.transmission_state is TransmissionState.WAITING_FOR_TRANSMISSION:
-                pass
-            elif resp.transmission_state is TransmissionState.ACTIVE_TRANSMISSION:
-                if resp.data != None:
-                    self.buffer += resp.data
-            elif resp.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
-                pass
-            else:
-                raise Exception(f"Unexpected transmission_state: {self.transmission_state}")
+            resp = self.microprotocol.postprocess_int(value, length)
+            if resp.expected_length != None:
+                self.buffer.reserve(resp.expected_length)
+            if resp.data != None and resp.transmission_state is not TransmissionState.WAITING_FOR_TRANSMISSION:
+                self.buffer.append_int(resp.data, resp.data_length)
+            return resp.ack
         else:
-            self.buffer += data
+            self.buffer.append_int(value, length)
+            return None
+
+    def handle_received_batch(self, slices: [Bits]) -> Bits:
+        '''Verarbeitet mehrere empfangene Stücke auf einmal mit `postprocess_many` des
+        Mikroprotokolls und speichert die Nutzdaten im Empfangspuffer.
+
+        Gedacht für Quellen, die bereits vollständig vorliegen, z.B. Paketmitschnitte. Stücke, aus
+        denen der PacketHandler keine Daten extrahieren konnte (`None`), werden übersprungen.
+
+        Returns:
+            Letzte Bestätigung des Mikroprotokolls, sonst `None`
+        '''
+        slices = [data_slice for data_slice in slices if data_slice is not None]
+        if self.microprotocol != None:
+            return self._handle_response(self.microprotocol.postprocess_many(slices))
+        else:
+            for data_slice in slices:
+                self.buffer.append(data_slice)
+            return None
+
+    def _handle_response(self, resp) -> Bits:
+        if resp.expected_length != None:
+            self.buffer.reserve(resp.expected_length)
+        if resp.transmission_state is TransmissionState.WAITING_FOR_TRANSMISSION:
+            pass
+        elif resp.transmission_state is TransmissionState.ACTIVE_TRANSMISSION:
+            if resp.data != None:
+                self.buffer.append(resp.data)
+        elif resp.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+            # Mikroprotokolle, die das Ende anhand der Länge erkennen, liefern mit dem letzten
+            # Stück noch Daten
+            if resp.data != None:
+                self.buffer.append(resp.data)
+        else:
+            raise Exception(f"Unexpected transmission_state: {resp.transmission_state}")
+        return resp.ack
         
 # Intended for Debugging and Demonstration Purposes
 class ProtocolSendAdapterStdio(ProtocolSendAdapter):
@@ -69,11 +275,15 @@ class ProtocolSendAdapterStdio(ProtocolSendAdapter):
         '''Gibt zu senden Daten auf der Standardausgabe aus. 
         Diese Daten werden bei Bedarf an ein Mikroprotokoll zur Vorbereitung übergeben.
         '''
-        transmission_data = Bits(data)
-        if self.microprotocol != None:
-            transmission_data = self.microprotocol.preprocess(transmission_data)
-        if type(transmission_data) == Bits:
-            transmission_data = [transmission_data]
+        self._print_slices(self.prepare_transmission(data))
+
+    def send_stream(self, source: Union[BinaryIO, Iterable[bytes]]):
+        '''Gibt abschnittsweise vorliegende Daten auf der Standardausgabe aus, wobei jedes Stück
+        erst bei der Ausgabe erzeugt wird.
+        '''
+        self._print_slices(self.prepare_transmission_stream(source))
+
+    def _print_slices(self, transmission_data: Iterable[Bits]):
         for some_bits in transmission_data:
             print(some_bits.tobytes().decode("utf-8"))
 
@@ -88,4 +298,15 @@ class ProtocolReceiveAdapterStdio(ProtocolReceiveAdapter):
         for line in fileinput.input():
             line_bytes = line.encode("utf-8").rstrip()
             self.handle_received_data(Bits(line_bytes))
-        return self.buffer.tobytes()
+        return self.buffer.finalize()
+
+    def receive_stream(self) -> Iterator[bytes]:
+        '''Liest Daten von der Standardeingabe bis zum Ende der Eingabe und liefert diese
+        abschnittsweise zurück.'''
+        for line in fileinput.input():
+            line_bytes = line.encode("utf-8").rstrip()
+            self.handle_received_data(Bits(line_bytes))
+            chunk = self.drain_buffer()
+            if chunk:
+                yield chunk
+        yield self.buffer.finalize()
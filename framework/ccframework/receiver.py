@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from .data_processor import DataPostProcessor
 from .protocol_adapter import ProtocolReceiveAdapter
 
@@ -27,4 +29,25 @@ class CCReceiver:
         data = self.protocol_adapter.receive()
         for pp in self.post_processors:
             data = pp.postprocess(data)
-        return data
\ No newline at end of file
+        return data
+
+    def receive_stream(self) -> Iterator[bytes]:
+        '''Startet den Empfang von Daten und liefert diese abschnittsweise zurück.
+
+        Die Abschnitte, die der Protokolladapter liefert, werden über `update()` durch alle
+        Nachverarbeitungsmethoden gereicht, sodass nie die gesamten Daten im Speicher gehalten
+        werden müssen.
+
+        Returns:
+            Iterator über die nachverarbeiteten Abschnitte der Daten
+        '''
+        for chunk in self.protocol_adapter.receive_stream():
+            for pp in self.post_processors:
+                chunk = pp.update(chunk)
+            if chunk:
+                yield chunk
+        data = b''
+        for pp in self.post_processors:
+            data = pp.update(data) + pp.finalize()
+        if data:
+            yield data
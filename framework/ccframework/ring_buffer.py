@@ -0,0 +1,99 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+class PacketRingBuffer:
+    '''Begrenzter Ringpuffer für rohe Pakete in Shared Memory, z.B. zwischen dem Callback der
+    Netfilter-Queue und einem Thread oder Prozess, der die Pakete dekodiert.
+
+    Der Puffer besteht aus `slots` Plätzen mit je `slot_size` Bytes und einer vorangestellten Länge.
+    Freie und belegte Plätze werden mit je einem Semaphor gezählt, sodass genau ein Schreiber und
+    genau ein Leser ohne weitere Sperren zugreifen können, auch aus verschiedenen Prozessen (nach
+    `fork`). Längere Pakete werden auf `slot_size` Bytes gekürzt.
+
+    Ist der Puffer voll, weil der Leser nicht hinterherkommt, wartet `put()` bei `BLOCK` auf einen
+    freien Platz, höchstens jedoch `timeout` Sekunden. Bei `DROP` wird das Paket verworfen und in
+    `dropped` gezählt.
+    '''
+    BLOCK = 'block'
+    DROP = 'drop'
+    ALLOWED_BACKPRESSURE = [BLOCK, DROP]
+    LENGTH_BYTES = 4
+
+    def __init__(self, slots: int=1024, slot_size: int=2048, backpressure: str='block'):
+        '''Erstellt einen PacketRingBuffer
+
+        Parameters:
+            slots (int): Anzahl der Pakete, die der Puffer aufnehmen kann
+            slot_size (int): maximale Länge eines Pakets in Bytes
+            backpressure (str): Verhalten bei vollem Puffer, entweder 'block' oder 'drop'
+        '''
+        assert(backpressure in self.ALLOWED_BACKPRESSURE)
+        assert(slots > 0 and slot_size > 0)
+        self.slots = slots
+        self.slot_size = slot_size
+        self.backpressure = backpressure
+        self.stride = slot_size + self.LENGTH_BYTES
+        self.memory = shared_memory.SharedMemory(create=True, size=slots * self.stride)
+        self.free = multiprocessing.Semaphore(slots)
+        self.used = multiprocessing.Semaphore(0)
+        self._dropped = multiprocessing.Value('Q', 0)
+        # jeweils nur vom Schreiber bzw. Leser genutzt
+        self._write_index = 0
+        self._read_index = 0
+
+    @property
+    def dropped(self) -> int:
+        '''Anzahl der Pakete, die bei `DROP` wegen eines vollen Puffers verworfen wurden'''
+        return self._dropped.value
+
+    def put(self, data: bytes, timeout: float=None) -> bool:
+        '''Kopiert ein Paket in den nächsten freien Platz.
+
+        Parameters:
+            data (bytes): Paket
+            timeout (float): maximale Wartezeit in Sekunden bei `BLOCK`, `None` wartet unbegrenzt
+
+        Returns:
+            ob das Paket übernommen wurde, `False` bei vollem Puffer mit `DROP` oder nach Ablauf von
+            `timeout`
+        '''
+        if self.backpressure == self.DROP:
+            if not self.free.acquire(block=False):
+                with self._dropped.get_lock():
+                    self._dropped.value += 1
+                return False
+        elif not self.free.acquire(timeout=timeout):
+            return False
+        length = min(len(data), self.slot_size)
+        position = self._write_index * self.stride
+        buffer = self.memory.buf
+        buffer[position:position + self.LENGTH_BYTES] = length.to_bytes(self.LENGTH_BYTES, 'big')
+        buffer[position + self.LENGTH_BYTES:position + self.LENGTH_BYTES + length] = data[:length]
+        self._write_index = (self._write_index + 1) % self.slots
+        self.used.release()
+        return True
+
+    def get(self, timeout: float=None) -> bytes:
+        '''Entnimmt das älteste Paket und gibt dessen Platz wieder frei.
+
+        Parameters:
+            timeout (float): maximale Wartezeit in Sekunden, `None` wartet unbegrenzt
+
+        Returns:
+            Kopie des Pakets oder `None`, wenn innerhalb von `timeout` kein Paket vorlag
+        '''
+        if not self.used.acquire(timeout=timeout):
+            return None
+        position = self._read_index * self.stride
+        buffer = self.memory.buf
+        length = int.from_bytes(buffer[position:position + self.LENGTH_BYTES], 'big')
+        start = position + self.LENGTH_BYTES
+        data = bytes(buffer[start:start + length])
+        self._read_index = (self._read_index + 1) % self.slots
+        self.free.release()
+        return data
+
+    def close(self):
+        '''Gibt den Shared Memory frei. Muss vom Prozess aufgerufen werden, der den Puffer erstellt hat.'''
+        self.memory.close()
+        self.memory.unlink()
@@ -1,5 +1,7 @@
+from typing import BinaryIO, Iterable, Iterator, Union
+
 from .data_processor import DataPreProcessor
-from .protocol_adapter import ProtocolSendAdapter
+from .protocol_adapter import ProtocolSendAdapter, iter_chunks, DEFAULT_CHUNK_SIZE
 
 class CCSender:
     '''CCSender (Covert Channel Sender) Übergeordnete Steuerungsklasse für alle Sendeoperationen.
@@ -29,4 +31,30 @@ class CCSender:
         data = data_to_send
         for pp in self.pre_processors:
             data = pp.preprocess(data)
-        self.protocol_adapter.send(data)
\ No newline at end of file
+        self.protocol_adapter.send(data)
+
+    def send_stream(self, source: Union[BinaryIO, Iterable[bytes]], chunk_size: int=DEFAULT_CHUNK_SIZE):
+        '''Startet den Versand von Daten, die abschnittsweise vorliegen, z.B. aus einer Datei.
+
+        Jeder Abschnitt wird über `update()` durch alle Vorverarbeitungsmethoden gereicht und erst
+        gelesen, wenn der Protokolladapter weitere Daten benötigt. Dadurch bleibt der
+        Speicherbedarf unabhängig von der Größe der Daten.
+
+        Parameters:
+            source: geöffnete Datei im Binärmodus oder Abschnitte der Daten
+            chunk_size (int): Größe der Abschnitte, in denen aus einer Datei gelesen wird
+        '''
+        chunks = iter_chunks(source, chunk_size)
+        self.protocol_adapter.send_stream(self._preprocess_stream(chunks))
+
+    def _preprocess_stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            for pp in self.pre_processors:
+                chunk = pp.update(chunk)
+            if chunk:
+                yield chunk
+        data = b''
+        for pp in self.pre_processors:
+            data = pp.update(data) + pp.finalize()
+        if data:
+            yield data
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from bitstring import Bits, ConstBitStream, ReadError
+from typing import Iterable, Iterator
+from bitstring import Bits
+import numpy as np
 
 class BitSlicer(ABC):
     '''Interface, das zur Zerteilung von Bits-Objekte (`bitstring`) genutzt werden kann.
@@ -10,6 +12,11 @@ class BitSlicer(ABC):
     Methods:
         slice(self, data: Bits):
             Teilt Daten in kleine Stücke auf. 
+        iter_slices(self, data: Bits):
+            Teilt Daten in kleine Stücke auf, die erst bei Bedarf erzeugt werden.
+        iter_slices_stream(self, chunks: Iterable[bytes]):
+            Teilt Daten, die abschnittsweise vorliegen, in kleine Stücke auf, die erst bei Bedarf
+            erzeugt werden.
     '''
     @abstractmethod
     def slice(self, data: Bits) -> [Bits]:
@@ -23,6 +30,35 @@ class BitSlicer(ABC):
         '''
         pass
 
+    def iter_slices(self, data: Bits) -> Iterator[Bits]:
+        '''Teilt ein Bits-Objekt in Stücke auf und liefert diese einzeln über einen Iterator.
+
+        Standardmäßig wird dafür `slice()` genutzt, Implementierungen können die Stücke aber auch
+        erst bei Bedarf erzeugen.
+
+        Parameters:
+            data: Daten, die in Stücke aufgeteilt werden sollen
+
+        Returns:
+            Iterator über die aufgeteilten Daten
+        '''
+        return iter(self.slice(data))
+
+    def iter_slices_stream(self, chunks: Iterable[bytes]) -> Iterator[Bits]:
+        '''Teilt abschnittsweise vorliegende Daten in Stücke auf und liefert diese einzeln über
+        einen Iterator.
+
+        Standardmäßig werden dafür alle Abschnitte zusammengefügt, Implementierungen können die
+        Abschnitte aber auch nacheinander verarbeiten.
+
+        Parameters:
+            chunks: Abschnitte der Daten, die in Stücke aufgeteilt werden sollen
+
+        Returns:
+            Iterator über die aufgeteilten Daten
+        '''
+        return self.iter_slices(Bits(b''.join(chunks)))
+
 class SimpleBitSlicer(BitSlicer):
     ''' Klasse, die dazu dient Objekte des Typs Bits (aus `bitstring`) in Stücke fester Länge zu zerteilen.
 
@@ -32,6 +68,10 @@ class SimpleBitSlicer(BitSlicer):
         padding: Bits
             Padding, das am Ende der Aufteilung an das letzte Stück angehängt werden soll, sofern dieses kleiner als slice_size ist.
     '''
+    # Bis zu dieser Länge werden Stücke über eine Tabelle aller möglichen Werte erzeugt
+    MAX_TABLE_SLICE_SIZE = 16
+    # Anzahl an Stücken, die bei der Zerteilung mit NumPy gemeinsam entpackt werden
+    TABLE_BLOCK_SLICES = 1 << 16
 
     def __init__(self, slice_size: int, padding: Bits=None):
         '''Erstellt einen SimpleBitSlicer.
@@ -47,6 +87,7 @@ class SimpleBitSlicer(BitSlicer):
         assert(type(padding) == Bits)
         self.slice_size = slice_size
         self.padding = padding
+        self._table = None
     
     def slice(self, data: Bits) -> [Bits]:
         ''' Zerteilt `data` in Stücke der Länge `self.slice_size`.
@@ -62,17 +103,88 @@ class SimpleBitSlicer(BitSlicer):
         Returns:
             zerteilte Daten, die ggf. mit Padding auf gleich lange Stücke aufgefüllt wurden.
         '''
-        buf = ConstBitStream(data)
-        slices = list()
-        while True:
-            try:
-                bitstream_part = buf.read(f"bits{self.slice_size}")
-                slices.append(bitstream_part)
-            except ReadError as e:
-                rest = buf.read('bits')
-                if len(rest) > 0:
-                    pad_length = self.slice_size-len(rest)
-                    pad = self.padding[:pad_length]
-                    slices.append(rest+pad)
-                break
-        return slices
+        return list(self.iter_slices(data))
+
+    def iter_slices(self, data: Bits) -> Iterator[Bits]:
+        '''Zerteilt `data` wie `slice()`, erzeugt die Stücke aber erst, wenn sie abgerufen werden.
+
+        Parameters:
+            data (Bits): Daten, die in kleinere Stücke zerteilt werden sollen
+        Returns:
+            Iterator über die zerteilten Daten
+        '''
+        full_slices = len(data) // self.slice_size
+        if self.slice_size <= self.MAX_TABLE_SLICE_SIZE:
+            yield from self._slice_table(data.tobytes(), full_slices)
+        else:
+            yield from self._slice_direct(data, full_slices)
+
+        rest_start = full_slices * self.slice_size
+        if rest_start < len(data):
+            rest = data[rest_start:]
+            pad_length = self.slice_size-len(rest)
+            pad = self.padding[:pad_length]
+            yield rest+pad
+
+    def iter_slices_stream(self, chunks: Iterable[bytes]) -> Iterator[Bits]:
+        '''Zerteilt abschnittsweise vorliegende Daten, z.B. aus einer Datei, in Stücke der Länge
+        `self.slice_size`.
+
+        Es werden immer nur so viele Bytes zwischengespeichert, wie nötig sind, um ein vollständiges
+        Stück zu bilden. Das Ergebnis entspricht dem von `slice()` für die zusammengefügten Abschnitte.
+
+        Parameters:
+            chunks (Iterable[bytes]): Abschnitte der Daten, die zerteilt werden sollen
+        Returns:
+            Iterator über die zerteilten Daten
+        '''
+        # Anzahl an Bytes, die immer vollständige Stücke ergibt
+        if self.slice_size % 8 == 0:
+            unit = self.slice_size // 8
+        else:
+            unit = self.slice_size
+
+        carry = bytearray()
+        for chunk in chunks:
+            carry += chunk
+            usable = len(carry) - len(carry) % unit
+            if usable > 0:
+                yield from self.iter_slices(Bits(bytes(carry[:usable])))
+                del carry[:usable]
+        if len(carry) > 0:
+            yield from self.iter_slices(Bits(bytes(carry)))
+
+    def _slice_direct(self, data: Bits, count: int) -> Iterator[Bits]:
+        '''Zerteilt die ersten `count * self.slice_size` Bits aus `data` durch direkten Zugriff auf
+        die Teilbereiche, ohne Format-Strings oder einen Stream mit Leseposition.
+        '''
+        size = self.slice_size
+        for i in range(0, count*size, size):
+            yield data[i:i+size]
+
+    def _slice_table(self, raw: bytes, count: int) -> Iterator[Bits]:
+        '''Zerteilt die ersten `count * self.slice_size` Bits aus `raw` mit NumPy.
+
+        Die Bits werden blockweise entpackt und zu ganzzahligen Werten der Stücke zusammengefasst.
+        Da `Bits`-Objekte unveränderlich sind, wird für jeden vorkommenden Wert nur einmal ein
+        Objekt erzeugt und anschließend aus `self._table` wiederverwendet.
+        '''
+        size = self.slice_size
+        if self._table is None:
+            self._table = [None] * (1 << size)
+            self._weights = (1 << np.arange(size-1, -1, -1)).astype(np.uint32)
+        table = self._table
+
+        raw_array = np.frombuffer(raw, dtype=np.uint8)
+        # Ein Block von `size` Bytes enthält genau 8 Stücke, Blöcke zerteilen daher keine Stücke
+        block_bytes = size * self.TABLE_BLOCK_SLICES // 8
+        for start_slice in range(0, count, self.TABLE_BLOCK_SLICES):
+            block_count = min(self.TABLE_BLOCK_SLICES, count-start_slice)
+            start_byte = start_slice * size // 8
+            block = raw_array[start_byte:start_byte+block_bytes]
+            bits = np.unpackbits(block, count=block_count*size).reshape(block_count, size)
+            for value in bits.dot(self._weights).tolist():
+                part = table[value]
+                if part is None:
+                    part = table[value] = Bits(uint=value, length=size)
+                yield part
@@ -0,0 +1,88 @@
+'''Erstellt Wörterbücher für `DataPreProcessorZlibDictionary` aus einer Sammlung typischer Nachrichten.
+
+Aufruf: python -m ccframework.zdict -o <wörterbuch> [-s <größe>] <beispieldatei> [...]
+
+Jede Zeile der Beispieldateien wird als eine Nachricht behandelt.
+'''
+import argparse
+from collections import Counter
+import heapq
+
+# Länge der Teilfolgen, deren Häufigkeit zur Bewertung gezählt wird
+DMER_LENGTH = 6
+
+def build_dictionary(samples: [bytes], size: int=4096, segment_size: int=256) -> bytes:
+    '''Erstellt ein Wörterbuch für zlib (`zdict`) aus Beispielnachrichten.
+
+    Das Vorgehen orientiert sich am Cover-Algorithmus von zstd: Für jede Teilfolge der Länge
+    `DMER_LENGTH` wird gezählt, in wie vielen Nachrichten sie vorkommt. Anschließend werden
+    zusammenhängende Abschnitte der Nachrichten ausgewählt, deren noch nicht abgedeckte Teilfolgen
+    am häufigsten vorkommen, bis `size` erreicht ist. Zusammenhängende Abschnitte erlauben zlib
+    längere Übereinstimmungen als einzelne Teilfolgen. Die wertvollsten Abschnitte stehen am Ende
+    des Wörterbuchs, da zlib kurze Distanzen günstiger kodiert.
+
+    Parameters:
+        samples ([bytes]): Beispielnachrichten
+        size (int): maximale Größe des Wörterbuchs in Bytes (zlib nutzt höchstens 32768 Bytes)
+        segment_size (int): maximale Länge eines ausgewählten Abschnitts in Bytes
+    Returns:
+        Wörterbuch, das als `zdict` verwendet werden kann
+    '''
+    assert(0 < size <= 32768)
+    assert(segment_size >= DMER_LENGTH)
+    frequency = Counter()
+    for sample in samples:
+        frequency.update({sample[i:i+DMER_LENGTH] for i in range(len(sample) - DMER_LENGTH + 1)})
+
+    segments = list()
+    step = max(1, segment_size // 4)
+    for sample in samples:
+        for start in range(0, max(1, len(sample) - segment_size + step), step):
+            segment = sample[start:start+segment_size]
+            if len(segment) >= DMER_LENGTH:
+                segments.append(segment)
+
+    def score(segment: bytes) -> int:
+        dmers = {segment[i:i+DMER_LENGTH] for i in range(len(segment) - DMER_LENGTH + 1)}
+        return sum(frequency[dmer] for dmer in dmers if frequency[dmer] > 1)
+
+    # Bewertungen können durch bereits ausgewählte Abschnitte nur sinken, daher genügt es, den
+    # besten Kandidaten neu zu bewerten, bevor er ausgewählt wird
+    heap = [(-score(segment), index) for index, segment in enumerate(segments)]
+    heapq.heapify(heap)
+    selected = list()
+    used = 0
+    while heap and used < size:
+        negative_score, index = heapq.heappop(heap)
+        segment = segments[index]
+        current = score(segment)
+        if current <= 0:
+            break
+        if current < -negative_score:
+            heapq.heappush(heap, (-current, index))
+            continue
+        segment = segment[:size-used]
+        selected.append(segment)
+        used += len(segment)
+        for i in range(len(segment) - DMER_LENGTH + 1):
+            frequency[segment[i:i+DMER_LENGTH]] = 0
+    return b''.join(reversed(selected))
+
+def main():
+    parser = argparse.ArgumentParser(description='Erstellt ein zlib-Wörterbuch aus Beispielnachrichten')
+    parser.add_argument('samples', nargs='+', help='Dateien mit je einer Nachricht pro Zeile')
+    parser.add_argument('-o', '--output', required=True, help='Datei, in die das Wörterbuch geschrieben wird')
+    parser.add_argument('-s', '--size', type=int, default=4096, help='maximale Größe des Wörterbuchs in Bytes')
+    args = parser.parse_args()
+
+    samples = list()
+    for path in args.samples:
+        with open(path, 'rb') as sample_file:
+            samples += [line for line in sample_file.read().splitlines() if line]
+    dictionary = build_dictionary(samples, args.size)
+    with open(args.output, 'wb') as out_file:
+        out_file.write(dictionary)
+    print(f"{len(dictionary)} bytes from {len(samples)} samples written to {args.output}")
+
+if __name__ == '__main__':
+    main()
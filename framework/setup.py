@@ -7,7 +7,7 @@ setup(
     author='Roland Tröger',
     author_email='roland.troeger@mailbox.org',
     packages=['ccframework'],
-    install_requires=['scapy', 'pycryptodomex', 'bitstring'],
+    install_requires=['scapy', 'pycryptodomex', 'bitstring', 'numpy'],
     extras_require = {
         'netfilter-queue': ['netfilterqueue']
     }
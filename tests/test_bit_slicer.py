@@ -24,3 +24,33 @@ class TestBitSlicer(unittest.TestCase):
         self.assertEqual(len(desired_result), len(actual_result))
         for i in range(len(desired_result)):
             self.assertEqual(actual_result[i], Bits(f"0b{desired_result[i]}"))
+
+    def test_random_slice_sizes(self):
+        for i in range(0, 50):
+            slice_size = random.randint(1, 99)
+            padding = Bits(uint=random.getrandbits(slice_size), length=slice_size)
+            slicer = SimpleBitSlicer(slice_size=slice_size, padding=padding)
+            test_length = random.randint(1, 1000)
+            test_data = Bits(uint=random.getrandbits(test_length), length=test_length)
+            desired_result = [test_data[j:j+slice_size] for j in range(0, len(test_data), slice_size)]
+            desired_result[-1] += padding[:slice_size-len(desired_result[-1])]
+            self.assertEqual(slicer.slice(test_data), desired_result)
+
+    def test_multiple_blocks(self):
+        slicer = SimpleBitSlicer(slice_size=7, padding=Bits('0b000000'))
+        test_data = Bits(random.randbytes(70000))
+        actual_result = slicer.slice(test_data)
+        self.assertEqual(len(actual_result), 80000)
+        self.assertEqual(Bits().join(actual_result), test_data)
+
+    def test_stream(self):
+        for slice_size in [3, 7, 8, 13, 16, 64, 100]:
+            slicer = SimpleBitSlicer(slice_size=slice_size, padding=Bits(slice_size))
+            test_data = random.randbytes(random.randint(1, 500))
+            chunks = list()
+            pos = 0
+            while pos < len(test_data):
+                chunk_size = random.randint(1, 50)
+                chunks.append(test_data[pos:pos+chunk_size])
+                pos += chunk_size
+            self.assertEqual(list(slicer.iter_slices_stream(iter(chunks))), slicer.slice(Bits(test_data)))
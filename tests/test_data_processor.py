@@ -1,7 +1,25 @@
+import base64
 import random
 import unittest
 
 from ccframework import DataPreProcessorBase64, DataPostProcessorBase64, DataPreProcessorAESCTR, DataPostProcessorAESCTR
+from ccframework import DataPreProcessorXOR, DataPostProcessorXOR
+from ccframework import DataPreProcessorCompress, DataPostProcessorDecompress
+from ccframework import DataPreProcessorZlibDictionary, DataPostProcessorZlibDictionary
+from ccframework import DataPreProcessorAlphabet, DataPostProcessorAlphabet
+from ccframework.zdict import build_dictionary
+
+def random_chunks(data: bytes) -> [bytes]:
+    chunks = list()
+    pos = 0
+    while pos < len(data):
+        chunk_size = random.randint(0, 40)
+        chunks.append(data[pos:pos+chunk_size])
+        pos += chunk_size
+    return chunks
+
+def process_stream(processor, chunks: [bytes]) -> bytes:
+    return b''.join(processor.update(chunk) for chunk in chunks) + processor.finalize()
 
 class TestDataProcessorBase64(unittest.TestCase):
 
@@ -30,6 +48,56 @@ class TestDataProcessorBase64(unittest.TestCase):
         for i in range(len(encoded)):
             self.assertEqual(plain[i], post.postprocess(encoded[i]))
 
+    def test_stream(self):
+        pre = DataPreProcessorBase64()
+        post = DataPostProcessorBase64()
+        for i in range(0, 50):
+            data = random.randbytes(random.randint(0, 300))
+            encoded = process_stream(pre, random_chunks(data))
+            self.assertEqual(encoded, base64.b64encode(data))
+            self.assertEqual(process_stream(post, random_chunks(encoded)), data)
+            self.assertEqual(process_stream(post, random_chunks(b'\n'.join(random_chunks(encoded)))), data)
+
+class TestDataProcessorXOR(unittest.TestCase):
+
+    def test_known_data(self):
+        self.assertEqual(DataPreProcessorXOR(0x20).preprocess(b'Hello'), b'hELLO')
+        self.assertEqual(DataPostProcessorXOR(0x20).postprocess(b'hELLO'), b'Hello')
+        self.assertEqual(DataPreProcessorXOR(b'\x00\x20').preprocess(b'Hello'), b'HElLo')
+        self.assertEqual(DataPostProcessorXOR(b'\x00\x20').postprocess(b'HElLo'), b'Hello')
+
+    def test_random_data(self):
+        for key_length in [1, 2, 3, 16, 5000]:
+            key = random.randbytes(key_length)
+            pre = DataPreProcessorXOR(key)
+            post = DataPostProcessorXOR(key)
+            for length in [0, 1, 100, 4096, 10007]:
+                data = random.randbytes(length)
+                preprocessed = pre.preprocess(data)
+                expected = bytes(b ^ key[i % key_length] for i, b in enumerate(data))
+                self.assertEqual(preprocessed, expected)
+                self.assertEqual(post.postprocess(preprocessed), data)
+
+    def test_stream(self):
+        key = b'\x01\x02\x03\x04\x05'
+        pre = DataPreProcessorXOR(key)
+        post = DataPostProcessorXOR(key)
+        for i in range(0, 20):
+            data = random.randbytes(random.randint(0, 300))
+            encoded = process_stream(pre, random_chunks(data))
+            self.assertEqual(encoded, pre.preprocess(data))
+            self.assertEqual(process_stream(post, random_chunks(encoded)), data)
+
+    def test_inplace(self):
+        for key in [0x42, b'\x01\x02\x03']:
+            data = random.randbytes(1000)
+            buffer = bytearray(data)
+            result = DataPreProcessorXOR(key, inplace=True).preprocess(buffer)
+            self.assertIs(result, buffer)
+            self.assertEqual(result, DataPreProcessorXOR(key).preprocess(data))
+            DataPostProcessorXOR(key, inplace=True).postprocess(buffer)
+            self.assertEqual(buffer, data)
+
 class TestDataProcessorAESCTR(unittest.TestCase):
 
     def test_random_data(self):
@@ -46,6 +114,15 @@ class TestDataProcessorAESCTR(unittest.TestCase):
                 self.assertNotEqual(data, preprocessed)
                 self.assertEqual(data, postprocessed)
                 
+    def test_stream(self):
+        key = random.randbytes(16)
+        iv = random.randbytes(8)
+        nonce = random.randbytes(8)
+        data = random.randbytes(1000)
+        expected = DataPreProcessorAESCTR(key, iv, nonce).preprocess(data)
+        self.assertEqual(process_stream(DataPreProcessorAESCTR(key, iv, nonce), random_chunks(data)), expected)
+        self.assertEqual(process_stream(DataPostProcessorAESCTR(key, iv, nonce), random_chunks(expected)), data)
+
     def test_known_data(self):
         key = b'1234567890abcdef'
         iv = b'12345678'
@@ -67,4 +144,139 @@ class TestDataProcessorAESCTR(unittest.TestCase):
         for i in range(len(plain)):
             self.assertEqual(cipher[i], encryptor.preprocess(plain[i]))
         for i in range(len(cipher)):
-            self.assertEqual(plain[i], decryptor.postprocess(cipher[i]))
\ No newline at end of file
+            self.assertEqual(plain[i], decryptor.postprocess(cipher[i]))
+
+    def test_parallel(self):
+        key = random.randbytes(16)
+        iv = random.randbytes(8)
+        nonce = random.randbytes(8)
+        data = random.randbytes(100000)
+        expected = DataPreProcessorAESCTR(key, iv, nonce).preprocess(data)
+        encryptor = DataPreProcessorAESCTR(key, iv, nonce, workers=4, chunk_size=1024)
+        first = encryptor.preprocess(data[:33333])
+        executor = encryptor.keystream._executor
+        self.assertEqual(first + encryptor.preprocess(data[33333:]), expected)
+        # der Thread-Pool wird für weitere Abschnitte wiederverwendet
+        self.assertIs(encryptor.keystream._executor, executor)
+        decryptor = DataPostProcessorAESCTR(key, iv, nonce, workers=3, chunk_size=4096)
+        self.assertEqual(process_stream(decryptor, [expected[:50000], expected[50000:]]), data)
+        self.assertIsNone(decryptor.keystream._executor)
+
+    def test_seek(self):
+        key = random.randbytes(16)
+        iv = b'\xff' * 7 + b'\xf0'
+        nonce = random.randbytes(8)
+        data = random.randbytes(1000)
+        expected = DataPreProcessorAESCTR(key, iv, nonce).preprocess(data)
+        decryptor = DataPostProcessorAESCTR(key, iv, nonce)
+        offsets = sorted(random.sample(range(1, len(data)), 20))
+        chunks = list(zip([0] + offsets, offsets + [len(data)]))
+        random.shuffle(chunks)
+        for start, end in chunks:
+            decryptor.seek(start)
+            self.assertEqual(decryptor.postprocess(expected[start:end]), data[start:end])
+
+class TestDataProcessorCompress(unittest.TestCase):
+
+    log_data = b''.join(f"host{i % 5} sshd[{1000 + i}]: session opened for user root\n".encode() for i in range(500))
+
+    def test_codecs(self):
+        post = DataPostProcessorDecompress()
+        for codec in DataPreProcessorCompress.ALLOWED_CODECS:
+            pre = DataPreProcessorCompress(codec=codec)
+            for data in [b'', b'Hello World', random.randbytes(1000), self.log_data]:
+                preprocessed = pre.preprocess(data)
+                self.assertEqual(post.postprocess(preprocessed), data)
+                streamed = process_stream(pre, random_chunks(data))
+                self.assertEqual(post.postprocess(streamed), data)
+                self.assertEqual(process_stream(post, random_chunks(streamed)), data)
+
+    def test_auto_selection(self):
+        pre = DataPreProcessorCompress(sample_size=1024)
+        data = random.randbytes(100)
+        self.assertEqual(pre.preprocess(data), b'\x00' + data)
+        compressed = pre.preprocess(self.log_data)
+        for codec in [DataPreProcessorCompress.ZLIB, DataPreProcessorCompress.BZ2, DataPreProcessorCompress.LZMA]:
+            self.assertLessEqual(len(compressed), len(DataPreProcessorCompress(codec=codec).preprocess(self.log_data)) + 64)
+        self.assertLess(len(compressed), len(self.log_data) // 10)
+
+
+class TestDataProcessorZlibDictionary(unittest.TestCase):
+
+    @staticmethod
+    def status_line() -> bytes:
+        return (f"node-{random.randint(1, 40):02d} status=ok cpu={random.randint(0, 100)}% "
+            f"mem={random.randint(100, 8000)}MB service={random.choice(['nginx', 'redis', 'sshd'])}").encode()
+
+    def test_dictionary(self):
+        zdict = build_dictionary([self.status_line() for i in range(200)], size=1024)
+        self.assertLessEqual(len(zdict), 1024)
+        pre = DataPreProcessorZlibDictionary(zdict, dictionary_id=3)
+        pre_without_dictionary = DataPreProcessorCompress(codec=DataPreProcessorCompress.ZLIB)
+        post = DataPostProcessorZlibDictionary({1: b'other dictionary', 3: zdict})
+        for i in range(0, 20):
+            data = self.status_line()
+            preprocessed = pre.preprocess(data)
+            self.assertEqual(preprocessed[0], 3)
+            self.assertLess(len(preprocessed), len(pre_without_dictionary.preprocess(data)))
+            self.assertEqual(post.postprocess(preprocessed), data)
+            self.assertEqual(process_stream(post, random_chunks(process_stream(pre, random_chunks(data)))), data)
+
+    def test_unknown_dictionary(self):
+        pre = DataPreProcessorZlibDictionary(b'dictionary', dictionary_id=2)
+        post = DataPostProcessorZlibDictionary({1: b'dictionary'})
+        self.assertRaises(ValueError, post.postprocess, pre.preprocess(b'data'))
+
+class TestDataProcessorAlphabet(unittest.TestCase):
+
+    def test_random_alphabets(self):
+        for size in [2, 3, 6, 10, 16, 26, 62, 85, 128, 200, 255, 256]:
+            alphabet = bytes(random.sample(range(256), size))
+            pre = DataPreProcessorAlphabet(alphabet)
+            post = DataPostProcessorAlphabet(alphabet)
+            for length in list(range(0, 20)) + [random.randint(20, 2000)]:
+                data = random.randbytes(length)
+                preprocessed = pre.preprocess(data)
+                self.assertTrue(set(preprocessed) <= set(alphabet))
+                self.assertEqual(post.postprocess(preprocessed), data)
+                self.assertEqual(process_stream(pre, random_chunks(data)), preprocessed)
+                self.assertEqual(process_stream(post, random_chunks(preprocessed)), data)
+
+    def test_density(self):
+        data = random.randbytes(7 * 3 * 333)
+        self.assertEqual(len(DataPreProcessorAlphabet(b'567890').preprocess(data)), 22 * 3 * 333)
+        self.assertEqual(len(DataPreProcessorAlphabet(b'0123456789').preprocess(data)), 17 * 3 * 333)
+        self.assertEqual(len(DataPreProcessorAlphabet(bytes(range(64))).preprocess(data)), 4 * 7 * 333)
+
+    def test_power_of_two(self):
+        for size in [2, 4, 8, 16, 32, 64, 128]:
+            alphabet = bytes(random.sample(range(256), size))
+            pre = DataPreProcessorAlphabet(alphabet)
+            for length in range(0, 20):
+                data = random.randbytes(length)
+                preprocessed = pre.preprocess(data)
+                pre.codec.bits_per_digit = None
+                self.assertEqual(pre.preprocess(data), preprocessed)
+                pre.codec = DataPreProcessorAlphabet(alphabet).codec
+
+    def test_base64_alphabet(self):
+        alphabet = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+        data = random.randbytes(300)
+        self.assertEqual(DataPreProcessorAlphabet(alphabet).preprocess(data), base64.b64encode(data))
+
+    def test_padding(self):
+        pre = DataPreProcessorAlphabet(b'567890')
+        post = DataPostProcessorAlphabet(b'567890', padding=b'\x00')
+        data = random.randbytes(100)
+        preprocessed = pre.preprocess(data) + bytes(5)
+        self.assertEqual(post.postprocess(preprocessed), data)
+        self.assertEqual(process_stream(post, random_chunks(preprocessed)), data)
+        self.assertRaises(ValueError, DataPostProcessorAlphabet(b'567890').postprocess, preprocessed)
+
+    def test_invalid_data(self):
+        post = DataPostProcessorAlphabet(b'567890')
+        self.assertRaises(ValueError, post.postprocess, b'5671')
+        self.assertRaises(ValueError, post.postprocess, b'5')
+        self.assertRaises(ValueError, post.postprocess, b'0' * 22)
+        self.assertRaises(ValueError, post.postprocess, b'0000')
+
@@ -2,7 +2,14 @@ import random
 from bitstring import Bits
 import unittest
 
-from ccframework import MinimalMicroProtocolSend, MinimalMicroProtocolReceive, TransmissionState
+from ccframework import MicroProtocolReceive, MinimalMicroProtocolSend, MinimalMicroProtocolReceive, TransmissionState
+from ccframework import LengthPrefixedMicroProtocolSend, LengthPrefixedMicroProtocolReceive
+from ccframework import SequenceMicroProtocolSend, SequenceMicroProtocolReceive
+from ccframework import FECMicroProtocolSend, FECMicroProtocolReceive
+from ccframework import FountainMicroProtocolSend, FountainMicroProtocolReceive
+from ccframework import MultiplexMicroProtocolSend, MultiplexMicroProtocolReceive
+from ccframework import CRCMicroProtocolSend, CRCMicroProtocolReceive
+from ccframework import SyncMicroProtocolSend, SyncMicroProtocolReceive
 
 class TestMinimalMicroProtocolSend(unittest.TestCase):
     
@@ -32,6 +39,14 @@ class TestMinimalMicroProtocolSend(unittest.TestCase):
         self.assertEqual(len(desired_result), len(actual_result))
         for i in range(len(desired_result)):
             self.assertEqual(actual_result[i], Bits(f"0b{desired_result[i]}"))
+
+    def test_preprocess_stream(self):
+        test_data = b'Hello World'
+        mp = MinimalMicroProtocolSend(slice_size=3, padding=Bits(bytes(3)))
+        desired_result = mp.preprocess(Bits(test_data))
+        actual_result = mp.preprocess_stream(iter([b'Hel', b'', b'lo Wo', b'rld']))
+        self.assertNotIsInstance(actual_result, list)
+        self.assertEqual(list(actual_result), desired_result)
     
 class TestMinimalMicroProtocolReceive(unittest.TestCase):
     def test_unit_bits(self):
@@ -88,3 +103,387 @@ class TestMinimalMicroProtocolReceive(unittest.TestCase):
         self.assertEqual(resp.data, None)
         self.assertEqual(resp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
         self.assertEqual(mp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+
+    def test_postprocess_many(self):
+        for i in range(0, 50):
+            slice_size = random.randint(1, 40)
+            count = random.randint(0, 60)
+            # gelegentliche Null-Stücke testen Start- und Endmarkierung an beliebiger Stelle
+            slices = [Bits(slice_size) if random.random() < 0.1 else Bits(uint=random.randint(1, 2**slice_size - 1), length=slice_size)
+                for j in range(count)]
+            single = MinimalMicroProtocolReceive(slice_size=slice_size, unit='bits')
+            expected = Bits()
+            for data_slice in slices:
+                resp = single.postprocess(data_slice)
+                if resp.data is not None:
+                    expected += resp.data
+
+            batched = MinimalMicroProtocolReceive(slice_size=slice_size, unit='bits')
+            received = Bits()
+            position = 0
+            while True:
+                batch_size = random.randint(0, 10)
+                resp = batched.postprocess_many(slices[position:position + batch_size])
+                position += batch_size
+                self.assertEqual(resp.transmission_state, batched.transmission_state)
+                if resp.data is not None:
+                    received += resp.data
+                if position >= count:
+                    break
+            self.assertEqual(batched.transmission_state, single.transmission_state)
+            self.assertEqual(received, expected)
+
+    def test_postprocess_many_varying_length(self):
+        mp = MinimalMicroProtocolReceive(slice_size=1)
+        resp = mp.postprocess_many([Bits(b'\x00'), Bits(b'ab'), Bits(b'c'), Bits(b'\x00\x00'), Bits(b'\x00'), Bits(b'd')])
+        self.assertEqual(resp.data, Bits(b'abc\x00\x00'))
+        self.assertEqual(resp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+
+    def test_postprocess_many_default(self):
+        data = Bits(random.randbytes(50))
+        slices = LengthPrefixedMicroProtocolSend(slice_size=2).preprocess(data)
+        mp = LengthPrefixedMicroProtocolReceive(slice_size=2)
+        resp = mp.postprocess_many([Bits(b'\x01\x02')] + slices)
+        self.assertEqual(resp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+        self.assertEqual(resp.expected_length, len(data))
+        self.assertEqual(resp.data, data)
+
+class TestLengthPrefixedMicroProtocol(unittest.TestCase):
+
+    def test_preprocess(self):
+        mp = LengthPrefixedMicroProtocolSend(slice_size=4, unit=LengthPrefixedMicroProtocolSend.BITS)
+        desired_result = ['0000', '0000', '0101', '0011', '0000']
+        self.assertEqual(mp.preprocess(Bits('0b00110')), [Bits(f"0b{s}") for s in desired_result])
+
+    def test_random_data(self):
+        for i in range(0, 50):
+            slice_size = random.randint(1, 40)
+            length = random.choice([0, 1, 8, random.randint(0, 2000)])
+            data = Bits(uint=random.getrandbits(length), length=length) if length > 0 else Bits()
+            slices = LengthPrefixedMicroProtocolSend(slice_size=slice_size, unit='bits').preprocess(data)
+            mp = LengthPrefixedMicroProtocolReceive(slice_size=slice_size, unit='bits')
+
+            mp.postprocess(Bits(uint=1, length=slice_size))
+            self.assertEqual(mp.transmission_state, TransmissionState.WAITING_FOR_TRANSMISSION)
+            received = Bits()
+            expected_length = None
+            for j, data_slice in enumerate(slices):
+                resp = mp.postprocess(data_slice)
+                if resp.expected_length is not None:
+                    expected_length = resp.expected_length
+                if resp.data is not None:
+                    received += resp.data
+                # das Ende wird mit dem letzten Stück erkannt, ohne abschließende Markierung
+                if j < len(slices) - 1:
+                    self.assertEqual(resp.transmission_state, TransmissionState.ACTIVE_TRANSMISSION)
+            self.assertEqual(mp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+            self.assertEqual(expected_length, len(data))
+            self.assertEqual(received, data)
+
+    def test_zero_slices(self):
+        data = Bits(bytes(10))
+        slices = LengthPrefixedMicroProtocolSend(slice_size=1).preprocess(data)
+        self.assertEqual(len(slices), 12)
+        mp = LengthPrefixedMicroProtocolReceive(slice_size=1)
+        received = [mp.postprocess(s).data for s in slices]
+        self.assertEqual(received[2:], [Bits(bytes(1))] * 10)
+        self.assertEqual(mp.postprocess(Bits(bytes(1))).data, None)
+
+    def test_max_length(self):
+        slices = LengthPrefixedMicroProtocolSend(slice_size=1).preprocess(Bits(bytes(10)))
+        mp = LengthPrefixedMicroProtocolReceive(slice_size=1, max_length=80)
+        self.assertEqual(Bits().join(mp.postprocess(s).data or Bits() for s in slices), Bits(bytes(10)))
+        slices = LengthPrefixedMicroProtocolSend(slice_size=1).preprocess(Bits(bytes(11)))
+        mp = LengthPrefixedMicroProtocolReceive(slice_size=1, max_length=80)
+        mp.postprocess(slices[0])
+        with self.assertRaises(ValueError):
+            mp.postprocess(slices[1])
+
+def reorder(slices: list, distance: int) -> list:
+    '''Vertauscht Stücke zufällig, wobei jedes höchstens `distance - 1` Stücke zu früh ankommt'''
+    result = list()
+    for i in range(0, len(slices), distance):
+        block = slices[i:i+distance]
+        random.shuffle(block)
+        result += block
+    return result
+
+def rechunk(stream: Bits, max_size: int) -> [Bits]:
+    '''Teilt einen Bitstrom in Stücke zufälliger Länge auf'''
+    chunks = []
+    position = 0
+    while position < len(stream):
+        size = random.randint(1, max_size)
+        chunks.append(stream[position:position + size])
+        position += size
+    return chunks
+
+class TestSyncMicroProtocol(unittest.TestCase):
+
+    def receive(self, mp, chunks) -> Bits:
+        received = Bits()
+        for chunk in chunks:
+            resp = mp.postprocess(chunk)
+            if resp.data is not None:
+                received += resp.data
+        return received
+
+    def test_unaligned(self):
+        for i in range(0, 30):
+            slice_size = random.randint(1, 40)
+            data = Bits(random.randbytes(random.randint(0, 100)))
+            stream = Bits().join(SyncMicroProtocolSend(slice_size=slice_size, unit='bits').preprocess(data))
+            # Mitschnitt beginnt mitten in anderem Verkehr, Stücke sind nicht an der Präambel ausgerichtet
+            junk_length = random.randint(0, 200)
+            junk = Bits(uint=random.getrandbits(junk_length), length=junk_length) if junk_length > 0 else Bits()
+            mp = SyncMicroProtocolReceive(slice_size=slice_size, unit='bits')
+            received = self.receive(mp, rechunk(junk + stream, 50))
+            self.assertEqual(mp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+            self.assertEqual(received, data)
+
+    def test_bit_errors(self):
+        data = Bits(random.randbytes(20))
+        stream = Bits().join(SyncMicroProtocolSend(slice_size=3).preprocess(data))
+        corrupted = stream ^ Bits('0b1001') + Bits(len(stream) - 4)
+        mp = SyncMicroProtocolReceive(slice_size=3, max_errors=2)
+        self.assertEqual(self.receive(mp, rechunk(Bits('0b101') + corrupted, 10)), data)
+
+        mp = SyncMicroProtocolReceive(slice_size=3, max_errors=1)
+        self.assertEqual(self.receive(mp, rechunk(corrupted, 10)), Bits())
+        self.assertEqual(mp.transmission_state, TransmissionState.WAITING_FOR_TRANSMISSION)
+
+    def test_custom_preamble(self):
+        preamble = Bits('0b1110010')
+        data = Bits(bytes(5))
+        slices = SyncMicroProtocolSend(slice_size=1, preamble=preamble).preprocess(data)
+        mp = SyncMicroProtocolReceive(slice_size=1, preamble=preamble)
+        self.assertEqual(self.receive(mp, slices), data)
+        self.assertEqual(mp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+
+class TestSequenceMicroProtocol(unittest.TestCase):
+
+    def test_preprocess(self):
+        mp = SequenceMicroProtocolSend(slice_size=6, unit='bits', seq_bits=2)
+        desired_result = ['000000', '010101', '100011', '110000']
+        self.assertEqual(mp.preprocess(Bits('0b00110')), [Bits(f"0b{s}") for s in desired_result])
+
+    def receive(self, mp: SequenceMicroProtocolReceive, slices: list) -> Bits:
+        received = Bits()
+        for data_slice in slices:
+            resp = mp.postprocess(data_slice)
+            if resp.data is not None:
+                received += resp.data
+        return received
+
+    def test_reordered_with_wraparound(self):
+        for seq_bits in [1, 3, 4, 8]:
+            data = Bits(random.randbytes(random.randint(300, 600)))
+            slices = SequenceMicroProtocolSend(slice_size=2, seq_bits=seq_bits).preprocess(data)
+            self.assertGreater(len(slices), 2 ** seq_bits)
+            mp = SequenceMicroProtocolReceive(slice_size=2, seq_bits=seq_bits)
+            self.assertEqual(self.receive(mp, reorder(slices, max(1, 2 ** (seq_bits - 1)))), data)
+            self.assertEqual(mp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+
+    def test_duplicates(self):
+        data = Bits(random.randbytes(100))
+        slices = SequenceMicroProtocolSend(slice_size=3, seq_bits=4).preprocess(data)
+        with_duplicates = list()
+        for i, data_slice in enumerate(slices):
+            with_duplicates.append(data_slice)
+            if i % 3 == 0:
+                with_duplicates.append(data_slice)
+            if i >= 4 and i % 5 == 0:
+                with_duplicates.append(slices[i - 4])
+        mp = SequenceMicroProtocolReceive(slice_size=3, seq_bits=4)
+        self.assertEqual(self.receive(mp, reorder(with_duplicates, 4)), data)
+        self.assertGreater(mp.duplicates, 0)
+
+    def test_gap(self):
+        data = Bits(random.randbytes(30))
+        slices = SequenceMicroProtocolSend(slice_size=2).preprocess(data)
+        mp = SequenceMicroProtocolReceive(slice_size=2)
+        # ein Byte Sequenznummer, ein Byte Nutzdaten, die Länge 240 benötigt zwei Bytes
+        self.assertEqual(self.receive(mp, slices[:3] + slices[4:]), data[:8])
+        self.assertEqual(mp.transmission_state, TransmissionState.ACTIVE_TRANSMISSION)
+        resp = mp.postprocess(slices[3])
+        self.assertEqual(mp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+        self.assertEqual(resp.data, data[8:])
+
+class TestFECMicroProtocol(unittest.TestCase):
+
+    def receive(self, mp: MicroProtocolReceive, slices: list) -> Bits:
+        received = Bits()
+        for data_slice in slices:
+            resp = mp.postprocess(data_slice)
+            if resp.data is not None:
+                received += resp.data
+        return received
+
+    def test_without_loss(self):
+        # MinimalMicroProtocol beendet die Übertragung bei einem Null-Byte
+        data = Bits(bytes(random.randint(1, 255) for i in range(100)))
+        mp = FECMicroProtocolSend(MinimalMicroProtocolSend(slice_size=1, padding=Bits(8)), group_size=3)
+        slices = mp.preprocess(data)
+        self.assertEqual(mp.slice_size, 16)
+        # 102 Stücke des inneren Mikroprotokolls, aufgefüllt auf 34 Gruppen mit je einem Paritätsstück
+        self.assertEqual(len(slices), 34 * 4)
+        receiver = FECMicroProtocolReceive(MinimalMicroProtocolReceive(slice_size=1), group_size=3)
+        self.assertEqual(self.receive(receiver, slices), data)
+        self.assertEqual(receiver.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+
+    def test_single_loss_per_group(self):
+        for group_size in [1, 2, 5]:
+            data = Bits(random.randbytes(random.randint(1, 200)))
+            slices = FECMicroProtocolSend(LengthPrefixedMicroProtocolSend(slice_size=2), group_size=group_size).preprocess(data)
+            remaining = list()
+            for group in range(0, len(slices), group_size + 1):
+                lost = random.randint(0, group_size)
+                remaining += [s for i, s in enumerate(slices[group:group+group_size+1]) if i != lost]
+            receiver = FECMicroProtocolReceive(LengthPrefixedMicroProtocolReceive(slice_size=2), group_size=group_size)
+            self.assertEqual(self.receive(receiver, remaining), data)
+            self.assertEqual(receiver.lost, 0)
+
+    def test_burst_loss_with_interleave(self):
+        data = Bits(random.randbytes(300))
+        mp = FECMicroProtocolSend(LengthPrefixedMicroProtocolSend(slice_size=1), group_size=4, interleave=5, seq_bits=8)
+        slices = mp.preprocess(data)
+        block_size = 5 * 5
+        remaining = list()
+        for block in range(0, len(slices), block_size):
+            start = random.randint(0, block_size - 5)
+            remaining += slices[block:block+start] + slices[block+start+5:block+block_size]
+        receiver = FECMicroProtocolReceive(LengthPrefixedMicroProtocolReceive(slice_size=1), group_size=4, interleave=5, seq_bits=8)
+        self.assertEqual(self.receive(receiver, remaining), data)
+        self.assertGreater(receiver.recovered, 0)
+
+    def test_unrecoverable_loss(self):
+        data = Bits(random.randbytes(100))
+        slices = FECMicroProtocolSend(LengthPrefixedMicroProtocolSend(slice_size=1), group_size=4).preprocess(data)
+        receiver = FECMicroProtocolReceive(LengthPrefixedMicroProtocolReceive(slice_size=1), group_size=4)
+        received = self.receive(receiver, slices[:10] + slices[12:])
+        self.assertEqual(receiver.lost, 2)
+        # Startmarkierung und zwei Bytes Länge, verloren sind die Datenstücke 5 und 6
+        self.assertEqual(received[:8 * 5], data[:8 * 5])
+        self.assertNotEqual(received, data)
+
+class TestFountainMicroProtocol(unittest.TestCase):
+
+    def test_join_at_any_point(self):
+        for length in [1, 10, 300]:
+            data = Bits(random.randbytes(length))
+            stream = FountainMicroProtocolSend(slice_size=4).iter_preprocess(data)
+            mp = FountainMicroProtocolReceive(slice_size=4)
+            for i in range(random.randint(0, 500)):
+                next(stream)
+            received = None
+            for count, data_slice in enumerate(stream):
+                self.assertLess(count, 5000)
+                if random.random() < 0.3:
+                    continue
+                resp = mp.postprocess(data_slice)
+                if resp.transmission_state is TransmissionState.FINISHED_TRANSMISSION:
+                    received = resp.data
+                    self.assertEqual(resp.expected_length, len(data))
+                    break
+            self.assertEqual(received, data)
+            self.assertEqual(mp.postprocess(data_slice).data, None)
+
+    def test_max_symbols(self):
+        mp = FountainMicroProtocolSend(slice_size=2, unit='bytes', counter_bits=8, max_symbols=300)
+        slices = mp.preprocess(Bits(b'Hello World'))
+        self.assertEqual(len(slices), 300)
+        # die Symbolnummer läuft nach 256 Stücken über, der Strom wiederholt sich
+        self.assertEqual(slices[256:], slices[:44])
+        receiver = FountainMicroProtocolReceive(slice_size=2, counter_bits=8)
+        for data_slice in reversed(slices):
+            resp = receiver.postprocess(data_slice)
+            if resp.data is not None:
+                break
+        self.assertEqual(resp.data, Bits(b'Hello World'))
+
+    def test_too_many_source_symbols(self):
+        mp = FountainMicroProtocolSend(slice_size=12, unit='bits', counter_bits=4)
+        self.assertRaises(ValueError, next, mp.iter_preprocess(Bits(bytes(300))))
+
+class TestMultiplexMicroProtocol(unittest.TestCase):
+
+    def test_concurrent_senders(self):
+        messages = {stream_id: random.randbytes(random.randint(1, 100)) for stream_id in [0, 3, 7, 15]}
+        senders = [MultiplexMicroProtocolSend(LengthPrefixedMicroProtocolSend(slice_size=2), stream_id=stream_id).iter_preprocess(Bits(data))
+            for stream_id, data in messages.items()]
+        completed = list()
+        mp = MultiplexMicroProtocolReceive(lambda: LengthPrefixedMicroProtocolReceive(slice_size=2),
+            expected_streams=4, on_complete=lambda stream_id, data: completed.append((stream_id, data)))
+        self.assertEqual(mp.slice_size, 4 + 16)
+        while senders:
+            sender = random.choice(senders)
+            data_slice = next(sender, None)
+            if data_slice is None:
+                senders.remove(sender)
+                continue
+            resp = mp.postprocess(data_slice)
+            self.assertEqual(resp.data, None)
+        self.assertEqual(mp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+        self.assertEqual(sorted(completed), sorted(messages.items()))
+        self.assertEqual(mp.completed_streams, completed)
+
+    def test_interleave(self):
+        messages = {1: b'Hello', 2: b'World', 5: b'!'}
+        mp = MultiplexMicroProtocolSend(MinimalMicroProtocolSend(slice_size=1, padding=Bits(8)), stream_bits=3)
+        slices = list(mp.interleave({stream_id: Bits(data) for stream_id, data in messages.items()}))
+        self.assertEqual([s[:3].uint for s in slices[:6]], [1, 2, 5, 1, 2, 5])
+        receiver = MultiplexMicroProtocolReceive(lambda: MinimalMicroProtocolReceive(slice_size=1), stream_bits=3)
+        for data_slice in slices:
+            receiver.postprocess(data_slice)
+        self.assertEqual(dict(receiver.completed_streams), messages)
+        self.assertEqual(receiver.transmission_state, TransmissionState.ACTIVE_TRANSMISSION)
+
+    def test_reused_stream_id(self):
+        mp = MultiplexMicroProtocolSend(LengthPrefixedMicroProtocolSend(slice_size=1), stream_id=2)
+        slices = mp.preprocess(Bits(b'first')) + mp.preprocess(Bits(b'second'))
+        receiver = MultiplexMicroProtocolReceive(lambda: LengthPrefixedMicroProtocolReceive(slice_size=1), expected_streams=2)
+        for data_slice in slices:
+            receiver.postprocess(data_slice)
+        self.assertEqual(receiver.completed_streams, [(2, b'first'), (2, b'second')])
+        self.assertEqual(receiver.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+
+class TestCRCMicroProtocol(unittest.TestCase):
+
+    def test_check_values(self):
+        # Prüfwerte für b'123456789' von CRC-8/SMBUS, CRC-16/CCITT-FALSE und CRC-32
+        expected = {8: 0xf4, 16: 0x29b1, 32: 0xcbf43926}
+        for crc_bits, check in expected.items():
+            mp = CRCMicroProtocolSend(LengthPrefixedMicroProtocolSend(slice_size=9), crc_bits=crc_bits)
+            self.assertEqual(mp.crc(b'123456789'), check)
+
+    def test_reject_stray_slices(self):
+        for crc_bits in [8, 16, 32]:
+            data = Bits(random.randbytes(200))
+            slices = CRCMicroProtocolSend(LengthPrefixedMicroProtocolSend(slice_size=3), crc_bits=crc_bits).preprocess(data)
+            mp = CRCMicroProtocolReceive(LengthPrefixedMicroProtocolReceive(slice_size=3), crc_bits=crc_bits)
+            received = Bits()
+            stray = 0
+            for data_slice in slices:
+                if random.random() < 0.3:
+                    # fremdes Stück mit garantiert falscher CRC
+                    payload = random.randbytes(3)
+                    wrong_crc = (mp.crc(payload) + 1) % (1 << crc_bits)
+                    mp.postprocess(Bits(payload) + Bits(uint=wrong_crc, length=crc_bits))
+                    stray += 1
+                resp = mp.postprocess(data_slice)
+                if resp.data is not None:
+                    received += resp.data
+            self.assertEqual(received, data)
+            self.assertEqual(mp.transmission_state, TransmissionState.FINISHED_TRANSMISSION)
+            self.assertEqual(mp.rejected, stray)
+
+    def test_corrupted_bit(self):
+        mp = CRCMicroProtocolReceive(MinimalMicroProtocolReceive(slice_size=7, unit='bits'), crc_bits=16)
+        data_slice = CRCMicroProtocolSend(MinimalMicroProtocolSend(slice_size=7, unit='bits', padding=Bits(7)), crc_bits=16).preprocess(Bits())[0]
+        corrupted = data_slice ^ Bits(uint=1 << random.randint(0, 22), length=23)
+        mp.postprocess(corrupted)
+        self.assertEqual(mp.rejected, 1)
+        self.assertEqual(mp.transmission_state, TransmissionState.WAITING_FOR_TRANSMISSION)
+        mp.postprocess(data_slice)
+        self.assertEqual(mp.transmission_state, TransmissionState.ACTIVE_TRANSMISSION)
+
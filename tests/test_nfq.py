@@ -0,0 +1,251 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import select
+import sys
+import types
+import unittest
+
+from scapy.all import IP, UDP, Raw
+
+class StubQueue:
+    '''Netfilter-Queue, deren Pakete über eine Pipe eingespeist werden, sodass sie auch in mit
+    `fork` gestarteten Prozessen ankommen. Angenommene Pakete landen in `verdicts`.'''
+
+    def __init__(self):
+        self.read_fd, self.write_fd = os.pipe()
+        self.verdicts = multiprocessing.get_context('fork').Queue()
+        self.unbound = 0
+
+    def inject(self, payload: bytes):
+        # kleiner als PIPE_BUF, wird also nicht mit Paketen anderer Schreiber vermischt
+        os.write(self.write_fd, len(payload).to_bytes(2, 'big') + payload)
+
+    def accepted(self, count: int) -> list:
+        return [self.verdicts.get(timeout=5) for i in range(count)]
+
+    def accepted_all(self, timeout: float=0.2) -> list:
+        packets = []
+        try:
+            while True:
+                packets.append(self.verdicts.get(timeout=timeout))
+        except queue.Empty:
+            return packets
+
+    def drain(self):
+        while select.select([self.read_fd], [], [], 0)[0]:
+            os.read(self.read_fd, 4096)
+
+    def close(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+QUEUES = {}
+
+def read_exactly(fd: int, length: int) -> bytes:
+    data = b''
+    while len(data) < length:
+        data += os.read(fd, length - len(data))
+    return data
+
+class StubPacket:
+
+    def __init__(self, stub: StubQueue, payload: bytes):
+        self.stub = stub
+        self.payload = payload
+
+    def get_payload(self):
+        return self.payload
+
+    def set_payload(self, payload):
+        self.payload = payload
+
+    def retain(self):
+        pass
+
+    def accept(self):
+        self.stub.verdicts.put(self.payload)
+
+class NetfilterQueue:
+    '''Ersatz für `netfilterqueue.NetfilterQueue`, der Pakete aus einer StubQueue liest'''
+
+    def bind(self, queue_id, callback):
+        self.stub = QUEUES[queue_id]
+        self.callback = callback
+
+    def get_fd(self):
+        return self.stub.read_fd
+
+    def run(self, block=True):
+        # wie das Original: Exceptions des Callbacks beenden run()
+        while select.select([self.stub.read_fd], [], [], None if block else 0)[0]:
+            length = int.from_bytes(read_exactly(self.stub.read_fd, 2), 'big')
+            self.callback(StubPacket(self.stub, read_exactly(self.stub.read_fd, length)))
+
+    def unbind(self):
+        self.stub.unbound += 1
+
+sys.modules['netfilterqueue'] = types.SimpleNamespace(NetfilterQueue=NetfilterQueue)
+
+from ccframework import nfq, PacketRingBuffer
+from ccframework import PacketHandlerSendFixedPositionPayload, PacketHandlerReceiveFixedPositionPayload
+from ccframework import LengthPrefixedMicroProtocolSend, LengthPrefixedMicroProtocolReceive
+from ccframework import SequenceMicroProtocolSend, SequenceMicroProtocolReceive, FountainMicroProtocolSend, FountainMicroProtocolReceive
+
+# falls nfq bereits mit einer anderen NetfilterQueue importiert wurde
+nfq.NetfilterQueue = NetfilterQueue
+
+SLICE_SIZE = 4
+
+def carrier(i: int) -> bytes:
+    return bytes(IP(dst='10.0.0.1') / UDP(sport=1000 + i, dport=53) / Raw(bytes(16)))
+
+class NFQTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = QUEUES[0] = StubQueue()
+
+    def tearDown(self):
+        del QUEUES[0]
+        self.stub.close()
+
+    def embed(self, data: bytes) -> list:
+        '''Bettet `data` mit dem synchronen Sendeadapter in Trägerpakete ein'''
+        sender = nfq.ProtocolSendAdapterNFQ(0, PacketHandlerSendFixedPositionPayload(0, SLICE_SIZE),
+            LengthPrefixedMicroProtocolSend(SLICE_SIZE))
+        for i in range(len(data)):
+            self.stub.inject(carrier(i))
+        sender.send(data)
+        self.stub.drain()
+        self.stub.unbound = 0
+        return self.stub.accepted_all()
+
+    def receiver(self, max_length: int=None, **kwargs):
+        return nfq.ProtocolReceiveAdapterNFQ(0, PacketHandlerReceiveFixedPositionPayload(0, SLICE_SIZE),
+            LengthPrefixedMicroProtocolReceive(SLICE_SIZE, max_length=max_length), **kwargs)
+
+class TestReceiveDecoupled(NFQTestCase):
+
+    def test_receive(self):
+        data = os.urandom(100)
+        packets = self.embed(data)
+        ring = PacketRingBuffer(slots=4, slot_size=128)
+        try:
+            for packet in packets:
+                self.stub.inject(packet)
+            receiver = self.receiver(ring_buffer=ring, poll_interval=0.01)
+            self.assertEqual(receiver.receive(), data)
+            self.assertEqual(self.stub.unbound, 1)
+        finally:
+            ring.close()
+
+    def test_decode_error(self):
+        packets = self.embed(os.urandom(100))
+        # weniger Plätze als Pakete: ohne Weitergabe des Fehlers würde der Callback beim
+        # Einfügen in den vollen Puffer hängen bleiben
+        ring = PacketRingBuffer(slots=2, slot_size=128)
+        try:
+            for packet in packets:
+                self.stub.inject(packet)
+            receiver = self.receiver(max_length=8, ring_buffer=ring, poll_interval=0.01)
+            with self.assertRaises(ValueError):
+                receiver.receive()
+            self.assertEqual(self.stub.unbound, 1)
+        finally:
+            ring.close()
+
+class TestAsync(NFQTestCase):
+
+    def test_send_async(self):
+        data = os.urandom(50)
+        packets = self.embed(data)
+        carriers = [carrier(i) for i in range(len(packets) + 3)]
+        for packet in carriers:
+            self.stub.inject(packet)
+        sender = nfq.ProtocolSendAdapterNFQ(0, PacketHandlerSendFixedPositionPayload(0, SLICE_SIZE),
+            LengthPrefixedMicroProtocolSend(SLICE_SIZE))
+        asyncio.run(sender.send_async(data))
+        # nach dem Ende eintreffende Pakete werden genau einmal und unverändert angenommen
+        self.assertEqual(self.stub.accepted_all(), packets + carriers[len(packets):])
+        self.assertEqual(self.stub.unbound, 1)
+
+    def test_receive_async(self):
+        data = os.urandom(50)
+        packets = self.embed(data) + [carrier(i) for i in range(3)]
+        for packet in packets:
+            self.stub.inject(packet)
+        self.assertEqual(asyncio.run(self.receiver().receive_async()), data)
+        self.assertEqual(self.stub.accepted_all(), packets)
+        self.assertEqual(self.stub.unbound, 1)
+
+    def test_callback_error(self):
+        packets = self.embed(os.urandom(50))
+        for packet in packets:
+            self.stub.inject(packet)
+        with self.assertRaises(ValueError):
+            asyncio.run(self.receiver(max_length=8).receive_async())
+        # auch das Paket, bei dem der Fehler auftrat, wurde angenommen
+        accepted = self.stub.accepted_all()
+        self.assertGreater(len(accepted), 0)
+        self.assertEqual(accepted, packets[:len(accepted)])
+        self.assertEqual(self.stub.unbound, 1)
+
+    def test_cancel(self):
+        packets = self.embed(os.urandom(50))
+
+        async def cancel():
+            loop = asyncio.get_running_loop()
+            task = asyncio.ensure_future(self.receiver().receive_async())
+            await asyncio.sleep(0.05)
+            self.stub.inject(packets[0])
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # Dateideskriptor ist nicht mehr registriert
+            self.assertFalse(loop.remove_reader(self.stub.read_fd))
+
+        asyncio.run(cancel())
+        self.assertEqual(self.stub.accepted_all(), packets[:1])
+        self.assertEqual(self.stub.unbound, 1)
+
+class TestFanout(NFQTestCase):
+
+    def setUp(self):
+        super().setUp()
+        QUEUES[1] = StubQueue()
+        self.stubs = [QUEUES[0], QUEUES[1]]
+
+    def tearDown(self):
+        QUEUES.pop(1).close()
+        super().tearDown()
+
+    def transmit(self, data: bytes, microprotocol_send, microprotocol_receive, carriers: int):
+        sender = nfq.ProtocolSendAdapterNFQFanout(range(2), PacketHandlerSendFixedPositionPayload(0, SLICE_SIZE),
+            microprotocol_send, poll_interval=0.01)
+        for stub in self.stubs:
+            for i in range(carriers):
+                stub.inject(carrier(i))
+        sender.send(data)
+        embedded = []
+        for stub in self.stubs:
+            stub.drain()
+            embedded.append(stub.accepted_all())
+        # beide Prozesse haben Stücke beansprucht
+        self.assertGreater(min(len(packets) for packets in embedded), 0)
+        for stub, packets in zip(self.stubs, embedded):
+            for packet in packets:
+                stub.inject(packet)
+        receiver = nfq.ProtocolReceiveAdapterNFQFanout(range(2), PacketHandlerReceiveFixedPositionPayload(0, SLICE_SIZE),
+            microprotocol_receive, poll_interval=0.01)
+        self.assertEqual(receiver.receive(), data)
+
+    def test_sequence(self):
+        data = os.urandom(100)
+        self.transmit(data, SequenceMicroProtocolSend(SLICE_SIZE), SequenceMicroProtocolReceive(SLICE_SIZE), 100)
+
+    def test_fountain(self):
+        data = os.urandom(100)
+        self.transmit(data, FountainMicroProtocolSend(SLICE_SIZE, max_symbols=150),
+            FountainMicroProtocolReceive(SLICE_SIZE), 100)
@@ -1,11 +1,15 @@
-#import random
+import itertools
+import random
+import time
 from bitstring import Bits
 import unittest
 from scapy.all import *
 
 from ccframework import PacketHandlerSendFixedPositionPayload, PacketHandlerReceiveFixedPositionPayload
 from ccframework import PacketHandlerSendRegexPayload, PacketHandlerReceiveRegexPayload
-from ccframework import ProtocolReceiveAdapter
+from ccframework import FountainMicroProtocolSend
+from ccframework import ProtocolReceiveAdapter, SendBuffer, SharedSendBuffer, l4_payload, patch_packet, incremental_checksum
+import multiprocessing
 
 class TestPacketHandlerSendFixedPositionPayload(unittest.TestCase):
 
@@ -46,6 +50,143 @@ class TestPacketHandlerSendFixedPositionPayload(unittest.TestCase):
             ph.handle_packet(packet)
             self.assertEqual(Bits(bytes(packet[UDP].payload)), test_result[i])
 
+    def test_lazy_send_buffer(self):
+        test_injection_data = [Bits(b'abc'), Bits(b'def')]
+        fetched = list()
+        def generate():
+            for bits in test_injection_data:
+                fetched.append(bits)
+                yield bits
+
+        ph = PacketHandlerSendFixedPositionPayload(start_index=0, slice_size=3, unit='bytes')
+        ph.set_send_buffer(generate())
+        self.assertEqual(len(fetched), 0)
+        for expected in [b'abc', b'def']:
+            self.assertTrue(ph.has_slices())
+            packet = UDP()/Raw(b'123456')
+            ph.handle_packet(packet)
+            self.assertEqual(bytes(packet[UDP].payload), expected + b'456')
+        self.assertFalse(ph.has_slices())
+
+    def test_payload_too_short(self):
+        ph = PacketHandlerSendFixedPositionPayload(start_index=3, slice_size=4, unit='bytes')
+        ph.set_send_buffer([Bits(b'abcd')])
+        packet = UDP()/Raw(b'123456')
+        ph.handle_packet(packet)
+        self.assertEqual(bytes(packet[UDP].payload), b'123456')
+        self.assertEqual(len(ph.send_buffer), 1)
+
+class TestSendBuffer(unittest.TestCase):
+    def test_queue_operations(self):
+        buf = SendBuffer([Bits(b'a'), Bits(b'b'), Bits(b'c')])
+        self.assertEqual(buf.remaining(), 3)
+        self.assertEqual(buf.peek(), Bits(b'a'))
+        self.assertEqual(buf.pop(), Bits(b'a'))
+        second = buf.pop()
+        self.assertEqual(second, Bits(b'b'))
+        buf.requeue(second)
+        self.assertEqual(buf.remaining(), 2)
+        self.assertEqual(buf.sent, 1)
+        self.assertEqual(buf.pop(), Bits(b'b'))
+        self.assertEqual(buf.pop(), Bits(b'c'))
+        self.assertTrue(buf.is_empty())
+        self.assertEqual(buf.remaining(), 0)
+        self.assertRaises(IndexError, buf.pop)
+
+    def test_lazy_source(self):
+        buf = SendBuffer(Bits(bytes([i])) for i in range(3))
+        self.assertEqual(buf.remaining(), 1)
+        for i in range(3):
+            self.assertFalse(buf.is_empty())
+            self.assertEqual(buf.pop(), Bits(bytes([i])))
+        self.assertEqual(buf.remaining(), 0)
+
+def pop_all(buffer, results):
+    popped = []
+    while not buffer.is_empty():
+        try:
+            popped.append(buffer.pop())
+        except IndexError:
+            # letztes Stück wurde zwischenzeitlich von einem anderen Prozess entnommen
+            break
+    results.put(popped)
+
+def pop_count(buffer, count, results):
+    results.put([buffer.pop().uint for i in range(count)])
+
+def wait_idle(packet_handler, results):
+    # Prozess, dessen Queue keine Pakete erhält, prüft nur, ob noch Stücke vorhanden sind
+    while packet_handler.has_slices():
+        time.sleep(0.001)
+    results.put(packet_handler.send_buffer.remaining())
+
+class TestSharedSendBuffer(unittest.TestCase):
+
+    def test_processes(self):
+        slices = [Bits(uint=i, length=16) for i in range(2000)]
+        buf = SharedSendBuffer(iter(slices))
+        self.assertEqual(buf.remaining(), len(slices))
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [context.Process(target=pop_all, args=(buf, results)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        popped = [results.get() for worker in workers]
+        for worker in workers:
+            worker.join()
+        # jedes Stück wurde genau einmal und je Prozess in aufsteigender Reihenfolge entnommen
+        numbers = [[s.uint for s in part] for part in popped]
+        self.assertEqual(sorted(n for part in numbers for n in part), list(range(len(slices))))
+        for part in numbers:
+            self.assertEqual(part, sorted(part))
+        self.assertTrue(buf.is_empty())
+        self.assertEqual(buf.remaining(), 0)
+
+    def test_unbounded_source(self):
+        # Fountain ohne `max_symbols` endet nie, die Quelle darf daher nicht vollständig abgerufen werden
+        mp = FountainMicroProtocolSend(slice_size=4, counter_bits=16)
+        data = Bits(random.randbytes(100))
+        buf = SharedSendBuffer(mp.iter_preprocess(data))
+        self.assertFalse(buf.is_empty())
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [context.Process(target=pop_count, args=(buf, 100, results)) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        popped = [n for worker in workers for n in results.get(timeout=10)]
+        for worker in workers:
+            worker.join()
+        # jedes der ersten 300 Stücke wurde genau einmal entnommen
+        expected = [s.uint for s in itertools.islice(mp.iter_preprocess(data), 300)]
+        self.assertEqual(sorted(popped), sorted(expected))
+        self.assertEqual(buf.counter.value, 300)
+
+    def test_idle_process(self):
+        slices = [Bits(uint=i, length=16) for i in range(200)]
+        ph = PacketHandlerSendFixedPositionPayload(start_index=0, slice_size=2)
+        ph.send_buffer = SharedSendBuffer(slices)
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        idle = context.Process(target=wait_idle, args=(ph, results), daemon=True)
+        idle.start()
+        sent = []
+        while ph.has_slices():
+            packet = UDP()/Raw(bytes(4))
+            ph.handle_packet(packet)
+            sent.append(bytes(packet[UDP].payload)[:2])
+        self.assertEqual(results.get(timeout=5), 0)
+        idle.join()
+        # der untätige Prozess hält keine Stücke zurück, alle wurden hier eingebettet
+        self.assertEqual(sent, [s.tobytes() for s in slices])
+
+    def test_requeue(self):
+        buf = SharedSendBuffer([Bits(b'a'), Bits(b'b')])
+        first = buf.pop()
+        buf.requeue(first)
+        self.assertEqual(buf.remaining(), 2)
+        self.assertEqual([buf.pop(), buf.pop()], [Bits(b'a'), Bits(b'b')])
+        self.assertTrue(buf.is_empty())
+
 class TestPacketHandlerReceiveFixedPositionPayload(unittest.TestCase):
     
     def test_known_data_bytes(self):
@@ -80,6 +221,103 @@ class TestPacketHandlerReceiveFixedPositionPayload(unittest.TestCase):
             result = ph.handle_packet(packet)
             self.assertEqual(result, desired_result[i])
 
+    def test_handle_packet_int(self):
+        for start_index, slice_size in [(3, 7), (0, 16), (5, 11), (8, 1)]:
+            ph = PacketHandlerReceiveFixedPositionPayload(start_index=start_index, slice_size=slice_size, unit='bits')
+            for i in range(10):
+                packet = UDP()/Raw(random.randbytes(4))
+                self.assertEqual(ph.handle_packet_int(packet), ph.handle_packet(packet).uint)
+        ph = PacketHandlerReceiveFixedPositionPayload(start_index=2, slice_size=3, unit='bytes')
+        self.assertEqual(ph.handle_packet_int(UDP()/Raw(b'1234')), None)
+        self.assertEqual(ph.handle_packet_int(IP()), None)
+
+    def test_handle_payload(self):
+        for start_index, slice_size in [(3, 7), (0, 16), (5, 11), (8, 1)]:
+            ph = PacketHandlerReceiveFixedPositionPayload(start_index=start_index, slice_size=slice_size, unit='bits')
+            for i in range(10):
+                payload = random.randbytes(4)
+                self.assertEqual(ph.handle_payload(memoryview(payload)), ph.handle_packet(UDP()/Raw(payload)))
+
+class TestL4Payload(unittest.TestCase):
+
+    def test_udp_tcp(self):
+        payload = b'some payload'
+        packets = [IP()/UDP()/Raw(payload), IP()/TCP()/Raw(payload),
+            IP(options=[IPOption_NOP()] * 4)/TCP(options=[('MSS', 1460), ('NOP', None)])/Raw(payload)]
+        for packet in packets:
+            # Ethernet-Padding nach dem IP-Paket gehört nicht zur Payload
+            raw = bytes(packet) + bytes(6)
+            self.assertEqual(bytes(l4_payload(memoryview(raw))), bytes(packet[IP].payload.payload))
+
+    def test_ignored_packets(self):
+        self.assertEqual(l4_payload(memoryview(bytes(IP()/ICMP()))), None)
+        self.assertEqual(l4_payload(memoryview(bytes(IPv6()/UDP()/Raw(b'abc')))), None)
+        self.assertEqual(l4_payload(memoryview(bytes(IP(flags='MF')/UDP()/Raw(b'abc')))), None)
+        self.assertEqual(l4_payload(memoryview(bytes(IP(frag=3)/Raw(b'abcdefgh')))), None)
+        self.assertEqual(l4_payload(memoryview(bytes(IP()/TCP())[:30])), None)
+
+class TestPatchPacket(unittest.TestCase):
+
+    def assertChecksums(self, raw: bytes):
+        # von Scapy neu berechnete Prüfsummen müssen mit den inkrementell angepassten übereinstimmen
+        packet = IP(raw)
+        l4 = packet[UDP] if UDP in packet else packet[TCP]
+        checksum = l4.chksum
+        del l4.chksum
+        self.assertEqual(IP(bytes(packet))[l4.__class__].chksum, checksum)
+
+    def test_against_scapy(self):
+        for i in range(50):
+            start_index = random.randint(0, 20)
+            slice_size = random.randint(1, 40)
+            proto = random.choice([UDP(sport=40000, dport=40001), TCP(sport=40000, dport=40001)])
+            packet = IP(src='10.0.0.1', dst='10.0.0.2')/proto/Raw(random.randbytes(random.randint(0, 12)))
+            raw = bytearray(bytes(packet))
+            data = Bits(uint=random.getrandbits(slice_size), length=slice_size)
+
+            expected = IP(bytes(packet))
+            ph = PacketHandlerSendFixedPositionPayload(start_index=start_index, slice_size=slice_size, unit='bits')
+            ph.set_send_buffer([data])
+            ph.handle_packet(expected)
+            ph = PacketHandlerSendFixedPositionPayload(start_index=start_index, slice_size=slice_size, unit='bits')
+            ph.set_send_buffer([data])
+            patched = patch_packet(raw, ph)
+            self.assertEqual(patched, not ph.has_slices())
+            if patched:
+                self.assertEqual(bytes(IP(raw)[Raw]), bytes(expected[Raw]))
+            else:
+                self.assertEqual(raw, bytes(packet))
+            self.assertChecksums(bytes(raw))
+
+    def test_udp_checksum(self):
+        packet = IP(src='10.0.0.1', dst='10.0.0.2')/UDP(sport=40000, dport=40001)/Raw(b'\x00\x00abcd')
+        raw = bytes(packet)
+        checksum = (raw[26] << 8) | raw[27]
+        # Wert, bei dem die berechnete Prüfsumme 0 ist und daher als 0xffff übertragen wird
+        value = next(v for v in range(1 << 16) if incremental_checksum(checksum, b'\x00\x00', v.to_bytes(2, 'big')) == 0)
+        ph = PacketHandlerSendFixedPositionPayload(start_index=0, slice_size=2)
+        ph.set_send_buffer([Bits(value.to_bytes(2, 'big'))])
+        patched = bytearray(raw)
+        self.assertTrue(patch_packet(patched, ph))
+        self.assertEqual(patched[26:28], b'\xff\xff')
+        self.assertChecksums(bytes(patched))
+
+        # ohne Prüfsumme bleibt das Feld 0
+        packet[UDP].chksum = 0
+        patched = bytearray(bytes(packet))
+        ph.set_send_buffer([Bits(b'xy')])
+        self.assertTrue(patch_packet(patched, ph))
+        self.assertEqual(patched[26:28], b'\x00\x00')
+        self.assertEqual(bytes(IP(patched)[Raw]), b'xyabcd')
+
+    def test_ignored_packets(self):
+        ph = PacketHandlerSendFixedPositionPayload(start_index=0, slice_size=1)
+        ph.set_send_buffer([Bits(b'x')])
+        for packet in [IP()/ICMP(), IP(flags='MF')/UDP()/Raw(b'abc')]:
+            raw = bytearray(bytes(packet))
+            self.assertFalse(patch_packet(raw, ph))
+            self.assertEqual(raw, bytes(packet))
+        self.assertTrue(ph.has_slices())
 
 class TestPacketHandlerSendRegexPayload(unittest.TestCase):
     def test_known_data(self):
@@ -95,6 +333,14 @@ class TestPacketHandlerSendRegexPayload(unittest.TestCase):
             ph.handle_packet(packet)
             self.assertEqual(bytes(packet[UDP].payload), test_result[i])
 
+    def test_no_match(self):
+        ph = PacketHandlerSendRegexPayload(regex=r'[567890]+')
+        ph.set_send_buffer([Bits(b'Hell')])
+        packet = UDP()/Raw(b'1234abcdefg')
+        ph.handle_packet(packet)
+        self.assertEqual(bytes(packet[UDP].payload), b'1234abcdefg')
+        self.assertTrue(ph.has_slices())
+
 class TestPacketHandlerReceiveRegexPayload(unittest.TestCase):
     def test_known_data(self):
         test_payloads = [b'1234Hellabcdefg', b'1234o Woabcdefg', b'1234rld1abcdefg']
@@ -0,0 +1,217 @@
+import io
+import random
+import threading
+import time
+from bitstring import Bits
+import unittest
+
+from ccframework import BitAccumulator, ProtocolReceiveAdapter, ProtocolSendAdapter, MinimalMicroProtocolReceive, MinimalMicroProtocolSend
+from ccframework import LengthPrefixedMicroProtocolSend, LengthPrefixedMicroProtocolReceive
+from ccframework import MultiplexMicroProtocolSend, MultiplexMicroProtocolReceive
+from ccframework import SequenceMicroProtocolSend, ProtocolSendAdapterRequestResponse, SelectiveRepeatMicroProtocolSend, SelectiveRepeatMicroProtocolReceive
+from ccframework import CCSender, CCReceiver, DataPreProcessorBase64, DataPostProcessorBase64, DataPreProcessorXOR, DataPostProcessorXOR
+
+class TestBitAccumulator(unittest.TestCase):
+
+    def test_random_slices(self):
+        for i in range(0, 20):
+            acc = BitAccumulator()
+            expected = Bits()
+            for j in range(0, 50):
+                length = random.choice([0, 1, 7, 8, 13, 64, random.randint(1, 200)])
+                part = Bits(uint=random.getrandbits(length), length=length) if length > 0 else Bits()
+                acc.append(part)
+                expected += part
+                self.assertEqual(len(acc), len(expected))
+            self.assertEqual(acc.tobytes(), expected.tobytes())
+            self.assertEqual(acc.finalize(), expected.tobytes())
+            self.assertEqual(len(acc), 0)
+
+    def test_append_int(self):
+        acc = BitAccumulator()
+        acc.reserve(8 * 20)
+        expected = Bits()
+        for j in range(0, 100):
+            length = random.choice([0, 1, 8, 8, 13, random.randint(1, 70)])
+            value = random.getrandbits(length) if length > 0 else 0
+            acc.append_int(value, length)
+            expected += Bits(uint=value, length=length) if length > 0 else Bits()
+        self.assertEqual(len(acc), len(expected))
+        self.assertEqual(acc.finalize(), expected.tobytes())
+
+    def test_finalize(self):
+        acc = BitAccumulator()
+        acc += Bits(b'Hello')
+        acc += Bits('0b0101011')
+        result = acc.finalize()
+        self.assertIsInstance(result, bytes)
+        self.assertEqual(result, b'Hello\x56')
+
+    def test_reserve(self):
+        acc = BitAccumulator()
+        acc += Bits('0b101')
+        acc.reserve(8 * 100)
+        self.assertEqual(len(acc), 3)
+        self.assertEqual(acc.tobytes(), b'\xa0')
+        expected = Bits('0b101')
+        for i in range(0, 100):
+            part = Bits(uint=random.getrandbits(8), length=8)
+            acc += part
+            expected += part
+        self.assertEqual(len(acc), len(expected))
+        self.assertEqual(acc.drain(), expected[:800].tobytes())
+        self.assertEqual(acc.finalize(), expected[800:].tobytes())
+
+    def test_reserve_limit(self):
+        acc = BitAccumulator(max_reserve=8 * 10)
+        acc.reserve(2**63)
+        self.assertEqual(len(acc._bytes), 10)
+        acc += Bits(b'abc')
+        self.assertEqual(acc.finalize(), b'abc')
+
+class ProtocolSendAdapterList(ProtocolSendAdapter):
+    def __init__(self, microprotocol=None):
+        super().__init__(microprotocol)
+        self.slices = list()
+
+    def send(self, data: bytes):
+        self.slices += self.prepare_transmission(data)
+
+    def send_stream(self, source):
+        self.slices += self.prepare_transmission_stream(source)
+
+class ProtocolReceiveAdapterList(ProtocolReceiveAdapter):
+    def __init__(self, slices, microprotocol=None):
+        super().__init__(microprotocol)
+        self.slices = slices
+
+    def receive(self) -> bytes:
+        for data in self.slices:
+            self.handle_received_data(data)
+        return self.buffer.finalize()
+
+    def receive_stream(self):
+        for data in self.slices:
+            self.handle_received_data(data)
+            chunk = self.drain_buffer(chunk_size=16)
+            if chunk:
+                yield chunk
+        yield self.buffer.finalize()
+
+class TestProtocolReceiveAdapter(unittest.TestCase):
+
+    def test_unaligned_slices(self):
+        slices = ['0000000', '1001000', '1100101', '1101100', '0000000', '1111111']
+        adap = ProtocolReceiveAdapterList([Bits(f"0b{s}") for s in slices], MinimalMicroProtocolReceive(slice_size=7, unit='bits'))
+        self.assertEqual(adap.receive(), Bits('0b100100011001011101100').tobytes())
+
+    def test_length_prefixed(self):
+        data = b'\x00' * 20 + random.randbytes(100) + b'\x00' * 20
+        send_adapter = ProtocolSendAdapterList(LengthPrefixedMicroProtocolSend(slice_size=3))
+        send_adapter.send(data)
+        slices = [Bits(b'\x01\x02\x03')] + send_adapter.slices + [Bits(b'\x04\x05\x06')]
+        receive_adapter = ProtocolReceiveAdapterList(slices, LengthPrefixedMicroProtocolReceive(slice_size=3))
+        self.assertEqual(receive_adapter.receive(), data)
+
+    def test_length_prefixed_huge_length(self):
+        # manipulierte Länge von knapp 2**63 Bits darf keinen riesigen Puffer anlegen
+        slices = [Bits(bytes(1))] + [Bits(b'\xff')] * 7 + [Bits(b'\x7f'), Bits(b'abc')]
+        receive_adapter = ProtocolReceiveAdapterList(slices, LengthPrefixedMicroProtocolReceive(slice_size=1))
+        self.assertEqual(receive_adapter.receive(), b'abc')
+
+    def test_handle_received_batch(self):
+        data = b'\x00' * 20 + random.randbytes(100)
+        send_adapter = ProtocolSendAdapterList(LengthPrefixedMicroProtocolSend(slice_size=3))
+        send_adapter.send(data)
+        receive_adapter = ProtocolReceiveAdapterList([], LengthPrefixedMicroProtocolReceive(slice_size=3))
+        # Pakete ohne extrahierbare Daten liefern `None`
+        slices = [None] + send_adapter.slices + [None]
+        for i in range(0, len(slices), 7):
+            receive_adapter.handle_received_batch(slices[i:i + 7])
+        self.assertEqual(receive_adapter.buffer.finalize(), data)
+
+    def test_handle_received_int(self):
+        for microprotocol in [MinimalMicroProtocolSend(slice_size=1, padding=Bits(8)), LengthPrefixedMicroProtocolSend(slice_size=7, unit='bits')]:
+            data = random.randbytes(50).replace(b'\x00', b'\x01')
+            send_adapter = ProtocolSendAdapterList(microprotocol)
+            send_adapter.send(data)
+            if isinstance(microprotocol, MinimalMicroProtocolSend):
+                receive_adapter = ProtocolReceiveAdapterList([], MinimalMicroProtocolReceive(slice_size=1))
+            else:
+                receive_adapter = ProtocolReceiveAdapterList([], LengthPrefixedMicroProtocolReceive(slice_size=7, unit='bits'))
+            for data_slice in [Bits('0b1010101')] + send_adapter.slices:
+                receive_adapter.handle_received_int(data_slice.uint, len(data_slice))
+            self.assertEqual(receive_adapter.buffer.finalize().rstrip(b'\x00'), data)
+
+    def test_receive_streams(self):
+        mp = MultiplexMicroProtocolSend(LengthPrefixedMicroProtocolSend(slice_size=1))
+        slices = list(mp.interleave({0: Bits(b'first'), 1: Bits(b'second')}))
+        receive_adapter = ProtocolReceiveAdapterList(slices,
+            MultiplexMicroProtocolReceive(lambda: LengthPrefixedMicroProtocolReceive(slice_size=1), expected_streams=2))
+        self.assertEqual(receive_adapter.receive_streams(), [(0, b'first'), (1, b'second')])
+
+class TestStream(unittest.TestCase):
+
+    def test_send_and_receive_stream(self):
+        data = random.randbytes(5000)
+        send_adapter = ProtocolSendAdapterList(MinimalMicroProtocolSend(slice_size=5, padding=Bits(bytes(5))))
+        sender = CCSender([DataPreProcessorXOR(b'key'), DataPreProcessorBase64()], send_adapter)
+        sender.send_stream(io.BytesIO(data), chunk_size=100)
+
+        receive_adapter = ProtocolReceiveAdapterList(send_adapter.slices, MinimalMicroProtocolReceive(slice_size=5))
+        receiver = CCReceiver([DataPostProcessorBase64(), DataPostProcessorXOR(b'key')], receive_adapter)
+        chunks = list(receiver.receive_stream())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks), data)
+
+class ProtocolSendAdapterLossy(ProtocolSendAdapterRequestResponse):
+    '''Simuliert einen Anfrage/Antwort-Kanal, der Anfragen und Antworten verliert und verzögert'''
+    def __init__(self, receive_adapter, loss_rate, microprotocol=None):
+        super().__init__(microprotocol)
+        self.receive_adapter = receive_adapter
+        self.loss_rate = loss_rate
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def request(self, data: Bits) -> bytes:
+        time.sleep(0.002)
+        with self.lock:
+            self.requests += 1
+            if random.random() < self.loss_rate:
+                raise ConnectionError("request lost")
+            ack = self.receive_adapter.handle_received_data(data)
+            if random.random() < self.loss_rate:
+                raise ConnectionError("response lost")
+        return ack.tobytes() if ack is not None else b''
+
+class TestSelectiveRepeat(unittest.TestCase):
+
+    def test_without_loss(self):
+        data = random.randbytes(200)
+        receive_adapter = ProtocolReceiveAdapterList([], SelectiveRepeatMicroProtocolReceive(slice_size=3))
+        send_adapter = ProtocolSendAdapterLossy(receive_adapter, 0.0, SelectiveRepeatMicroProtocolSend(slice_size=3))
+        send_adapter.send(data)
+        self.assertEqual(receive_adapter.buffer.finalize(), data)
+        # parallele Anfragen werden umsortiert, das darf kaum zu Wiederholungen führen
+        self.assertLess(send_adapter.microprotocol.retransmissions, 20)
+        self.assertEqual(send_adapter.requests, 202 + send_adapter.microprotocol.retransmissions)
+        self.assertGreater(send_adapter.microprotocol.window, 4)
+
+    def test_lossy_channel(self):
+        data = random.randbytes(300)
+        receive_adapter = ProtocolReceiveAdapterList([], SelectiveRepeatMicroProtocolReceive(slice_size=3, seq_bits=8))
+        mp = SelectiveRepeatMicroProtocolSend(slice_size=3, seq_bits=8, min_rto=0.02)
+        send_adapter = ProtocolSendAdapterLossy(receive_adapter, 0.1, mp)
+        send_adapter.send(data)
+        self.assertEqual(receive_adapter.buffer.finalize(), data)
+        self.assertGreater(mp.retransmissions, 0)
+        self.assertTrue(mp.finished)
+
+    def test_ack(self):
+        mp = SelectiveRepeatMicroProtocolReceive(slice_size=2, seq_bits=4, sack_bits=4)
+        slices = SequenceMicroProtocolSend(slice_size=2, seq_bits=4).preprocess(Bits(b'abcdef'))
+        self.assertEqual(mp.postprocess(slices[0]).ack, Bits('0b0001_0000'))
+        self.assertEqual(mp.postprocess(slices[2]).ack, Bits('0b0001_1000'))
+        self.assertEqual(mp.postprocess(slices[4]).ack, Bits('0b0001_1010'))
+        self.assertEqual(mp.postprocess(slices[1]).ack, Bits('0b0011_1000'))
+
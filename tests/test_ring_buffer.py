@@ -0,0 +1,72 @@
+import multiprocessing
+import random
+import unittest
+
+from ccframework import PacketRingBuffer
+
+def produce(ring, packets):
+    for packet in packets:
+        ring.put(packet)
+
+class TestPacketRingBuffer(unittest.TestCase):
+
+    def test_order(self):
+        ring = PacketRingBuffer(slots=4, slot_size=64)
+        try:
+            packets = [random.randbytes(random.randint(0, 64)) for i in range(20)]
+            for i in range(0, len(packets), 3):
+                for packet in packets[i:i + 3]:
+                    self.assertTrue(ring.put(packet))
+                for packet in packets[i:i + 3]:
+                    self.assertEqual(ring.get(), packet)
+            self.assertEqual(ring.get(timeout=0.01), None)
+        finally:
+            ring.close()
+
+    def test_truncate(self):
+        ring = PacketRingBuffer(slots=1, slot_size=4)
+        try:
+            ring.put(b'abcdefgh')
+            self.assertEqual(ring.get(), b'abcd')
+        finally:
+            ring.close()
+
+    def test_drop(self):
+        ring = PacketRingBuffer(slots=2, slot_size=8, backpressure=PacketRingBuffer.DROP)
+        try:
+            self.assertTrue(ring.put(b'a'))
+            self.assertTrue(ring.put(b'b'))
+            self.assertFalse(ring.put(b'c'))
+            self.assertEqual(ring.dropped, 1)
+            self.assertEqual(ring.get(), b'a')
+            self.assertTrue(ring.put(b'd'))
+            self.assertEqual([ring.get(), ring.get()], [b'b', b'd'])
+            self.assertEqual(ring.dropped, 1)
+        finally:
+            ring.close()
+
+    def test_block_timeout(self):
+        ring = PacketRingBuffer(slots=1, slot_size=8)
+        try:
+            self.assertTrue(ring.put(b'a', timeout=0.01))
+            self.assertFalse(ring.put(b'b', timeout=0.01))
+            self.assertEqual(ring.dropped, 0)
+            self.assertEqual(ring.get(), b'a')
+            self.assertTrue(ring.put(b'c', timeout=0.01))
+            self.assertEqual(ring.get(), b'c')
+        finally:
+            ring.close()
+
+    def test_block_between_processes(self):
+        # kleiner Puffer, damit der Schreiber regelmäßig auf den Leser warten muss
+        ring = PacketRingBuffer(slots=3, slot_size=32)
+        try:
+            packets = [random.randbytes(random.randint(1, 32)) for i in range(500)]
+            producer = multiprocessing.get_context('fork').Process(target=produce, args=(ring, packets))
+            producer.start()
+            received = [ring.get(timeout=5) for packet in packets]
+            producer.join()
+            self.assertEqual(received, packets)
+            self.assertEqual(ring.dropped, 0)
+        finally:
+            ring.close()